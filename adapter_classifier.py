@@ -0,0 +1,162 @@
+"""Adapter Classifier Module
+
+Labels every adapter as physical, virtual, tunnel or loopback from its
+interface type, description and MAC vendor prefix, so the repair leaves
+Hyper-V, WSL, VPN and TUN adapters alone. Rules are checked in order and the
+first match decides; the matchers are compiled once at import. An adapter no
+rule matches is treated as physical, since its interface kind is unknown when
+ipconfig prints headers in a language the parser does not know.
+"""
+import re
+
+
+ADAPTER_CLASSES = ("physical", "virtual", "tunnel", "loopback")
+
+# Description patterns per class, checked against description and name
+LOOPBACK_PATTERNS = {
+    "loopback adapter": r"loopback",
+}
+TUNNEL_PATTERNS = {
+    "TAP adapter": r"\btap-(?:windows|win32|\w+ adapter)",
+    "TUN adapter": r"\bwintun\b|\btun\b|\butun\b",
+    "WireGuard": r"wireguard",
+    "OpenVPN": r"openvpn",
+    "Cisco AnyConnect": r"anyconnect|cisco .*vpn",
+    "FortiClient": r"fortinet|fortissl",
+    "Pulse Secure": r"juniper|pulse secure|ivanti",
+    "GlobalProtect": r"palo ?alto|pangp",
+    "ZeroTier": r"zerotier",
+    "Tailscale": r"tailscale",
+    "IPv6 transition tunnel": r"teredo|isatap|6to4|ip-https",
+    "WAN Miniport": r"wan miniport",
+    "VPN adapter": r"\bvpn\b",
+    "tunnel adapter": r"\btunnel\b",
+}
+VIRTUAL_PATTERNS = {
+    "Hyper-V virtual switch": r"hyper-v virtual ethernet|^vethernet\b",
+    "WSL": r"\bwsl\b",
+    "Docker": r"docker",
+    "VMware host adapter": r"vmware virtual ethernet|\bvmnet\d*\b",
+    "VirtualBox host adapter": r"virtualbox host-only|virtualbox ndis",
+    "Parallels host adapter": r"parallels (?:host-only|shared|nat)",
+    "Wi-Fi Direct": r"wi-fi direct virtual",
+    "Bluetooth PAN": r"bluetooth (?:device|network)",
+    "virtual adapter": r"\bvirtual (?:ethernet |network )?adapter\b",
+}
+
+# A virtual machine's own network card: virtual hardware, but the only way
+# the guest reaches the network, so it is repaired like a physical one
+GUEST_NIC_PATTERNS = {
+    "virtual machine network card": r"hyper-v network adapter|vmxnet|virtio|intel\(r\) pro/1000 mt|"
+                                    r"intel\(r\) 82574l|\be1000\b|parallels ethernet",
+}
+
+# MAC vendor prefixes (OUI) of virtualization platforms
+VIRTUAL_OUIS = {
+    "00-15-5D": "Hyper-V",
+    "00-03-FF": "Virtual PC",
+    "00-05-69": "VMware",
+    "00-0C-29": "VMware",
+    "00-1C-14": "VMware",
+    "00-50-56": "VMware",
+    "08-00-27": "VirtualBox",
+    "0A-00-27": "VirtualBox",
+    "00-1C-42": "Parallels",
+    "00-16-3E": "Xen",
+    "52-54-00": "QEMU/KVM",
+    "02-42-AC": "Docker",
+}
+
+# Interface kinds from the ipconfig section header or the IP Helper ifType
+KIND_CLASSES = {
+    "ethernet": ("physical", "Ethernet interface"),
+    "wireless": ("physical", "wireless interface"),
+    "tunnel": ("tunnel", "tunnel interface"),
+    "ppp": ("tunnel", "PPP interface"),
+    "loopback": ("loopback", "loopback interface"),
+}
+
+
+def _compile(patterns):
+    """Compile a pattern table into (label, matcher) pairs"""
+    return [(label, re.compile(pattern, re.IGNORECASE)) for label, pattern in patterns.items()]
+
+
+_DESCRIPTION_RULES = (
+    [("loopback", label, matcher) for label, matcher in _compile(LOOPBACK_PATTERNS)]
+    + [("tunnel", label, matcher) for label, matcher in _compile(TUNNEL_PATTERNS)]
+    + [("virtual", label, matcher) for label, matcher in _compile(VIRTUAL_PATTERNS)]
+)
+_GUEST_NIC_RULES = _compile(GUEST_NIC_PATTERNS)
+
+
+def mac_vendor(mac):
+    """
+    Look up the virtualization vendor of a MAC address
+
+    Args:
+        mac: Address as shown by ipconfig, e.g. '00-15-5D-01-02-03'
+
+    Returns:
+        str: Vendor name, or None if it is not a known virtual prefix
+    """
+    prefix = mac.replace(':', '-').upper()[:8]
+    return VIRTUAL_OUIS.get(prefix)
+
+
+def classify_adapter(adapter):
+    """
+    Classify one adapter
+
+    Args:
+        adapter: Adapter record from the network snapshot
+
+    Returns:
+        tuple: (class from ADAPTER_CLASSES, reason)
+    """
+    kind_class = KIND_CLASSES.get(adapter['kind'])
+    if kind_class and kind_class[0] in ("loopback", "tunnel"):
+        return kind_class
+
+    texts = [adapter['description'], adapter['name']]
+    for adapter_class, label, matcher in _DESCRIPTION_RULES:
+        if any(matcher.search(text) for text in texts if text):
+            return adapter_class, f"{label} by description"
+
+    for label, matcher in _GUEST_NIC_RULES:
+        if matcher.search(adapter['description'] or ""):
+            return "physical", label
+
+    vendor = mac_vendor(adapter['mac'] or "")
+    if vendor:
+        return "virtual", f"{vendor} MAC prefix"
+
+    if kind_class:
+        return kind_class
+    # Virtual adapters are recognised by the rules above; an unknown kind
+    # usually means an ipconfig header language the parser does not know
+    return "physical", f"'{adapter['kind']}' interface matching no virtual adapter rule"
+
+
+def select_adapters(adapters, classes):
+    """
+    Split adapters into those of the selected classes and the rest
+
+    Args:
+        adapters: Adapter records
+        classes: Classes to select, from ADAPTER_CLASSES
+
+    Returns:
+        tuple: (selected adapters, [(adapter, class, reason)] of the others);
+        each adapter gets its 'class' field set
+    """
+    selected = []
+    skipped = []
+    for adapter in adapters:
+        adapter_class, reason = classify_adapter(adapter)
+        adapter['class'] = adapter_class
+        if adapter_class in classes:
+            selected.append(adapter)
+        else:
+            skipped.append((adapter, adapter_class, reason))
+    return selected, skipped
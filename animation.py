@@ -0,0 +1,101 @@
+"""Animation Module
+
+A frame-capped animation scheduler and a font cache for the GUI. Widget
+changes are queued as keyframes; each frame applies all keyframes that are
+due with one configure() call per widget, and no timer runs while nothing
+is animating. Free of any UI toolkit imports.
+"""
+import heapq
+import itertools
+import math
+import time
+
+from constants import ANIMATION_FPS
+
+
+class FontCache:
+    """Creates each font once and reuses it for every later request"""
+
+    def __init__(self, factory):
+        """
+        Args:
+            factory: Called as factory(family, size, weight) to build a font
+        """
+        self.factory = factory
+        self._fonts = {}
+
+    def get(self, family, size, weight="normal"):
+        """
+        Get a font
+
+        Args:
+            family: Font family
+            size: Font size
+            weight: "normal" or "bold"
+
+        Returns:
+            The cached font object
+        """
+        key = (family, size, weight)
+        font = self._fonts.get(key)
+        if font is None:
+            font = self._fonts[key] = self.factory(family, size, weight)
+        return font
+
+
+class AnimationScheduler:
+    """Applies widget keyframes in coalesced, frame-capped batches"""
+
+    def __init__(self, after, fps=ANIMATION_FPS, clock=time.monotonic):
+        """
+        Args:
+            after: Timer function with the signature of Tk's after(ms, func)
+            fps: Maximum number of frames per second
+            clock: Time source in seconds
+        """
+        self.after = after
+        self.frame_interval = 1.0 / fps
+        self.clock = clock
+        self._keyframes = []
+        self._sequence = itertools.count()
+        self._frame_due = None
+        self._last_frame = None
+
+    def configure(self, widget, delay=0.0, **options):
+        """
+        Queue a widget configuration
+
+        Args:
+            widget: Widget with a configure(**options) method
+            delay: Seconds from now
+            **options: Options passed to widget.configure
+        """
+        due = self.clock() + delay
+        heapq.heappush(self._keyframes, (due, next(self._sequence), widget, options))
+        self._schedule(due)
+
+    def _schedule(self, due):
+        """Make sure a frame runs by the time due, respecting the frame cap"""
+        if self._last_frame is not None:
+            due = max(due, self._last_frame + self.frame_interval)
+        if self._frame_due is not None and self._frame_due <= due:
+            return
+        self._frame_due = due
+        delay_ms = max(0, math.ceil((due - self.clock()) * 1000))
+        self.after(delay_ms, lambda: self._frame(due))
+
+    def _frame(self, due):
+        """Apply every keyframe that is due, one configure() per widget"""
+        if due != self._frame_due:
+            # Superseded by an earlier frame
+            return
+        self._frame_due = None
+        now = self._last_frame = self.clock()
+        updates = {}
+        while self._keyframes and self._keyframes[0][0] <= now:
+            _, _, widget, options = heapq.heappop(self._keyframes)
+            updates.setdefault(id(widget), (widget, {}))[1].update(options)
+        for widget, options in updates.values():
+            widget.configure(**options)
+        if self._keyframes:
+            self._schedule(self._keyframes[0][0])
@@ -0,0 +1,521 @@
+"""Repair Pipeline Benchmark
+
+Runs the full repair pipeline against recorded command transcripts and
+compares total time-to-repair against a stored baseline. The suite mode adds
+microbenchmarks that run anywhere, Linux included: the ipconfig parser on
+synthetic outputs in several display languages, the GUI log pipeline, and
+full pipeline runs against synthetic transcripts.
+
+Usage:
+    python benchmark.py --record transcript.json        (live Windows machine)
+    python benchmark.py transcript.json --runs 3
+    python benchmark.py --synthetic 6 --save-baseline baseline.json
+    python benchmark.py transcript.json --baseline baseline.json --tolerance 0.2
+    python benchmark.py --suite --speed 0 --save-baseline suite.json
+    python benchmark.py --suite --speed 0 --baseline suite.json --latency "ipconfig /renew=0.5"
+"""
+import argparse
+import json
+import statistics
+import sys
+import threading
+import time
+
+from command_runner import CommandResult, RecordingRunner, ReplayRunner
+from log_buffer import LogBuffer
+from netsh_batch import NetshBatch, netsh_script_name
+from network_snapshot import invalidate_snapshot
+from network_utils import get_ethernet_adapters
+from repair_pipeline import run_repair
+from ui_events import UiEventChannel, LogEvent
+
+
+# Typical per-command latencies (seconds) used for synthetic transcripts
+SYNTHETIC_LATENCIES = {
+    ('ipconfig', '/all'): 0.35,
+    ('ipconfig', '/flushdns'): 0.05,
+    ('ipconfig', '/release'): 1.5,
+    ('ipconfig', '/renew'): 4.0,
+    'netsh': 0.9,
+}
+
+# Samples per suite benchmark; the median is reported
+SUITE_RUNS = 5
+
+# Suite sizes: adapters for the parser and pipeline, lines for the log pipeline
+SUITE_PARSER_ADAPTERS = (1, 10, 100, 1000)
+SUITE_LOG_LINES = (10_000, 100_000, 1_000_000)
+SUITE_PIPELINE_ADAPTERS = (1, 4)
+# Smaller sizes for --quick
+QUICK_PARSER_ADAPTERS = (1, 10, 100)
+QUICK_LOG_LINES = (10_000, 100_000)
+QUICK_PIPELINE_ADAPTERS = (1,)
+
+# Typical log line of a repair, repeated by the log pipeline benchmark
+SAMPLE_LOG_LINE = "  📡 Found adapter: 以太网 (Intel(R) Ethernet Connection (7) I219-V)"
+
+
+# 'ipconfig /all' layout per display language: console encoding and labels
+IPCONFIG_LOCALES = {
+    'zh-CN': {
+        'encoding': 'gbk', 'title': "Windows IP 配置", 'host': "主机名", 'header': "以太网适配器",
+        'name': "以太网", 'suffix': "连接特定的 DNS 后缀", 'description': "描述", 'mac': "物理地址",
+        'dhcp': "DHCP 已启用", 'yes': "是", 'ipv4': "IPv4 地址", 'autoconf': "自动配置 IPv4 地址",
+        'preferred': "首选", 'gateway': "默认网关",
+    },
+    'en-US': {
+        'encoding': 'cp437', 'title': "Windows IP Configuration", 'host': "Host Name",
+        'header': "Ethernet adapter", 'name': "Ethernet", 'suffix': "Connection-specific DNS Suffix",
+        'description': "Description", 'mac': "Physical Address", 'dhcp': "DHCP Enabled", 'yes': "Yes",
+        'ipv4': "IPv4 Address", 'autoconf': "Autoconfiguration IPv4 Address", 'preferred': "Preferred",
+        'gateway': "Default Gateway",
+    },
+    'de-DE': {
+        'encoding': 'cp850', 'title': "Windows-IP-Konfiguration", 'host': "Hostname",
+        'header': "Ethernet-Adapter", 'name': "Ethernet", 'suffix': "Verbindungsspezifisches DNS-Suffix",
+        'description': "Beschreibung", 'mac': "Physische Adresse", 'dhcp': "DHCP aktiviert", 'yes': "Ja",
+        'ipv4': "IPv4-Adresse", 'autoconf': "Autokonfigurations-IPv4-Adresse", 'preferred': "Bevorzugt",
+        'gateway': "Standardgateway",
+    },
+    'ja-JP': {
+        'encoding': 'cp932', 'title': "Windows IP 構成", 'host': "ホスト名", 'header': "イーサネット アダプター",
+        'name': "イーサネット", 'suffix': "接続固有の DNS サフィックス", 'description': "説明",
+        'mac': "物理アドレス", 'dhcp': "DHCP 有効", 'yes': "はい", 'ipv4': "IPv4 アドレス",
+        'autoconf': "自動構成 IPv4 アドレス", 'preferred': "優先", 'gateway': "デフォルト ゲートウェイ",
+    },
+    'ru-RU': {
+        'encoding': 'cp866', 'title': "Настройка протокола IP для Windows", 'host': "Имя компьютера",
+        'header': "Адаптер Ethernet", 'name': "Ethernet", 'suffix': "DNS-суффикс подключения",
+        'description': "Описание", 'mac': "Физический адрес", 'dhcp': "DHCP включен", 'yes': "Да",
+        'ipv4': "IPv4-адрес", 'autoconf': "Автонастройка IPv4-адреса", 'preferred': "Основной",
+        'gateway': "Основной шлюз",
+    },
+    'nl-NL': {
+        'encoding': 'cp850', 'title': "Windows IP-configuratie", 'host': "Hostnaam",
+        'header': "Ethernet-adapter", 'name': "Ethernet", 'suffix': "Verbindingsspecifiek DNS-achtervoegsel",
+        'description': "Beschrijving", 'mac': "Fysiek adres", 'dhcp': "DHCP ingeschakeld", 'yes': "Ja",
+        'ipv4': "IPv4-adres", 'autoconf': "Autoconfiguratie IPv4-adres", 'preferred': "Voorkeur",
+        'gateway': "Standaardgateway",
+    },
+    'pl-PL': {
+        'encoding': 'cp852', 'title': "Konfiguracja IP systemu Windows", 'host': "Nazwa hosta",
+        'header': "Karta Ethernet", 'name': "Ethernet", 'suffix': "Sufiks DNS konkretnego połączenia",
+        'description': "Opis", 'mac': "Adres fizyczny", 'dhcp': "DHCP włączone", 'yes': "Tak",
+        'ipv4': "Adres IPv4", 'autoconf': "Autokonfiguracja adresu IPv4", 'preferred': "Preferowane",
+        'gateway': "Brama domyślna",
+    },
+    'tr-TR': {
+        'encoding': 'cp857', 'title': "Windows IP Yapılandırması", 'host': "Ana Bilgisayar Adı",
+        'header': "Ethernet bağdaştırıcısı", 'name': "Ethernet", 'suffix': "Bağlantıya özgü DNS Soneki",
+        'description': "Açıklama", 'mac': "Fiziksel Adres", 'dhcp': "DHCP Etkin", 'yes': "Evet",
+        'ipv4': "IPv4 Adresi", 'autoconf': "Otomatik Yapılandırma IPv4 Adresi", 'preferred': "Tercih Edilen",
+        'gateway': "Varsayılan Ağ Geçidi",
+    },
+}
+
+
+def adapter_names(adapter_count, locale='zh-CN'):
+    """Names of the synthetic adapters, as Windows numbers them"""
+    name = IPCONFIG_LOCALES[locale]['name']
+    return [name if i == 0 else f"{name} {i + 1}" for i in range(adapter_count)]
+
+
+def build_ipconfig_output(adapter_count, released=False, locale='zh-CN'):
+    """
+    Build a synthetic 'ipconfig /all' output
+
+    Args:
+        adapter_count: Number of Ethernet adapters to include
+        released: Show the adapters after 'ipconfig /release'
+        locale: Display language from IPCONFIG_LOCALES
+
+    Returns:
+        bytes: Output in the console encoding of the locale
+    """
+    labels = IPCONFIG_LOCALES[locale]
+
+    def field(label, value=""):
+        # ipconfig pads labels with dots to a common column
+        dots = " ." * max(1, (36 - len(label)) // 2)
+        return f"   {label}{dots} : {value}".rstrip()
+
+    lines = ["", labels['title'], "", field(labels['host'], "BENCH-PC"), ""]
+    for i, name in enumerate(adapter_names(adapter_count, locale)):
+        subnet = f"{i // 256}.{i % 256}"
+        if released:
+            address = field(labels['autoconf'], f"169.254.{i // 256 + 1}.{i % 256}({labels['preferred']})")
+        else:
+            address = field(labels['ipv4'], f"10.{subnet}.10({labels['preferred']})")
+        lines += [
+            f"{labels['header']} {name}:",
+            "",
+            field(labels['suffix']),
+            field(labels['description'], f"Intel(R) Ethernet Connection #{i + 1}"),
+            field(labels['mac'], f"00-1B-21-00-{i // 256:02X}-{i % 256:02X}"),
+            field(labels['dhcp'], labels['yes']),
+            address,
+            field(labels['gateway'], f"10.{subnet}.1"),
+            "",
+        ]
+    return "\r\n".join(lines).encode(labels['encoding'])
+
+
+def build_synthetic_transcript(adapter_count, latencies=None, locale='zh-CN'):
+    """
+    Build a transcript covering every command of one repair run
+
+    Args:
+        adapter_count: Number of adapters reported by ipconfig
+        latencies: Optional overrides for SYNTHETIC_LATENCIES
+        locale: Display language of the ipconfig output, from IPCONFIG_LOCALES
+
+    Returns:
+        dict: Transcript in the format written by RecordingRunner.save
+    """
+    latencies = {**SYNTHETIC_LATENCIES, **(latencies or {})}
+
+    def latency(args):
+        key = tuple(args[:2])
+        if key in latencies:
+            return latencies[key]
+        return latencies.get(args[0], 0.0)
+
+    # ipconfig /all runs for discovery, for the release poll and for the report
+    outputs = [
+        build_ipconfig_output(adapter_count, locale=locale),
+        build_ipconfig_output(adapter_count, released=True, locale=locale),
+        build_ipconfig_output(adapter_count, locale=locale),
+    ]
+    configure_batch = NetshBatch()
+    names = adapter_names(adapter_count, locale)
+    for name in names:
+        configure_batch.add(["interface", "ip", "set", "address", name, "source=dhcp"])
+        configure_batch.add(["interface", "ip", "set", "dnsservers", name, "source=dhcp"])
+    winsock_batch = NetshBatch()
+    winsock_batch.add(["winsock", "reset"])
+    # Script files are matched by name, whatever directory they are written to
+    args_list = [
+        ["netsh", "-f", netsh_script_name(configure_batch)],
+        ["netsh", "-f", netsh_script_name(winsock_batch)],
+        ["ipconfig", "/flushdns"],
+    ]
+    # Leases are released and renewed per repaired adapter
+    args_list += [["ipconfig", "/release", name] for name in names]
+    args_list += [["ipconfig", "/renew", name] for name in names]
+
+    commands = []
+    for args in args_list:
+        # ipconfig /renew prints the renewed configuration
+        stdout = outputs[0] if args[1] == "/renew" else b""
+        commands.append(CommandResult(args, 0, stdout, b"", latency(args)).to_dict())
+    for stdout in outputs:
+        args = ["ipconfig", "/all"]
+        commands.append(CommandResult(args, 0, stdout, b"", latency(args)).to_dict())
+    return {'version': 1, 'platform': 'synthetic', 'commands': commands}
+
+
+_print_lock = threading.Lock()
+
+
+def print_line(message):
+    """Print a log line; repair operations log from several threads"""
+    with _print_lock:
+        print(message)
+
+
+def run_benchmark(transcript, runs=1, speed=1.0, log_callback=None):
+    """
+    Run the pipeline repeatedly against a transcript
+
+    Args:
+        transcript: Transcript dictionary
+        runs: Number of repetitions
+        speed: Latency multiplier passed to ReplayRunner
+        log_callback: Optional log callback for pipeline output
+
+    Returns:
+        dict: Median 'total' and per-step medians in 'steps', plus raw 'runs'
+    """
+    samples = []
+    for _ in range(runs):
+        runner = ReplayRunner.from_transcript(transcript, speed)
+        # Triage probes the live network, which would make runs incomparable
+        result = run_repair(log_callback=log_callback, runner=runner, triage=False, trace=False,
+                            history=False)
+        result['misses'] = runner.misses
+        samples.append(result)
+
+    step_names = [step['name'] for step in samples[0]['steps']]
+    return {
+        'total': statistics.median(sample['duration'] for sample in samples),
+        'steps': {
+            name: statistics.median(sample['steps'][i]['duration'] for sample in samples)
+            for i, name in enumerate(step_names)
+        },
+        'runs': samples,
+    }
+
+
+def compare_to_baseline(summary, baseline, tolerance):
+    """
+    Check a benchmark summary against a baseline
+
+    Returns:
+        bool: True if the total time is within tolerance of the baseline
+    """
+    limit = baseline['total'] * (1 + tolerance)
+    return summary['total'] <= limit
+
+
+def measure(func, runs, number=1):
+    """
+    Time a function
+
+    Args:
+        func: Function called without arguments
+        runs: Number of samples
+        number: Calls per sample, for functions too fast to time alone
+
+    Returns:
+        float: Median seconds per call
+    """
+    samples = []
+    for _ in range(max(1, runs)):
+        start = time.perf_counter()
+        for _ in range(number):
+            func()
+        samples.append((time.perf_counter() - start) / number)
+    return statistics.median(samples)
+
+
+def bench_parser(adapter_count, locale, runs=SUITE_RUNS):
+    """
+    Time adapter discovery on a synthetic 'ipconfig /all' output
+
+    Args:
+        adapter_count: Number of adapters in the output
+        locale: Display language from IPCONFIG_LOCALES
+        runs: Number of samples
+
+    Returns:
+        float: Median seconds per get_ethernet_adapters call
+    """
+    output = build_ipconfig_output(adapter_count, locale=locale)
+    runner = ReplayRunner([CommandResult(["ipconfig", "/all"], 0, output, b"", 0.0)], speed=0)
+
+    def discover():
+        # Parse on every call instead of answering from the cached snapshot
+        invalidate_snapshot()
+        return get_ethernet_adapters(runner=runner)
+
+    found = len(discover())
+    if found != adapter_count:
+        raise RuntimeError(f"Parser found {found} of {adapter_count} adapters in the {locale} output")
+    try:
+        return measure(discover, runs, number=max(1, 200 // adapter_count))
+    finally:
+        invalidate_snapshot()
+
+
+def bench_log_pipeline(line_count, runs=SUITE_RUNS):
+    """
+    Time the GUI log pipeline without a display
+
+    Lines are posted to a UiEventChannel and drained in batches into a
+    LogBuffer, as NetworkRepairGUI.process_events does; only the Tk widget
+    calls are left out.
+
+    Args:
+        line_count: Number of log lines
+        runs: Number of samples
+
+    Returns:
+        float: Median seconds for all lines
+    """
+    def pipeline():
+        channel = UiEventChannel(notify=lambda: None)
+        log_buffer = LogBuffer()
+        for _ in range(line_count):
+            channel.post(LogEvent(SAMPLE_LOG_LINE))
+        more = True
+        while more:
+            events, more = channel.drain()
+            log_buffer.append([event.message for event in events if isinstance(event, LogEvent)])
+        if len(log_buffer.lines) != line_count:
+            raise RuntimeError(f"Log pipeline kept {len(log_buffer.lines)} of {line_count} lines")
+
+    return measure(pipeline, runs)
+
+
+def run_suite(runs=SUITE_RUNS, speed=1.0, latencies=None, quick=False, log_callback=None):
+    """
+    Run every microbenchmark
+
+    Args:
+        runs: Samples per benchmark
+        speed: Latency multiplier for the pipeline runs, 0 for no sleeping
+        latencies: Overrides for SYNTHETIC_LATENCIES in the pipeline runs
+        quick: Use the smaller QUICK_* sizes
+        log_callback: Receives one line per finished benchmark
+
+    Returns:
+        dict: Benchmark name to median seconds
+    """
+    parser_sizes = QUICK_PARSER_ADAPTERS if quick else SUITE_PARSER_ADAPTERS
+    log_sizes = QUICK_LOG_LINES if quick else SUITE_LOG_LINES
+    pipeline_sizes = QUICK_PIPELINE_ADAPTERS if quick else SUITE_PIPELINE_ADAPTERS
+
+    results = {}
+
+    def report(name, seconds, detail=""):
+        results[name] = seconds
+        if log_callback:
+            log_callback(f"  {name:<28} {seconds * 1000:12.3f}ms{detail}")
+
+    for locale in IPCONFIG_LOCALES:
+        for adapter_count in parser_sizes:
+            report(f"parser/{locale}/{adapter_count}", bench_parser(adapter_count, locale, runs))
+    for line_count in log_sizes:
+        seconds = bench_log_pipeline(line_count, runs)
+        report(f"log_pipeline/{line_count}", seconds, f"  ({line_count / seconds:,.0f} lines/s)")
+    for adapter_count in pipeline_sizes:
+        transcript = build_synthetic_transcript(adapter_count, latencies)
+        summary = run_benchmark(transcript, runs, speed)
+        report(f"pipeline/{adapter_count}", summary['total'])
+    return results
+
+
+def compare_suite(results, baseline, tolerance):
+    """
+    Check suite results against a baseline
+
+    Args:
+        results: Result of run_suite
+        baseline: Benchmark name to seconds
+        tolerance: Allowed relative regression
+
+    Returns:
+        list: (name, seconds, baseline seconds) of every regressed benchmark;
+        benchmarks missing from either side are not compared
+    """
+    return [
+        (name, seconds, baseline[name])
+        for name, seconds in results.items()
+        if name in baseline and seconds > baseline[name] * (1 + tolerance)
+    ]
+
+
+def parse_latency(value):
+    """
+    Parse a --latency option such as 'ipconfig /renew=0.5' or 'netsh=0.2'
+
+    Returns:
+        tuple: (SYNTHETIC_LATENCIES key, seconds)
+    """
+    command, _, seconds = value.rpartition('=')
+    words = tuple(command.split())
+    try:
+        seconds = float(seconds)
+    except ValueError:
+        seconds = -1.0
+    if not words or len(words) > 2 or seconds < 0:
+        raise argparse.ArgumentTypeError("expected COMMAND=SECONDS, e.g. 'ipconfig /renew=0.5'")
+    return (words if len(words) == 2 else words[0]), seconds
+
+
+def suite_main(args):
+    """Run the microbenchmark suite and compare it with a baseline"""
+    latencies = dict(args.latency or [])
+    print(f"Running the {'quick ' if args.quick else ''}benchmark suite...")
+    results = run_suite(args.runs or SUITE_RUNS, args.speed, latencies, args.quick, print_line)
+
+    if args.save_baseline:
+        with open(args.save_baseline, 'w', encoding='utf-8') as f:
+            json.dump({'benchmarks': results}, f, indent=2)
+        print(f"Baseline saved to {args.save_baseline}")
+
+    if args.baseline:
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)['benchmarks']
+        regressions = compare_suite(results, baseline, args.tolerance)
+        for name, seconds, expected in regressions:
+            print(f"❌ Regression: {name} took {seconds * 1000:.3f}ms, baseline {expected * 1000:.3f}ms")
+        if regressions:
+            return 1
+        print(f"✅ {len(set(results) & set(baseline))} benchmarks within {args.tolerance:.0%} of baseline")
+    return 0
+
+
+def record_live_run(path):
+    """Run a real repair on this machine and save its transcript"""
+    runner = RecordingRunner()
+    run_repair(log_callback=print_line, runner=runner)
+    runner.save(path)
+    print(f"Recorded {len(runner.results)} commands to {path}")
+
+
+def main(argv=None):
+    """Benchmark command line entry"""
+    parser = argparse.ArgumentParser(description="Benchmark the network repair pipeline")
+    parser.add_argument("transcript", nargs="?", help="Transcript file recorded with --record")
+    parser.add_argument("--record", metavar="PATH", help="Record a live repair to PATH")
+    parser.add_argument("--synthetic", type=int, metavar="N", help="Use a synthetic transcript with N adapters")
+    parser.add_argument("--locale", choices=IPCONFIG_LOCALES, default='zh-CN',
+                        help="Display language of the synthetic ipconfig output")
+    parser.add_argument("--suite", action="store_true",
+                        help="Run the parser, log pipeline and pipeline microbenchmarks")
+    parser.add_argument("--quick", action="store_true", help="Use smaller sizes in the suite")
+    parser.add_argument("--latency", type=parse_latency, action="append", metavar="COMMAND=SECONDS",
+                        help="Override a synthetic command latency, e.g. 'ipconfig /renew=0.5'; repeatable")
+    parser.add_argument("--runs", type=int, default=None,
+                        help=f"Number of repetitions (default: 1, or {SUITE_RUNS} per benchmark with --suite)")
+    parser.add_argument("--speed", type=float, default=1.0, help="Latency multiplier, 0 for no sleeping")
+    parser.add_argument("--baseline", help="Baseline JSON file to compare against")
+    parser.add_argument("--save-baseline", metavar="PATH", help="Save this result as a baseline")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Allowed regression over baseline")
+    parser.add_argument("--verbose", action="store_true", help="Print pipeline log output")
+    args = parser.parse_args(argv)
+
+    if args.record:
+        record_live_run(args.record)
+        return 0
+
+    if args.suite:
+        return suite_main(args)
+
+    if args.synthetic:
+        transcript = build_synthetic_transcript(args.synthetic, dict(args.latency or []), args.locale)
+    elif args.transcript:
+        with open(args.transcript, 'r', encoding='utf-8') as f:
+            transcript = json.load(f)
+    else:
+        parser.error("a transcript file or --synthetic is required")
+
+    summary = run_benchmark(transcript, args.runs or 1, args.speed,
+                            log_callback=print_line if args.verbose else None)
+
+    for name, duration in summary['steps'].items():
+        print(f"  {name:<24} {duration:8.3f}s")
+    print(f"  {'Total':<24} {summary['total']:8.3f}s")
+    misses = summary['runs'][-1]['misses']
+    if misses:
+        print(f"⚠️ {len(misses)} commands had no recorded output: {misses}")
+
+    if args.save_baseline:
+        with open(args.save_baseline, 'w', encoding='utf-8') as f:
+            json.dump({'total': summary['total'], 'steps': summary['steps']}, f, indent=2)
+        print(f"Baseline saved to {args.save_baseline}")
+
+    if args.baseline:
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+        if not compare_to_baseline(summary, baseline, args.tolerance):
+            print(f"❌ Regression: {summary['total']:.3f}s exceeds baseline "
+                  f"{baseline['total']:.3f}s by more than {args.tolerance:.0%}")
+            return 1
+        print(f"✅ Within {args.tolerance:.0%} of baseline {baseline['total']:.3f}s")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
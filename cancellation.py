@@ -0,0 +1,106 @@
+"""Cancellation Module
+
+Cooperative cancellation for the repair pipeline. A CancellationToken is
+handed to command runners and the repair engine; cancelling it kills the
+running child processes and makes every later command fail fast. Child
+tokens are cancelled together with their parent, so a single operation can
+be stopped on timeout without cancelling the whole repair.
+"""
+import threading
+
+
+class RepairInterrupted(Exception):
+    """Base class for errors that must abort a repair operation"""
+
+
+class OperationCancelled(RepairInterrupted):
+    """Raised when work is attempted after its token was cancelled"""
+
+
+class CommandTimeoutError(RepairInterrupted):
+    """Raised when a command did not finish within its timeout"""
+
+    def __init__(self, args, timeout):
+        super().__init__(f"'{' '.join(args)}' timed out after {timeout:g}s")
+        self.command = list(args)
+        self.timeout = timeout
+
+
+class CancellationToken:
+    """Thread-safe cancellation flag with callbacks"""
+
+    def __init__(self, parent=None):
+        """
+        Args:
+            parent: Token whose cancellation also cancels this one
+        """
+        self.reason = None
+        self._event = threading.Event()
+        self._lock = threading.Lock()
+        self._callbacks = []
+        if parent is not None:
+            parent.on_cancel(lambda: self.cancel(parent.reason))
+
+    @property
+    def cancelled(self):
+        """Whether cancel() has been called"""
+        return self._event.is_set()
+
+    def cancel(self, reason="cancelled"):
+        """
+        Cancel the token and run its callbacks once
+
+        Args:
+            reason: Message used by OperationCancelled
+        """
+        with self._lock:
+            if self._event.is_set():
+                return
+            self.reason = reason
+            self._event.set()
+            callbacks, self._callbacks = self._callbacks, []
+        for callback in callbacks:
+            try:
+                callback()
+            except Exception:
+                pass
+
+    def on_cancel(self, callback):
+        """
+        Register a callback run on cancellation, immediately if already cancelled
+
+        Args:
+            callback: Callable without arguments, may run on any thread
+
+        Returns:
+            Callable that unregisters the callback
+        """
+        with self._lock:
+            if not self._event.is_set():
+                self._callbacks.append(callback)
+                return lambda: self._unregister(callback)
+        callback()
+        return lambda: None
+
+    def _unregister(self, callback):
+        with self._lock:
+            if callback in self._callbacks:
+                self._callbacks.remove(callback)
+
+    def raise_if_cancelled(self):
+        """Raise OperationCancelled if the token was cancelled"""
+        if self._event.is_set():
+            raise OperationCancelled(self.reason)
+
+    def wait(self, timeout=None):
+        """
+        Sleep until cancelled or the timeout expires
+
+        Returns:
+            bool: True if the token was cancelled
+        """
+        return self._event.wait(timeout)
+
+    def child(self):
+        """Create a token that is cancelled together with this one"""
+        return CancellationToken(self)
@@ -0,0 +1,195 @@
+"""Headless Command Line Module
+
+Runs the repair pipeline without any GUI toolkit, streaming progress to
+stdout and finishing with a JSON result for management agents. This module
+must never import tkinter or customtkinter.
+"""
+import argparse
+import json
+import sys
+import threading
+
+from adapter_classifier import ADAPTER_CLASSES
+from cancellation import CancellationToken
+from constants import REPAIR_STEPS, REPAIR_ADAPTER_CLASSES
+
+
+# Process exit codes; 2 is left to argparse for usage errors
+EXIT_SUCCESS = 0
+EXIT_REPAIR_FAILED = 1
+EXIT_NO_ADAPTERS = 3
+EXIT_NOT_ADMIN = 4
+EXIT_ERROR = 5
+EXIT_CANCELLED = 6
+
+_print_lock = threading.Lock()
+
+
+def print_line(message, stream=None):
+    """Print a line and flush it; repair operations log from several threads"""
+    with _print_lock:
+        print(message, file=stream or sys.stdout, flush=True)
+
+
+def print_progress(step_index, status):
+    """Print a step status change"""
+    print_line(f"[{step_index + 1}/{len(REPAIR_STEPS)}] {REPAIR_STEPS[step_index]}: {status}")
+
+
+def exit_code_for(result):
+    """
+    Map a repair result to a process exit code
+
+    Args:
+        result: Result of run_repair
+
+    Returns:
+        int: One of the EXIT_* codes
+    """
+    if result['success']:
+        return EXIT_SUCCESS
+    if result.get('cancelled'):
+        return EXIT_CANCELLED
+    if result['adapters'] == 0:
+        return EXIT_NO_ADAPTERS
+    return EXIT_REPAIR_FAILED
+
+
+def parse_classes(value):
+    """Parse the --adapter-classes option"""
+    classes = tuple(name.strip() for name in value.split(',') if name.strip())
+    unknown = [name for name in classes if name not in ADAPTER_CLASSES]
+    if unknown or not classes:
+        raise argparse.ArgumentTypeError(f"choose from {', '.join(ADAPTER_CLASSES)}")
+    return classes
+
+
+def build_parser():
+    """Create the command line parser"""
+    parser = argparse.ArgumentParser(
+        prog="network_repair --headless",
+        description="Repair the network without a GUI and report the result as JSON",
+    )
+    parser.add_argument("--quiet", action="store_true", help="Print only the JSON result")
+    parser.add_argument("--output", metavar="PATH", help="Also write the JSON result to PATH")
+    parser.add_argument("--no-triage", action="store_true", help="Run every repair operation")
+    parser.add_argument("--dry-run", action="store_true",
+                        help="Only show the compiled repair plan and its estimated cost; changes nothing")
+    parser.add_argument("--no-trace", action="store_true", help="Do not record a timing trace")
+    parser.add_argument("--no-history", action="store_true",
+                        help="Neither use nor update the local repair history")
+    parser.add_argument("--adapter-classes", type=parse_classes, default=None, metavar="CLASSES",
+                        help="Comma-separated adapter classes to repair: "
+                             f"{', '.join(ADAPTER_CLASSES)} (default: {', '.join(REPAIR_ADAPTER_CLASSES)})")
+    parser.add_argument("--process-backend", action="store_true",
+                        help="Run ipconfig as child processes instead of calling the IP Helper API")
+    parser.add_argument("--replay", metavar="TRANSCRIPT",
+                        help="Replay a recorded transcript instead of running commands")
+    return parser
+
+
+def main(argv=None):
+    """
+    Headless entry point
+
+    Args:
+        argv: Command line arguments, defaults to sys.argv[1:]
+
+    Returns:
+        int: Process exit code
+    """
+    args = build_parser().parse_args(argv)
+
+    # Agents often capture stdout with a legacy code page; never fail on emoji
+    if hasattr(sys.stdout, 'reconfigure'):
+        sys.stdout.reconfigure(errors='replace')
+
+    runner = None
+    if args.replay:
+        from command_runner import ReplayRunner
+        runner = ReplayRunner.load(args.replay)
+    else:
+        # A dry run only reads the network state and needs no elevation
+        from admin_utils import is_admin
+        if not args.dry_run and not is_admin():
+            # There is nobody to answer an elevation prompt in headless mode
+            print_line("Administrator privileges are required to run this program", sys.stderr)
+            return EXIT_NOT_ADMIN
+        if not args.process_backend:
+            from iphelper import create_runner
+            runner = create_runner()
+
+    log = None if args.quiet else print_line
+    if args.dry_run:
+        return dry_run(args, log, runner)
+
+    from repair_pipeline import run_repair
+
+    progress = None if args.quiet else print_progress
+    token = CancellationToken()
+    outcome = {}
+    finished = threading.Event()
+
+    def repair():
+        try:
+            outcome['result'] = run_repair(log_callback=log, progress_callback=progress, runner=runner,
+                                           triage=not args.no_triage, trace=not args.no_trace,
+                                           history=not args.no_history, token=token,
+                                           adapter_classes=args.adapter_classes or REPAIR_ADAPTER_CLASSES)
+        except Exception as e:
+            outcome['error'] = str(e) or type(e).__name__
+        finally:
+            finished.set()
+
+    # Repair on a worker thread so Ctrl+C can cancel it cleanly. Waiting on
+    # an event with a timeout keeps the main thread responsive to Ctrl+C;
+    # Thread.join is unreliable once interrupted.
+    threading.Thread(target=repair, daemon=True).start()
+    try:
+        while not finished.wait(0.2):
+            pass
+    except KeyboardInterrupt:
+        print_line("🛑 Cancelling repair...", sys.stderr)
+        token.cancel("interrupted")
+        finished.wait()
+
+    if 'result' in outcome:
+        result = outcome['result']
+        result['exit_code'] = exit_code_for(result)
+    else:
+        result = {'success': False, 'error': outcome.get('error'), 'exit_code': EXIT_ERROR}
+
+    return print_result(result, args.output)
+
+
+def dry_run(args, log, runner):
+    """Compile and print the repair plan without running it"""
+    from repair_pipeline import plan_repair
+
+    try:
+        result = plan_repair(log_callback=log, runner=runner, triage=not args.no_triage,
+                             adapter_classes=args.adapter_classes or REPAIR_ADAPTER_CLASSES)
+        result['exit_code'] = EXIT_SUCCESS if result['adapters'] else EXIT_NO_ADAPTERS
+    except Exception as e:
+        result = {'plan': None, 'error': str(e) or type(e).__name__, 'exit_code': EXIT_ERROR}
+    result['dry_run'] = True
+    return print_result(result, args.output)
+
+
+def print_result(result, output_path=None):
+    """
+    Print the JSON result and optionally save it
+
+    Returns:
+        int: The result's exit code
+    """
+    output = json.dumps(result, ensure_ascii=False, indent=2, default=str)
+    if output_path:
+        with open(output_path, 'w', encoding='utf-8') as f:
+            f.write(output)
+    print_line(output)
+    return result['exit_code']
+
+
+if __name__ == "__main__":
+    sys.exit(main())
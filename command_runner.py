@@ -0,0 +1,458 @@
+"""Command Runner Module
+
+All external commands (ipconfig, netsh, ...) are executed through a runner so
+that a repair can be recorded on a live Windows machine and replayed anywhere.
+"""
+import base64
+import codecs
+import json
+import locale
+import ntpath
+import os
+import platform
+import subprocess
+import threading
+import time
+from collections import defaultdict, deque
+
+from cancellation import CommandTimeoutError, OperationCancelled
+from constants import COMMAND_TIMEOUTS, DEFAULT_COMMAND_TIMEOUT
+from ipconfig_parser import detect_encoding, get_console_encoding
+from tracing import trace_span
+
+
+TRANSCRIPT_VERSION = 1
+
+
+def get_startupinfo():
+    """Get subprocess startup information to hide console window"""
+    startupinfo = subprocess.STARTUPINFO()
+    startupinfo.dwFlags |= subprocess.STARTF_USESHOWWINDOW
+    startupinfo.wShowWindow = subprocess.SW_HIDE
+    return startupinfo
+
+
+def decode_output(data, encoding=None):
+    """
+    Decode command output bytes
+
+    Args:
+        data: Raw output bytes
+        encoding: Encoding to use, defaults to the preferred locale encoding
+
+    Returns:
+        str: Decoded text
+    """
+    if not data:
+        return ""
+    return data.decode(encoding or locale.getpreferredencoding(False), errors='replace')
+
+
+def stream_lines(pipe, on_line, encoding=None, keep=None, chunk_size=4096):
+    """
+    Forward a pipe to a callback line by line as the data arrives
+
+    Bytes are decoded incrementally, so multi-byte characters split across
+    reads are decoded correctly and only the current partial line is held.
+
+    Args:
+        pipe: Binary pipe of a child process
+        on_line: Receives each line without its line ending
+        encoding: Encoding to use, defaults to the console code page
+        keep: Optional list that receives the raw chunks
+
+    Returns:
+        int: Number of bytes read
+    """
+    encoding = encoding or get_console_encoding() or locale.getpreferredencoding(False)
+    decoder = codecs.getincrementaldecoder(encoding)(errors='replace')
+    read = getattr(pipe, 'read1', pipe.read)
+    pending = ""
+    total = 0
+    while True:
+        chunk = read(chunk_size)
+        final = not chunk
+        total += len(chunk)
+        if keep is not None and chunk:
+            keep.append(chunk)
+        lines = (pending + decoder.decode(chunk, final)).split("\n")
+        # The last piece is an unfinished line; keep it for the next read
+        pending = lines.pop()
+        if final and pending:
+            lines.append(pending)
+        for line in lines:
+            on_line(line.rstrip("\r"))
+        if final:
+            return total
+
+
+def command_key(args):
+    """
+    Key used to match a command against a transcript
+
+    Absolute file paths (e.g. generated script files) are reduced to their
+    file name so transcripts replay on machines with a different temp directory.
+    Switches such as '/all' are left untouched.
+    """
+    return tuple(
+        ntpath.basename(arg) if _is_file_path(arg) else arg
+        for arg in args
+    )
+
+
+def command_timeout(args):
+    """
+    Look up the timeout of a command in COMMAND_TIMEOUTS
+
+    Args:
+        args: Command argument list
+
+    Returns:
+        float: Timeout in seconds
+    """
+    # The program may be given as a full path, with or without '.exe'
+    program = ntpath.splitext(ntpath.basename(args[0]))[0] if args else ""
+    normalized = tuple(arg.lower() for arg in [program] + list(args[1:2]))
+    for length in (2, 1):
+        timeout = COMMAND_TIMEOUTS.get(normalized[:length])
+        if timeout is not None:
+            return timeout
+    return DEFAULT_COMMAND_TIMEOUT
+
+
+def command_span_name(args):
+    """Short display name for a command in trace spans"""
+    return " ".join(command_key(args[:4]))
+
+
+def _is_file_path(arg):
+    """Check whether an argument is an absolute path with a directory part"""
+    return (ntpath.isabs(arg) or os.path.isabs(arg)) and ('\\' in arg or '/' in arg[1:])
+
+
+class CommandResult:
+    """Result of a single external command"""
+
+    def __init__(self, args, returncode=0, stdout=b"", stderr=b"", duration=0.0):
+        self.args = list(args)
+        self.returncode = returncode
+        self.stdout = stdout
+        self.stderr = stderr
+        self.duration = duration
+
+    def stdout_text(self, encoding=None):
+        """Return stdout decoded as text"""
+        return decode_output(self.stdout, encoding)
+
+    def stderr_text(self, encoding=None):
+        """Return stderr decoded as text"""
+        return decode_output(self.stderr, encoding)
+
+    def to_dict(self):
+        """Serialize to a transcript entry"""
+        return {
+            'args': self.args,
+            'returncode': self.returncode,
+            'stdout': base64.b64encode(self.stdout).decode('ascii'),
+            'stderr': base64.b64encode(self.stderr).decode('ascii'),
+            'duration': self.duration,
+        }
+
+    @classmethod
+    def from_dict(cls, entry):
+        """Deserialize a transcript entry"""
+        return cls(
+            entry['args'],
+            returncode=entry.get('returncode', 0),
+            stdout=base64.b64decode(entry.get('stdout', '')),
+            stderr=base64.b64decode(entry.get('stderr', '')),
+            duration=entry.get('duration', 0.0),
+        )
+
+
+def trace_result(span, result):
+    """Add return code and output sizes of a command to its trace span"""
+    span['returncode'] = result.returncode
+    span['stdout_bytes'] = len(result.stdout)
+    span['stderr_bytes'] = len(result.stderr)
+
+
+class SubprocessRunner:
+    """Runs commands as real child processes"""
+
+    def __init__(self, keep_streamed_output=False):
+        """
+        Args:
+            keep_streamed_output: Also keep the output of streamed commands in
+                the result; needed when the results are recorded
+        """
+        self.keep_streamed_output = keep_streamed_output
+
+    def run(self, args, timeout=None, token=None, on_output=None):
+        """
+        Run a command and capture its output
+
+        Args:
+            args: Command argument list
+            timeout: Seconds before the process is killed, defaults to command_timeout()
+            token: CancellationToken; cancelling it kills the process
+            on_output: Receives stdout and stderr line by line while the
+                command runs; the output is then not buffered in the result
+                unless keep_streamed_output is set
+
+        Returns:
+            CommandResult: Captured result
+
+        Raises:
+            CommandTimeoutError: The command did not finish in time
+            OperationCancelled: The token was cancelled
+        """
+        if timeout is None:
+            timeout = command_timeout(args)
+        if token is not None:
+            token.raise_if_cancelled()
+        kwargs = {}
+        if os.name == 'nt':
+            kwargs['startupinfo'] = get_startupinfo()
+        with trace_span(command_span_name(args), 'command', argv=list(args)) as span:
+            start = time.perf_counter()
+            process = subprocess.Popen(args, stdin=subprocess.DEVNULL, stdout=subprocess.PIPE,
+                                       stderr=subprocess.PIPE, **kwargs)
+            unregister = token.on_cancel(process.kill) if token is not None else None
+            try:
+                if on_output is None:
+                    stdout, stderr = self._communicate(process, args, timeout, span)
+                else:
+                    stdout, stderr, streamed = self._stream(process, args, timeout, span, on_output)
+            finally:
+                if unregister is not None:
+                    unregister()
+            if token is not None:
+                token.raise_if_cancelled()
+            duration = time.perf_counter() - start
+            result = CommandResult(args, process.returncode, stdout or b"", stderr or b"", duration)
+            trace_result(span, result)
+            if on_output is not None:
+                span['stdout_bytes'], span['stderr_bytes'] = streamed
+        return result
+
+    def _communicate(self, process, args, timeout, span):
+        """Wait for the process and return its buffered output"""
+        try:
+            return process.communicate(timeout=timeout)
+        except subprocess.TimeoutExpired:
+            process.kill()
+            process.communicate()
+            span['timeout'] = timeout
+            raise CommandTimeoutError(args, timeout)
+
+    def _stream(self, process, args, timeout, span, on_output):
+        """
+        Forward the output of the process line by line while waiting for it
+
+        Returns:
+            tuple: (stdout, stderr, (stdout_bytes, stderr_bytes)); the output
+            is empty unless keep_streamed_output is set
+        """
+        chunks = ([], []) if self.keep_streamed_output else (None, None)
+        sizes = [0, 0]
+
+        def pump(index, pipe):
+            try:
+                sizes[index] = stream_lines(pipe, on_output, keep=chunks[index])
+            finally:
+                pipe.close()
+
+        readers = [
+            threading.Thread(target=pump, args=(index, pipe), daemon=True)
+            for index, pipe in enumerate((process.stdout, process.stderr))
+        ]
+        for reader in readers:
+            reader.start()
+        try:
+            process.wait(timeout=timeout)
+        except subprocess.TimeoutExpired:
+            process.kill()
+            process.wait()
+            span['timeout'] = timeout
+            raise CommandTimeoutError(args, timeout)
+        finally:
+            for reader in readers:
+                reader.join()
+        if chunks[0] is None:
+            return b"", b"", tuple(sizes)
+        return b"".join(chunks[0]), b"".join(chunks[1]), tuple(sizes)
+
+
+class RecordingRunner:
+    """Runs commands through another runner and records every result"""
+
+    def __init__(self, runner=None):
+        self.runner = runner or SubprocessRunner(keep_streamed_output=True)
+        self.results = []
+        self._lock = threading.Lock()
+
+    def run(self, args, timeout=None, token=None, on_output=None):
+        """Run a command and append its result to the transcript"""
+        result = self.runner.run(args, timeout=timeout, token=token, on_output=on_output)
+        with self._lock:
+            self.results.append(result)
+        return result
+
+    def save(self, path):
+        """
+        Save the recorded transcript as JSON
+
+        Args:
+            path: Output file path
+        """
+        with self._lock:
+            commands = [result.to_dict() for result in self.results]
+        transcript = {
+            'version': TRANSCRIPT_VERSION,
+            'recorded_at': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'platform': platform.platform(),
+            'commands': commands,
+        }
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(transcript, f, indent=2)
+
+
+class ReplayRunner:
+    """
+    Plays back a recorded transcript
+
+    Commands are matched by command_key() in recording order. When a
+    command runs more often than it was recorded, its last result is reused.
+    """
+
+    def __init__(self, commands, speed=1.0):
+        """
+        Args:
+            commands: List of CommandResult objects
+            speed: Latency multiplier, 0 disables sleeping entirely
+        """
+        self.speed = speed
+        self.misses = []
+        self._queues = defaultdict(deque)
+        self._last = {}
+        self._lock = threading.Lock()
+        for result in commands:
+            self._queues[command_key(result.args)].append(result)
+
+    @classmethod
+    def load(cls, path, speed=1.0):
+        """Load a transcript file written by RecordingRunner.save"""
+        with open(path, 'r', encoding='utf-8') as f:
+            transcript = json.load(f)
+        return cls.from_transcript(transcript, speed)
+
+    @classmethod
+    def from_transcript(cls, transcript, speed=1.0):
+        """Create a runner from an already loaded transcript dictionary"""
+        commands = [CommandResult.from_dict(entry) for entry in transcript['commands']]
+        return cls(commands, speed)
+
+    def run(self, args, timeout=None, token=None, on_output=None):
+        """
+        Return the recorded result for a command after its recorded latency
+
+        A recorded duration longer than the timeout raises CommandTimeoutError
+        after waiting for the (scaled) timeout, as the live command would.
+        With on_output, the recorded output lines are forwarded before the
+        result is returned.
+        """
+        if timeout is None:
+            timeout = command_timeout(args)
+        if token is not None:
+            token.raise_if_cancelled()
+        key = command_key(args)
+        with self._lock:
+            pending = self._queues.get(key)
+            if pending:
+                recorded = pending.popleft()
+                self._last[key] = recorded
+            else:
+                recorded = self._last.get(key)
+            if recorded is None:
+                self.misses.append(list(args))
+        if recorded is None:
+            return CommandResult(args, returncode=-1,
+                                 stderr=b"no recorded output for this command")
+        with trace_span(command_span_name(args), 'command', argv=list(args), replay=True) as span:
+            timed_out = recorded.duration > timeout
+            delay = (timeout if timed_out else recorded.duration) * self.speed
+            if delay > 0:
+                if token is not None:
+                    if token.wait(delay):
+                        raise OperationCancelled(token.reason)
+                else:
+                    time.sleep(delay)
+            if timed_out:
+                span['timeout'] = timeout
+                raise CommandTimeoutError(args, timeout)
+            result = CommandResult(args, recorded.returncode, recorded.stdout,
+                                   recorded.stderr, recorded.duration)
+            trace_result(span, result)
+        if on_output is not None:
+            for output in (result.stdout, result.stderr):
+                if output:
+                    for line in decode_output(output, detect_encoding(output)).splitlines():
+                        on_output(line)
+        return result
+
+
+class CancellableRunner:
+    """Passes a cancellation token to every command of another runner"""
+
+    def __init__(self, runner, token):
+        """
+        Args:
+            runner: Runner executing the commands
+            token: CancellationToken applied to commands run without one
+        """
+        self.runner = runner
+        self.token = token
+
+    def run(self, args, timeout=None, token=None, on_output=None):
+        """Run a command on the wrapped runner with this runner's token"""
+        return self.runner.run(args, timeout=timeout, token=token or self.token, on_output=on_output)
+
+    def get_adapters(self):
+        """
+        Enumerate adapters in-process if the wrapped runner can
+
+        Returns:
+            list: Adapter records, or None to fall back to 'ipconfig /all'
+        """
+        get_adapters = getattr(self.runner, 'get_adapters', None)
+        if get_adapters is None:
+            return None
+        if self.token is not None:
+            self.token.raise_if_cancelled()
+        return get_adapters()
+
+
+_default_runner = SubprocessRunner()
+
+
+def get_runner():
+    """Get the runner used when no runner is passed explicitly"""
+    return _default_runner
+
+
+def set_runner(runner):
+    """
+    Replace the default runner
+
+    Args:
+        runner: Any object with a run(args, timeout=None, token=None,
+            on_output=None) method returning CommandResult
+
+    Returns:
+        The previous default runner
+    """
+    global _default_runner
+    previous = _default_runner
+    _default_runner = runner
+    return previous
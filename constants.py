@@ -9,6 +9,156 @@ REPAIR_STEPS = [
     "Complete"
 ]
 
+# Maximum number of netsh commands re-run concurrently when a batch fails
+CONFIGURE_MAX_WORKERS = 8
+
+# Upper bound and poll interval (seconds) while waiting for ipconfig /release
+RELEASE_WAIT_TIMEOUT = 5.0
+RELEASE_POLL_INTERVAL = 0.25
+
+# Adapter classes (see adapter_classifier.py) the repair operates on
+REPAIR_ADAPTER_CLASSES = ("physical",)
+
+# Declarative repair plan, compiled into the operations of a run by
+# repair_plan.compile_plan. Operations are listed in execution order:
+#   step        Index in REPAIR_STEPS the operation is shown under
+#   after       Operations that must finish first when they are planned
+#   commands    What the operation runs; '{adapter}' expands to every adapter
+#   effects     System state the operation establishes
+#   idempotent  Repeating it after it succeeded changes nothing, so it is
+#               redundant once earlier operations established its effects
+#               or already run its commands
+REPAIR_PLAN = {
+    "adapter_reset": {
+        'step': 1,
+        'after': (),
+        'commands': ("netsh interface ip set address {adapter} source=dhcp",
+                     "netsh interface ip set dnsservers {adapter} source=dhcp"),
+        'effects': ("ip_dhcp", "dns_dhcp"),
+        'idempotent': True,
+    },
+    "dns_reset": {
+        'step': 2,
+        'after': ("adapter_reset",),
+        'commands': ("wmi SetDNSServerSearchOrder {adapter}",),
+        'effects': ("dns_dhcp",),
+        'idempotent': True,
+    },
+    "release_renew": {
+        'step': 3,
+        'after': ("adapter_reset", "dns_reset"),
+        'commands': ("ipconfig /release {adapter}", "ipconfig /renew {adapter}"),
+        'effects': ("dhcp_lease",),
+        'idempotent': True,
+    },
+    "flush_dns": {
+        'step': 3,
+        'after': ("release_renew",),
+        'commands': ("ipconfig /flushdns",),
+        'effects': ("dns_cache_flushed",),
+        'idempotent': True,
+    },
+    "proxy_reset": {
+        'step': 3,
+        'after': (),
+        'commands': ("registry ProxyEnable=0",),
+        'effects': ("proxy_disabled",),
+        'idempotent': True,
+    },
+    "winsock_reset": {
+        'step': 3,
+        'after': (),
+        'commands': ("netsh winsock reset",),
+        'effects': ("winsock_catalog_reset",),
+        'idempotent': True,
+    },
+}
+
+# Repair operations that triage can select, in plan order
+REPAIR_OPERATIONS = tuple(REPAIR_PLAN)
+
+# Operations performed by refresh_network_config
+REFRESH_OPERATIONS = tuple(name for name, operation in REPAIR_PLAN.items() if operation['step'] == 3)
+
+# Estimated duration in seconds of plan commands, matched on their first two
+# words, then their first word; used for the dry-run cost estimate
+COMMAND_COST_ESTIMATES = {
+    "ipconfig /release": 1.5,
+    "ipconfig /renew": 4.0,
+    "ipconfig /flushdns": 0.05,
+    "netsh": 0.45,
+    "wmi": 0.3,
+    "registry": 0.01,
+}
+DEFAULT_COMMAND_COST = 0.5
+
+# The netsh commands of one operation run as a single 'netsh -f' batch: the
+# first costs a netsh start ("netsh" above), each further one only this much
+NETSH_BATCH_LINE_COST = 0.02
+
+# Command timeouts in seconds, matched on the leading arguments; commands
+# not listed use DEFAULT_COMMAND_TIMEOUT
+COMMAND_TIMEOUTS = {
+    ("ipconfig", "/renew"): 180.0,
+    ("ipconfig", "/release"): 60.0,
+    ("netsh",): 60.0,
+}
+DEFAULT_COMMAND_TIMEOUT = 30.0
+
+# Time limit in seconds of each repair operation, including all its commands
+OPERATION_TIMEOUTS = {
+    "adapter_reset": 120.0,
+    "dns_reset": 60.0,
+    "release_renew": 300.0,
+    "flush_dns": 30.0,
+    "proxy_reset": 15.0,
+    "winsock_reset": 120.0,
+    "report": 30.0,
+}
+
+# Pre-repair triage: total time budget (seconds) and probe targets
+TRIAGE_BUDGET = 3.0
+TRIAGE_DNS_NAME = "www.msftconnecttest.com"
+TRIAGE_TCP_TARGET = ("223.5.5.5", 53)
+
+# Time budget (seconds) of the connectivity check after each stage of repair
+# operations
+VERIFY_BUDGET = 1.5
+
+# Operations scoring at most this much below the most promising ready one in
+# the repair history run in the same stage, concurrently
+PRIORITY_STAGE_MARGIN = 0.1
+
+# Fleet repair: hosts repaired at the same time, per-host time limit and
+# minimum interval between aggregate progress lines (seconds). The host limit
+# covers every operation running into its own timeout one after another, plus
+# a margin for startup, discovery and triage, so a host always gets to report
+# its own operation timeouts first.
+FLEET_MAX_CONCURRENCY = 16
+FLEET_HOST_MARGIN = 120.0
+FLEET_HOST_TIMEOUT = sum(OPERATION_TIMEOUTS.values()) + FLEET_HOST_MARGIN
+FLEET_PROGRESS_INTERVAL = 1.0
+# Bytes of host output read at a time; lines are split from the chunks so a
+# single long line cannot exceed a stream reader limit
+FLEET_READ_SIZE = 65536
+
+# Execution log: lines kept in the log widget (the full log is kept in
+# memory) and UI events handled per GUI refresh
+LOG_MAX_LINES = 2000
+LOG_BATCH_SIZE = 500
+
+# Log file: size in bytes at which it is rotated, rotated segments kept and
+# whether they are gzipped, longest time (seconds) a message waits in the
+# writer's buffer, and how long closing waits for the writer
+LOG_FILE_MAX_BYTES = 1024 * 1024
+LOG_FILE_BACKUPS = 5
+LOG_FILE_COMPRESS = True
+LOG_FILE_FLUSH_INTERVAL = 0.5
+LOG_FILE_CLOSE_TIMEOUT = 5.0
+
+# Maximum frame rate of GUI animations
+ANIMATION_FPS = 60
+
 # Modern theme color configuration - supports dark/light modes
 THEME_COLORS = {
     'light': {
@@ -38,6 +188,7 @@ STEP_STATUS_CONFIG = {
     "waiting": ("⏳", "text_secondary"),
     "running": ("⏳", "primary"),
     "completed": ("✅", "success"),
+    "skipped": ("⏭️", "text_secondary"),
     "error": ("❌", "error")
 }
 
@@ -0,0 +1,342 @@
+"""Fleet Repair Module
+
+Runs the headless repair on many hosts in parallel. Each host is reached
+through a transport that starts 'network_repair --headless' on it and
+streams its output back; step progress lines feed a live aggregate view and
+the final JSON result of every host is collected into one summary.
+
+Usage:
+    python fleet.py hosts.txt -- psexec \\\\{host} -s C:\\Tools\\network_repair.exe --headless
+    python fleet.py hosts.txt --fake-agent transcript.json
+"""
+import argparse
+import asyncio
+import json
+import os
+import re
+import sys
+import threading
+import time
+
+from cli import (
+    EXIT_SUCCESS, EXIT_REPAIR_FAILED, EXIT_NO_ADAPTERS, EXIT_NOT_ADMIN, EXIT_ERROR, EXIT_CANCELLED,
+)
+from command_runner import decode_output
+from constants import (
+    REPAIR_STEPS, FLEET_MAX_CONCURRENCY, FLEET_HOST_TIMEOUT, FLEET_PROGRESS_INTERVAL, FLEET_READ_SIZE,
+)
+
+
+# Step progress line printed by the headless CLI, e.g. "[2/5] Reset DNS: running"
+PROGRESS_LINE = re.compile(r"^\[(\d+)/(\d+)\] (.+): (\w+)$")
+
+# Host outcome for each headless exit code
+EXIT_STATUSES = {
+    EXIT_SUCCESS: "repaired",
+    EXIT_REPAIR_FAILED: "failed",
+    EXIT_NO_ADAPTERS: "no_adapters",
+    EXIT_NOT_ADMIN: "not_admin",
+    EXIT_ERROR: "error",
+    EXIT_CANCELLED: "cancelled",
+}
+
+
+class CommandTransport:
+    """Reaches a host by running a command template, e.g. psexec or ssh"""
+
+    def __init__(self, template, encoding=None, env=None):
+        """
+        Args:
+            template: Command arguments; '{host}' is replaced with the host name
+            encoding: Output encoding, defaults to the preferred locale encoding
+            env: Environment for the command, defaults to the current one
+        """
+        self.template = list(template)
+        self.encoding = encoding
+        self.env = env
+
+    def command(self, host):
+        """Build the command that repairs one host"""
+        return [argument.replace("{host}", host) for argument in self.template]
+
+
+class LocalAgentTransport(CommandTransport):
+    """
+    Fake agent: repairs every host by replaying a transcript in a local process
+
+    Triage is off so the fake hosts never probe the real network, and the
+    connectivity checks do not use up the transcript's recorded ipconfig
+    output.
+    """
+
+    def __init__(self, transcript):
+        """
+        Args:
+            transcript: Transcript file recorded with 'benchmark.py --record'
+        """
+        main_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "main.py")
+        env = dict(os.environ, PYTHONIOENCODING="utf-8")
+        super().__init__(
+            [sys.executable, main_path, "--headless", "--replay", transcript,
+             "--no-triage", "--no-trace", "--no-history"],
+            encoding="utf-8", env=env,
+        )
+
+
+def parse_headless_output(lines):
+    """
+    Extract the JSON result printed at the end of a headless run
+
+    Args:
+        lines: Decoded output lines
+
+    Returns:
+        dict: The result, or None if it is missing or invalid
+    """
+    # The result is indented JSON; its opening brace is alone on a line
+    for index in range(len(lines) - 1, -1, -1):
+        if lines[index].rstrip() == "{":
+            try:
+                return json.loads("\n".join(lines[index:]))
+            except ValueError:
+                return None
+    return None
+
+
+class FleetProgress:
+    """Live aggregate progress across all hosts"""
+
+    def __init__(self, hosts, log_callback=None, interval=FLEET_PROGRESS_INTERVAL):
+        self.hosts = {host: "queued" for host in hosts}
+        self.steps = {}
+        self.log_callback = log_callback
+        self.interval = interval
+        self._last_report = 0.0
+        self._lock = threading.Lock()
+
+    def update(self, host, status=None, step=None, force=False):
+        """
+        Record a host change and report the aggregate if it is due
+
+        Args:
+            host: Host name
+            status: New host status
+            step: (step_index, step_status) from a progress line
+            force: Report even if the last report was less than interval ago
+        """
+        with self._lock:
+            if status:
+                self.hosts[host] = status
+            if step:
+                self.steps[host] = step
+            now = time.monotonic()
+            if not force and now - self._last_report < self.interval:
+                return
+            self._last_report = now
+            line = self.format_line()
+        if self.log_callback:
+            self.log_callback(line)
+
+    def format_line(self):
+        """Build the aggregate progress line"""
+        counts = {}
+        for status in self.hosts.values():
+            counts[status] = counts.get(status, 0) + 1
+        running_steps = {}
+        for host, status in self.hosts.items():
+            if status == "running" and host in self.steps:
+                step_name = REPAIR_STEPS[self.steps[host][0]]
+                running_steps[step_name] = running_steps.get(step_name, 0) + 1
+        finished = len(self.hosts) - counts.get("queued", 0) - counts.get("running", 0)
+        line = f"🚚 {finished}/{len(self.hosts)} hosts done"
+        details = [f"{count} {status}" for status, count in sorted(counts.items())]
+        line += f" ({', '.join(details)})"
+        if running_steps:
+            line += " | " + ", ".join(f"{name}: {count}" for name, count in running_steps.items())
+        return line
+
+
+async def repair_host(host, transport, semaphore, timeout, progress):
+    """
+    Repair one host through the transport
+
+    Args:
+        host: Host name
+        transport: CommandTransport
+        semaphore: Limits how many hosts run at once
+        timeout: Time limit for the host in seconds
+        progress: FleetProgress
+
+    Returns:
+        dict: 'host', 'status', 'exit_code', 'duration', 'steps', 'error'
+    """
+    record = {'host': host, 'status': None, 'exit_code': None, 'duration': 0.0,
+              'steps': [], 'error': None}
+    async with semaphore:
+        progress.update(host, status="running")
+        start = time.perf_counter()
+        lines = []
+        process = None
+
+        def add_line(raw):
+            line = decode_output(raw, transport.encoding).rstrip("\r\n")
+            lines.append(line)
+            match = PROGRESS_LINE.match(line)
+            if match and match.group(3) in REPAIR_STEPS:
+                progress.update(host, step=(int(match.group(1)) - 1, match.group(4)))
+
+        async def consume():
+            # Iterating the stream by line fails on lines longer than its
+            # limit, so read chunks and split the lines here
+            buffer = bytearray()
+            while True:
+                chunk = await process.stdout.read(FLEET_READ_SIZE)
+                if not chunk:
+                    break
+                start = len(buffer)
+                buffer.extend(chunk)
+                end = buffer.rfind(b"\n", start) + 1
+                if end:
+                    for raw in bytes(buffer[:end - 1]).split(b"\n"):
+                        add_line(raw)
+                    del buffer[:end]
+            if buffer:
+                add_line(bytes(buffer))
+            await process.wait()
+
+        try:
+            process = await asyncio.create_subprocess_exec(
+                *transport.command(host), stdin=asyncio.subprocess.DEVNULL,
+                stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.STDOUT,
+                env=transport.env,
+            )
+            await asyncio.wait_for(consume(), timeout)
+            record['exit_code'] = process.returncode
+            record['status'] = EXIT_STATUSES.get(process.returncode, "error")
+            result = parse_headless_output(lines)
+            if result is None:
+                record['status'] = "error"
+                record['error'] = lines[-1] if lines else f"exit code {process.returncode}"
+            else:
+                record['steps'] = result.get('steps', [])
+                record['error'] = result.get('error')
+        except asyncio.TimeoutError:
+            record['status'] = "timeout"
+            record['error'] = f"no result within {timeout:.0f}s"
+            if process is not None and process.returncode is None:
+                process.kill()
+                await process.wait()
+        except OSError as e:
+            record['status'] = "error"
+            record['error'] = str(e)
+        record['duration'] = time.perf_counter() - start
+    progress.update(host, status=record['status'], force=True)
+    return record
+
+
+async def repair_fleet_async(hosts, transport, concurrency=FLEET_MAX_CONCURRENCY,
+                             timeout=FLEET_HOST_TIMEOUT, log_callback=None):
+    """
+    Repair all hosts with bounded concurrency
+
+    Args:
+        hosts: Host names
+        transport: CommandTransport used to reach each host
+        concurrency: Maximum number of hosts repaired at the same time
+        timeout: Time limit per host in seconds
+        log_callback: Receives aggregate progress lines
+
+    Returns:
+        dict: 'hosts' (per-host records in input order), 'totals' (count per
+        status) and 'duration'
+    """
+    start = time.perf_counter()
+    progress = FleetProgress(hosts, log_callback)
+    semaphore = asyncio.Semaphore(concurrency)
+    records = await asyncio.gather(*(
+        repair_host(host, transport, semaphore, timeout, progress) for host in hosts
+    ))
+    totals = {}
+    for record in records:
+        totals[record['status']] = totals.get(record['status'], 0) + 1
+    return {'hosts': list(records), 'totals': totals, 'duration': time.perf_counter() - start}
+
+
+def repair_fleet(hosts, transport, concurrency=FLEET_MAX_CONCURRENCY,
+                 timeout=FLEET_HOST_TIMEOUT, log_callback=None):
+    """Run repair_fleet_async on a new event loop, see there for arguments"""
+    return asyncio.run(repair_fleet_async(hosts, transport, concurrency, timeout, log_callback))
+
+
+def summary_lines(summary):
+    """
+    Format the fleet summary as a table
+
+    Args:
+        summary: Result of repair_fleet
+
+    Returns:
+        list: Table lines, one per host plus a totals line
+    """
+    step_headers = "".join(f" {name[:12]:>12}" for name in REPAIR_STEPS)
+    lines = [f"  {'Host':<24} {'Status':<12} {'Time':>8}{step_headers}"]
+    for record in summary['hosts']:
+        cells = []
+        for step in record['steps']:
+            cell = f"{step['status'][:4]} {step['duration']:.1f}s" if step['duration'] else step['status'][:4]
+            cells.append(f" {cell:>12}")
+        lines.append(f"  {record['host'][:24]:<24} {record['status']:<12} "
+                     f"{record['duration']:>7.1f}s{''.join(cells)}")
+        if record['error']:
+            lines.append(f"      ↳ {record['error']}")
+    totals = ", ".join(f"{count} {status}" for status, count in sorted(summary['totals'].items()))
+    lines.append(f"  {len(summary['hosts'])} hosts in {summary['duration']:.1f}s: {totals}")
+    return lines
+
+
+def read_hosts(path):
+    """Read host names, one per line; blank lines and '#' comments are ignored"""
+    with open(path, 'r', encoding='utf-8') as f:
+        return [line.split('#', 1)[0].strip() for line in f if line.split('#', 1)[0].strip()]
+
+
+def main(argv=None):
+    """Fleet command line entry"""
+    parser = argparse.ArgumentParser(description="Repair many hosts in parallel")
+    parser.add_argument("hosts", help="File with one host name per line")
+    parser.add_argument("command", nargs="*",
+                        help="Command that runs the headless repair on {host} (after '--')")
+    parser.add_argument("--fake-agent", metavar="TRANSCRIPT",
+                        help="Replay a transcript locally for every host instead of running a command")
+    parser.add_argument("--concurrency", type=int, default=FLEET_MAX_CONCURRENCY,
+                        help="Maximum number of hosts repaired at the same time")
+    parser.add_argument("--timeout", type=float, default=FLEET_HOST_TIMEOUT, help="Time limit per host in seconds")
+    parser.add_argument("--output", metavar="PATH", help="Write the JSON summary to PATH")
+    args = parser.parse_args(argv)
+
+    if args.fake_agent:
+        transport = LocalAgentTransport(args.fake_agent)
+    elif args.command:
+        transport = CommandTransport(args.command)
+    else:
+        parser.error("a command template or --fake-agent is required")
+
+    hosts = read_hosts(args.hosts)
+    if not hosts:
+        parser.error(f"no hosts in {args.hosts}")
+
+    def print_line(message):
+        print(message, flush=True)
+
+    summary = repair_fleet(hosts, transport, max(1, args.concurrency), args.timeout, print_line)
+    for line in summary_lines(summary):
+        print(line)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(summary, f, ensure_ascii=False, indent=2)
+        print(f"Summary saved to {args.output}")
+    return 0 if summary['totals'].get("repaired", 0) == len(hosts) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -4,18 +4,26 @@ import os
 import tkinter as tk
 from tkinter import ttk
 import threading
-import queue
 import customtkinter as ctk
 
 from constants import REPAIR_STEPS, THEME_COLORS, STEP_STATUS_CONFIG
-from network_utils import (
-    get_ethernet_adapters,
-    configure_network,
-    set_dns_to_dhcp,
-    refresh_network_config,
-    display_network_info,
-    # upload_usage
-)
+from animation import AnimationScheduler, FontCache
+from cancellation import CancellationToken
+from log_buffer import LogBuffer
+from log_sink import LogFileSink
+from repair_pipeline import run_repair
+from ui_events import UiEventChannel, LogEvent, StepEvent, RepairDoneEvent
+
+
+# Virtual event that wakes the Tk thread when UI events are queued
+UI_EVENT_SEQUENCE = "<<UiEvents>>"
+
+# Step icon sizes and timings (seconds) of the bounce animations
+ICON_SIZE = 24
+ICON_BOUNCE_SIZE = 28
+ICON_BOUNCE_TIME = 0.1
+COMPLETION_BOUNCES = 5
+COMPLETION_STAGGER = 0.08
 
 
 class NetworkRepairGUI:
@@ -36,12 +44,23 @@ class NetworkRepairGUI:
         current_mode = ctk.get_appearance_mode().lower()
         self.colors = THEME_COLORS.get(current_mode, THEME_COLORS['light'])
         
-        # Create message queue for inter-thread communication
-        self.message_queue = queue.Queue()
+        # All UI changes from worker threads arrive as events on this channel
+        self.events = UiEventChannel(notify=self.wake_ui)
+        self.root.bind(UI_EVENT_SEQUENCE, self.process_events)
+        # Full log; the textbox only keeps the most recent lines
+        self.log_buffer = LogBuffer()
+        # The log is also kept in a file, written by a background thread
+        self.log_file = LogFileSink(log_callback=self.log_message)
+        self.log_file.write("===== Network Repair Tool started =====")
+        
+        # Fonts are created once; animations run through one frame-capped scheduler
+        self.fonts = FontCache(lambda family, size, weight: ctk.CTkFont(family=family, size=size, weight=weight))
+        self.animations = AnimationScheduler(self.root.after)
         
         # Status variables
         self.current_step = 0
         self.is_repairing = False
+        self.cancel_token = CancellationToken()
         
         self.setup_ui()
         self.start_repair_automatically()
@@ -100,7 +119,7 @@ class NetworkRepairGUI:
         title_label = ctk.CTkLabel(
             header_frame, 
             text="🔧 Network Repair Tool", 
-            font=ctk.CTkFont(family="Microsoft YaHei UI", size=28, weight="bold"),
+            font=self.fonts.get("Microsoft YaHei UI", 28, "bold"),
             text_color=self.colors['primary']
         )
         title_label.grid(row=0, column=0, padx=20, pady=(20, 5), sticky="w")
@@ -108,7 +127,7 @@ class NetworkRepairGUI:
         subtitle_label = ctk.CTkLabel(
             header_frame, 
             text="Automatically repair Windows network connection issues", 
-            font=ctk.CTkFont(family="Microsoft YaHei UI", size=15),
+            font=self.fonts.get("Microsoft YaHei UI", 15),
             text_color=self.colors['text_secondary']
         )
         subtitle_label.grid(row=1, column=0, padx=20, pady=(0, 20), sticky="w")
@@ -144,7 +163,7 @@ class NetworkRepairGUI:
             icon_label = ctk.CTkLabel(
                 step_container, 
                 text="⏳", 
-                font=ctk.CTkFont(family="Segoe UI Emoji", size=24)
+                font=self.fonts.get("Segoe UI Emoji", ICON_SIZE)
             )
             icon_label.pack(side="top", pady=(0, 8))
             self.step_icons.append(icon_label)
@@ -153,7 +172,7 @@ class NetworkRepairGUI:
             step_label = ctk.CTkLabel(
                 step_container, 
                 text=step, 
-                font=ctk.CTkFont(family="Microsoft YaHei UI", size=12),
+                font=self.fonts.get("Microsoft YaHei UI", 12),
                 text_color=self.colors['text_secondary']
             )
             step_label.pack(side="top")
@@ -174,39 +193,52 @@ class NetworkRepairGUI:
         log_title = ctk.CTkLabel(
             log_frame, 
             text="📋 Execution Log", 
-            font=ctk.CTkFont(family="Microsoft YaHei UI", size=16, weight="bold"),
+            font=self.fonts.get("Microsoft YaHei UI", 16, "bold"),
             text_color=self.colors['text']
         )
         log_title.grid(row=0, column=0, padx=20, pady=(20, 15), sticky="w")
         
+        # Cancel button, stops the running repair and kills its commands
+        self.cancel_button = ctk.CTkButton(
+            log_frame,
+            text="Cancel",
+            width=90,
+            font=self.fonts.get("Microsoft YaHei UI", 13),
+            fg_color=self.colors['error'],
+            command=self.cancel_repair
+        )
+        self.cancel_button.grid(row=0, column=1, padx=20, pady=(20, 15), sticky="e")
+        
         # Textbox
         self.output_text = ctk.CTkTextbox(
             log_frame,
-            font=ctk.CTkFont(family="Consolas", size=13),
+            font=self.fonts.get("Consolas", 13),
             text_color=self.colors['text'],
             fg_color="#f8f9fa" if ctk.get_appearance_mode().lower() == "light" else "#1e293b",
             border_width=1,
             border_color="#e2e8f0" if ctk.get_appearance_mode().lower() == "light" else "#334155",
             corner_radius=8
         )
-        self.output_text.grid(row=1, column=0, padx=20, pady=(0, 20), sticky="nsew")
+        self.output_text.grid(row=1, column=0, columnspan=2, padx=20, pady=(0, 20), sticky="nsew")
         
         # Add right-click menu for log textbox
         self.setup_textbox_context_menu()
         
-        # Start processing message queue
-        self.process_queue()
+        # Handle events posted before the main loop started
+        self.root.after_idle(self.process_events)
         
     def update_step_progress(self, step_index, status="waiting"):
-        """Update step progress"""
+        """Update step progress, safe to call from any thread"""
+        self.events.post(StepEvent(step_index, status))
+    
+    def apply_step_progress(self, step_index, status):
+        """Show a step status change, runs on the Tk thread"""
         if 0 <= step_index < len(self.steps):
             icon, color_key = STEP_STATUS_CONFIG.get(status, STEP_STATUS_CONFIG["waiting"])
             color = self.colors[color_key]
             
             # Add animation effect for step status change
             self.animate_step_change(step_index, icon, color, status)
-            
-            self.root.update_idletasks()
     
     def start_repair_automatically(self):
         """Automatically start network repair"""
@@ -219,93 +251,89 @@ class NetworkRepairGUI:
         repair_thread.start()
     
     def log_message(self, message):
-        """Add message to output box"""
-        self.message_queue.put(message)
+        """Add message to output box and log file, safe to call from any thread"""
+        self.events.post(LogEvent(message))
+        self.log_file.write(message)
     
-    def process_queue(self):
-        """Process message queue"""
-        try:
-            while True:
-                message = self.message_queue.get_nowait()
-                self.output_text.insert(tk.END, message + "\n")
-                self.output_text.see(tk.END)
-                # CustomTkinter Textbox update may need update
-        except queue.Empty:
-            pass
-        finally:
-            self.root.after(100, self.process_queue)
+    def wake_ui(self):
+        """Ask the Tk thread to handle queued events"""
+        self.root.event_generate(UI_EVENT_SEQUENCE, when="tail")
+    
+    def process_events(self, event=None):
+        """Handle queued UI events on the Tk thread"""
+        events, more = self.events.drain()
+        messages = []
+        for ui_event in events:
+            if isinstance(ui_event, LogEvent):
+                messages.append(ui_event.message)
+            elif isinstance(ui_event, StepEvent):
+                self.apply_step_progress(ui_event.step_index, ui_event.status)
+            elif isinstance(ui_event, RepairDoneEvent):
+                self.is_repairing = False
+                self.repair_completed(ui_event.result)
+        self.render_log(messages)
+        if more:
+            # Yield to user input before handling the rest
+            self.root.after_idle(self.process_events)
+    
+    def render_log(self, messages):
+        """Render a batch of log messages with one insert and one scroll"""
+        text, trim = self.log_buffer.append(messages)
+        if trim:
+            self.output_text.delete("1.0", f"{trim + 1}.0")
+        if text:
+            self.output_text.insert(tk.END, text)
+            self.output_text.see(tk.END)
     
     def perform_repair(self):
         """Perform network repair operations"""
+        self.log_message(f"📄 Log file: {self.log_file.path}")
+        result = None
         try:
-            self.log_message("🚀 Starting network repair...")
-            
-            # Get Ethernet adapters
-            self.log_message("📡 Getting network adapter information...")
-            self.update_step_progress(0, "running")
-            self.current_step_index = 0
-            adapters = get_ethernet_adapters(log_callback=self.log_message)
-            if not adapters:
-                self.log_message("❌ No Ethernet adapters found")
-                self.update_step_progress(0, "error")
-                return
-            
-            self.log_message(f"✅ Found {len(adapters)} Ethernet adapters")
-            self.update_step_progress(0, "completed")
-            
-            # Configure network
-            self.log_message("⚙️ Configuring network settings...")
-            self.update_step_progress(1, "running")
-            self.current_step_index = 1
-            configure_network(adapters, log_callback=self.log_message)
-            self.update_step_progress(1, "completed")
-            
-            # Set DNS
-            self.log_message("🌐 Setting DNS to DHCP...")
-            self.update_step_progress(2, "running")
-            self.current_step_index = 2
-            set_dns_to_dhcp(adapters, log_callback=self.log_message)
-            self.update_step_progress(2, "completed")
-            
-            # Refresh network configuration
-            self.log_message("🔄 Refreshing network configuration...")
-            self.update_step_progress(3, "running")
-            self.current_step_index = 3
-            refresh_network_config(log_callback=self.log_message)
-            self.update_step_progress(3, "completed")
-            
-            # Display network information
-            self.log_message("📊 Getting network configuration information...")
-            # try:
-            #     upload_usage(log_callback=self.log_message)
-            # except Exception as e:
-            #     self.log_message(f"Skipped")
-            self.update_step_progress(4, "running")
-            self.current_step_index = 4
-            display_network_info(log_callback=self.log_message)
-            self.update_step_progress(4, "completed")
-            
-            self.log_message("\n🎉 Processing completed, network should be restored []~(￣▽￣)~*")
-            self.log_message("💡 If it still doesn't work, you might be using a TUN Adapter, or it's a non-local network issue. Please check your network proxy tool configuration or contact your network administrator. (＠_＠;)")
-            
-        except Exception as e:
-            self.log_message(f"❌ Error occurred during repair: {str(e)}")
-            if hasattr(self, 'current_step_index'):
-                self.update_step_progress(self.current_step_index, "error")
+            result = run_repair(log_callback=self.log_message, progress_callback=self.update_step_progress,
+                                token=self.cancel_token)
         finally:
-            self.is_repairing = False
-            self.root.after(0, self.repair_completed)
+            self.events.post(RepairDoneEvent(result))
     
-    def repair_completed(self):
+    def cancel_repair(self):
+        """Cancel the running repair"""
+        if not self.is_repairing or self.cancel_token.cancelled:
+            return
+        self.cancel_button.configure(state="disabled", text="Cancelling...")
+        self.log_message("🛑 Cancelling repair...")
+        self.cancel_token.cancel("cancelled by user")
+    
+    def repair_completed(self, result=None):
         """UI updates after repair completion"""
-        self.update_step_progress(0, "completed")
-        self.update_step_progress(1, "completed")
-        self.update_step_progress(2, "completed")
-        self.update_step_progress(3, "completed")
-        self.update_step_progress(4, "completed")
+        self.cancel_button.configure(state="disabled", text="Cancel")
+        if result and result.get('cancelled'):
+            self.log_message("\n🛑 Repair cancelled, program will automatically close in 60 seconds...")
+            self.root.after(60000, self.root.destroy)
+            return
+        
+        # Show the final step statuses; failed and timed out steps stay
+        # errors and steps triage left out stay skipped
+        succeeded = bool(result and result.get('success'))
+        steps = result['steps'] if result else []
+        completed = []
+        for step_index, step in enumerate(steps):
+            status = step['status']
+            if succeeded and status not in ("error", "skipped"):
+                status = "completed"
+            if status == "completed":
+                completed.append(step_index)
+            self.apply_step_progress(step_index, status)
+        
+        if not succeeded:
+            failed = [step['name'] for step in steps if step['status'] == "error"]
+            detail = f" ({', '.join(failed)})" if failed else ""
+            self.log_message(f"\n❌ Repair did not succeed{detail}, see the log above. "
+                             "Program will automatically close in 60 seconds...")
+            self.root.after(60000, self.root.destroy)
+            return
         
         # Add celebration animation
-        self.animate_completion()
+        self.animate_completion(completed)
         
         self.log_message("\n✅ Repair completed, program will automatically close in 60 seconds...")
         self.root.after(60000, self.root.destroy)
@@ -313,53 +341,40 @@ class NetworkRepairGUI:
     def animate_step_change(self, step_index, icon, color, status):
         """Add animation effect for step change"""
         # Update icon and color
-        self.step_icons[step_index].configure(text=icon, text_color=color)
+        self.animations.configure(self.step_icons[step_index], text=icon, text_color=color)
         
         # Update text color
+        label = self.step_labels[step_index]
         if status == "running":
-            self.step_labels[step_index].configure(text_color=self.colors['primary'], font=ctk.CTkFont(family="Microsoft YaHei UI", size=12, weight="bold"))
+            self.animations.configure(label, text_color=self.colors['primary'], font=self.fonts.get("Microsoft YaHei UI", 12, "bold"))
         elif status == "completed":
-            self.step_labels[step_index].configure(text_color=self.colors['success'])
+            self.animations.configure(label, text_color=self.colors['success'])
         elif status == "error":
-            self.step_labels[step_index].configure(text_color=self.colors['error'])
+            self.animations.configure(label, text_color=self.colors['error'])
         else:
-            self.step_labels[step_index].configure(text_color=self.colors['text_secondary'], font=ctk.CTkFont(family="Microsoft YaHei UI", size=12))
+            self.animations.configure(label, text_color=self.colors['text_secondary'], font=self.fonts.get("Microsoft YaHei UI", 12))
         
         # Add scale animation
         self.animate_icon_scale(self.step_icons[step_index])
     
-    def animate_icon_scale(self, icon_label):
-        """Icon scale animation"""
-        # Save original font size
-        original_font = icon_label.cget("font")
-        
-        # Enlarge animation
-        def scale_up():
-            icon_label.configure(font=ctk.CTkFont(family="Segoe UI Emoji", size=28))
-            self.root.after(100, scale_down)
-        
-        # Shrink back to original size
-        def scale_down():
-            icon_label.configure(font=original_font)
-        
-        scale_up()
+    def animate_icon_scale(self, icon_label, delay=0.0):
+        """Icon scale animation: enlarge, then shrink back to the normal size"""
+        self.animations.configure(icon_label, delay=delay, font=self.fonts.get("Segoe UI Emoji", ICON_BOUNCE_SIZE))
+        self.animations.configure(icon_label, delay=delay + ICON_BOUNCE_TIME, font=self.fonts.get("Segoe UI Emoji", ICON_SIZE))
     
-    def animate_completion(self):
-        """Completion celebration animation"""
-        # Make all completed step icons bounce
-        def animate_step_icons():
-            for i in range(5):
-                for icon in self.step_icons:
-                    if icon.cget("text") == "✅":
-                        # Save original font
-                        original_font = icon.cget("font")
-                        # Enlarge
-                        icon.configure(font=ctk.CTkFont(family="Segoe UI Emoji", size=28))
-                        self.root.after(100, lambda icon=icon, original_font=original_font: icon.configure(font=original_font))
-                self.root.after(200, lambda: None)  # Wait for next frame
-        
-        # Execute animation
-        animate_step_icons()
+    def animate_completion(self, completed):
+        """
+        Completion celebration animation
+
+        Args:
+            completed: Indices of the steps marked completed; skipped steps
+                do not bounce
+        """
+        # Bounce the completed step icons one after another, several times
+        for bounce in range(COMPLETION_BOUNCES):
+            for i in completed:
+                delay = bounce * 2 * ICON_BOUNCE_TIME + i * COMPLETION_STAGGER
+                self.animate_icon_scale(self.step_icons[i], delay)
     
     def setup_textbox_context_menu(self):
         """Set up right-click menu for textbox"""
@@ -368,6 +383,7 @@ class NetworkRepairGUI:
         
         # Add menu items
         self.context_menu.add_command(label="Copy", command=self.copy_text)
+        self.context_menu.add_command(label="Copy Full Log", command=self.copy_full_log)
         self.context_menu.add_command(label="Paste", command=self.paste_text)
         self.context_menu.add_separator()
         self.context_menu.add_command(label="Select All", command=self.select_all_text)
@@ -396,6 +412,15 @@ class NetworkRepairGUI:
             # No text selected
             pass
     
+    def copy_full_log(self, event=None):
+        """Copy the full log, including lines no longer shown"""
+        self.root.clipboard_clear()
+        self.root.clipboard_append(self.log_buffer.text())
+    
+    def close(self):
+        """Write the rest of the log file; call after the main loop has ended"""
+        self.log_file.close()
+    
     def paste_text(self, event=None):
         """Paste text"""
         try:
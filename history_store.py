@@ -0,0 +1,211 @@
+"""Repair History Module
+
+Persists every repair run to a local SQLite database: detected adapters,
+triage findings, the operations that ran and whether connectivity was
+restored. The history ranks repair operations by how often they fixed a
+symptom on earlier runs, so the most promising one can run first.
+"""
+import os
+import socket
+import sqlite3
+import time
+
+from constants import REPAIR_OPERATIONS
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    machine TEXT NOT NULL,
+    started_at REAL NOT NULL,
+    duration REAL NOT NULL,
+    success INTEGER NOT NULL,
+    restored INTEGER
+);
+CREATE TABLE IF NOT EXISTS run_adapters (
+    run_id INTEGER NOT NULL REFERENCES runs(id),
+    name TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    description TEXT,
+    dhcp INTEGER
+);
+CREATE TABLE IF NOT EXISTS run_probes (
+    run_id INTEGER NOT NULL REFERENCES runs(id),
+    probe TEXT NOT NULL,
+    ok INTEGER,
+    detail TEXT,
+    duration REAL
+);
+CREATE TABLE IF NOT EXISTS run_symptoms (
+    run_id INTEGER NOT NULL REFERENCES runs(id),
+    symptom TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS run_operations (
+    run_id INTEGER NOT NULL REFERENCES runs(id),
+    operation TEXT NOT NULL,
+    state TEXT NOT NULL,
+    duration REAL,
+    fixed INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS idx_runs_machine ON runs(machine, started_at);
+CREATE INDEX IF NOT EXISTS idx_run_adapters_kind ON run_adapters(kind, run_id);
+CREATE INDEX IF NOT EXISTS idx_run_symptoms_symptom ON run_symptoms(symptom, run_id);
+CREATE INDEX IF NOT EXISTS idx_run_operations_run ON run_operations(run_id, operation);
+"""
+
+
+def default_history_path():
+    """Path of the history database in the user's local application data"""
+    base = os.environ.get('LOCALAPPDATA') or os.path.expanduser('~')
+    return os.path.join(base, "network_repair", "history.db")
+
+
+def get_machine_name():
+    """Name the current machine is recorded under"""
+    return socket.gethostname()
+
+
+def symptoms_from_findings(findings):
+    """
+    Turn triage findings into symptom names
+
+    Args:
+        findings: Result of run_triage, or None
+
+    Returns:
+        list: Sorted names of the probes that failed or could not run
+    """
+    return sorted(name for name, finding in (findings or {}).items() if finding['ok'] is not True)
+
+
+class HistoryStore:
+    """SQLite store of repair runs"""
+
+    def __init__(self, path=None):
+        """
+        Args:
+            path: Database file, defaults to default_history_path();
+                ':memory:' keeps the history in memory
+        """
+        self.path = path or default_history_path()
+        if self.path != ':memory:':
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        self.connection = sqlite3.connect(self.path, check_same_thread=False)
+        self.connection.executescript(SCHEMA)
+
+    def close(self):
+        """Close the database"""
+        self.connection.close()
+
+    def record_run(self, result, adapters, operations, fixed_by=None, machine=None, started_at=None):
+        """
+        Store one repair run
+
+        Args:
+            result: Result of run_repair
+            adapters: Adapter records that were repaired
+            operations: RepairOperation objects that were planned
+            fixed_by: Names of the operations of the stage after which
+                connectivity was verified, if any
+            machine: Machine name, defaults to this machine
+            started_at: Start time as a Unix timestamp, defaults to now
+
+        Returns:
+            int: The new run id
+        """
+        restored = result.get('restored')
+        with self.connection:
+            cursor = self.connection.execute(
+                "INSERT INTO runs (machine, started_at, duration, success, restored) VALUES (?, ?, ?, ?, ?)",
+                (machine or get_machine_name(), started_at or time.time(), result['duration'],
+                 int(result['success']), None if restored is None else int(restored)),
+            )
+            run_id = cursor.lastrowid
+            self.connection.executemany(
+                "INSERT INTO run_adapters (run_id, name, kind, description, dhcp) VALUES (?, ?, ?, ?, ?)",
+                [(run_id, adapter['name'], adapter['kind'], adapter['description'],
+                  None if adapter['dhcp'] is None else int(adapter['dhcp'])) for adapter in adapters],
+            )
+            findings = result.get('triage') or {}
+            self.connection.executemany(
+                "INSERT INTO run_probes (run_id, probe, ok, detail, duration) VALUES (?, ?, ?, ?, ?)",
+                [(run_id, name, None if finding['ok'] is None else int(finding['ok']),
+                  finding['detail'], finding['duration']) for name, finding in findings.items()],
+            )
+            self.connection.executemany(
+                "INSERT INTO run_symptoms (run_id, symptom) VALUES (?, ?)",
+                [(run_id, symptom) for symptom in symptoms_from_findings(findings)],
+            )
+            self.connection.executemany(
+                "INSERT INTO run_operations (run_id, operation, state, duration, fixed) VALUES (?, ?, ?, ?, ?)",
+                [(run_id, operation.name, operation.state, operation.duration,
+                  int(operation.name in (fixed_by or ()))) for operation in operations],
+            )
+        return run_id
+
+    def operation_scores(self, symptoms):
+        """
+        Estimate how likely each repair operation is to fix the symptoms
+
+        The score is the smoothed share of earlier runs with any of these
+        symptoms in which connectivity came back right after the operation.
+
+        Args:
+            symptoms: Symptom names from symptoms_from_findings
+
+        Returns:
+            dict: Operation name -> score between 0 and 1
+        """
+        scores = {operation: 0.5 for operation in REPAIR_OPERATIONS}
+        if not symptoms:
+            return scores
+        placeholders = ", ".join("?" for _ in symptoms)
+        rows = self.connection.execute(
+            f"""
+            SELECT o.operation, COUNT(*), SUM(o.fixed)
+            FROM run_operations o
+            WHERE o.state = 'completed' AND o.run_id IN (
+                SELECT DISTINCT run_id FROM run_symptoms WHERE symptom IN ({placeholders})
+            )
+            GROUP BY o.operation
+            """,
+            list(symptoms),
+        ).fetchall()
+        for operation, ran, fixed in rows:
+            if operation in scores:
+                scores[operation] = (fixed + 1) / (ran + 2)
+        return scores
+
+    def recent_runs(self, machine=None, kind=None, symptom=None, limit=20):
+        """
+        Query recent runs
+
+        Args:
+            machine: Only runs on this machine
+            kind: Only runs that repaired an adapter of this kind
+            symptom: Only runs that showed this symptom
+            limit: Maximum number of runs
+
+        Returns:
+            list: Dicts with 'id', 'machine', 'started_at', 'duration',
+            'success' and 'restored', newest first
+        """
+        conditions = []
+        parameters = []
+        if machine:
+            conditions.append("machine = ?")
+            parameters.append(machine)
+        if kind:
+            conditions.append("id IN (SELECT run_id FROM run_adapters WHERE kind = ?)")
+            parameters.append(kind)
+        if symptom:
+            conditions.append("id IN (SELECT run_id FROM run_symptoms WHERE symptom = ?)")
+            parameters.append(symptom)
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        rows = self.connection.execute(
+            f"SELECT id, machine, started_at, duration, success, restored FROM runs {where} "
+            f"ORDER BY started_at DESC LIMIT ?",
+            parameters + [limit],
+        ).fetchall()
+        keys = ('id', 'machine', 'started_at', 'duration', 'success', 'restored')
+        return [dict(zip(keys, row)) for row in rows]
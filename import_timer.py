@@ -0,0 +1,61 @@
+"""Import Timer Module
+
+Measures how long each module takes to import, like 'python -X importtime',
+but also works in the frozen executable. Enabled with --import-report.
+"""
+import builtins
+import sys
+import time
+
+
+class ImportTimer:
+    """Records self and cumulative import time of every newly loaded module"""
+
+    def __init__(self):
+        self.records = []
+        self._stack = []
+        self._original_import = None
+
+    def install(self):
+        """Start timing imports"""
+        self._original_import = builtins.__import__
+        builtins.__import__ = self._import
+
+    def uninstall(self):
+        """Stop timing imports"""
+        if self._original_import is not None:
+            builtins.__import__ = self._original_import
+            self._original_import = None
+
+    def _import(self, name, globals=None, locals=None, fromlist=(), level=0):
+        if level or name in sys.modules:
+            return self._original_import(name, globals, locals, fromlist, level)
+
+        self._stack.append(0.0)
+        start = time.perf_counter()
+        try:
+            return self._original_import(name, globals, locals, fromlist, level)
+        finally:
+            cumulative = time.perf_counter() - start
+            nested = self._stack.pop()
+            if self._stack:
+                self._stack[-1] += cumulative
+            self.records.append((name, cumulative - nested, cumulative, len(self._stack)))
+
+    def report_lines(self, limit=25):
+        """
+        Summarize the slowest imports
+
+        Args:
+            limit: Maximum number of rows
+
+        Returns:
+            list: Table lines, slowest cumulative time first
+        """
+        rows = sorted(self.records, key=lambda record: record[2], reverse=True)[:limit]
+        total = sum(record[2] for record in self.records if record[3] == 0)
+        lines = [f"  {'Module':<40} {'Self':>9} {'Cumulative':>11}"]
+        for name, self_time, cumulative, depth in rows:
+            lines.append(f"  {name:<40} {self_time * 1000:>7.1f}ms {cumulative * 1000:>9.1f}ms")
+        lines.append(f"  {'Total (top-level imports)':<40} {'':>9} {total * 1000:>9.1f}ms")
+        return lines
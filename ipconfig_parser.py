@@ -0,0 +1,373 @@
+"""ipconfig Output Parser Module
+
+Incrementally parses the raw bytes of 'ipconfig /all' in any common Windows
+display language. The console code page is detected from the system or, when
+replaying output elsewhere, sniffed from the first few kilobytes.
+"""
+import codecs
+import ctypes
+import re
+
+
+# Adapter section header prefixes per adapter type, for the common display
+# languages; matched case-insensitively
+SECTION_HEADERS = {
+    'ethernet': (
+        'Ethernet adapter', '以太网适配器', '乙太網路卡', 'Ethernet-Adapter', 'Carte Ethernet',
+        'Adaptador de Ethernet', 'Scheda Ethernet', 'Adaptador Ethernet', 'Адаптер Ethernet',
+        'イーサネット アダプター', '이더넷 어댑터', 'Ethernet-adapter', 'Karta Ethernet',
+        'Ethernet bağdaştırıcısı', 'Adaptér sítě Ethernet', 'Ethernet-kort',
+    ),
+    'wireless': (
+        'Wireless LAN adapter', '无线局域网适配器', '無線區域網路介面卡', 'Drahtlos-LAN-Adapter',
+        'Carte réseau sans fil', 'Adaptador de LAN inalámbrica', 'Scheda LAN wireless',
+        'Adaptador de Rede Sem Fio', 'Адаптер беспроводной локальной сети', '무선 LAN 어댑터',
+        'Draadloos LAN-adapter', 'Karta bezprzewodowej sieci LAN', 'Kablosuz LAN bağdaştırıcısı',
+        'Adaptér bezdrátové sítě LAN', 'Trådlöst LAN-kort',
+    ),
+    'tunnel': (
+        'Tunnel adapter', '隧道适配器', '通道介面卡', 'Tunneladapter', 'Carte Tunnel',
+        'Adaptador de túnel', 'Scheda Tunnel', 'Туннельный адаптер', 'トンネル アダプター',
+        '터널 어댑터', 'Tunnel-adapter', 'Karta tunelowa', 'Tünel bağdaştırıcısı',
+        'Adaptér tunelového připojení', 'Tunnelkort',
+    ),
+    'ppp': (
+        'PPP adapter', 'PPP 适配器', 'PPP 介面卡', 'PPP-Adapter', 'Carte PPP', 'Adaptador PPP',
+        'Scheda PPP', 'Адаптер PPP', 'PPP アダプター', 'PPP 어댑터', 'PPP-adapter', 'Karta PPP',
+        'PPP bağdaştırıcısı', 'Adaptér PPP', 'PPP-kort',
+    ),
+    'unknown': (
+        'Unknown adapter', '未知适配器', '未知的介面卡', 'Unbekannter Adapter', 'Carte inconnue',
+        'Adaptador desconocido', 'Scheda sconosciuta', 'Adaptador desconhecido',
+        'Неизвестный адаптер', '不明なアダプター', '알 수 없는 어댑터', 'Onbekende adapter',
+        'Nieznana karta', 'Bilinmeyen bağdaştırıcı', 'Neznámý adaptér', 'Okänt kort',
+    ),
+}
+
+# Field labels per snapshot field, for the common display languages
+FIELD_LABELS = {
+    'description': (
+        'Description', '描述', 'Beschreibung', 'Descripción', 'Descrizione', 'Descrição',
+        'Описание', '説明', '설명', 'Beschrijving', 'Opis', 'Açıklama', 'Popis', 'Beskrivning',
+    ),
+    'mac': (
+        'Physical Address', '物理地址', '實體位址', 'Physische Adresse', 'Adresse physique',
+        'Dirección física', 'Indirizzo fisico', 'Endereço Físico', 'Физический адрес',
+        '物理アドレス', '물리적 주소', 'Fysiek adres', 'Adres fizyczny', 'Fiziksel Adres',
+        'Fyzická adresa', 'Fysisk adress',
+    ),
+    'dhcp': (
+        'DHCP Enabled', 'DHCP 已启用', 'DHCP 已啟用', 'DHCP aktiviert', 'DHCP activé',
+        'DHCP habilitado', 'DHCP abilitato', 'DHCP включен', 'DHCP 有効', 'DHCP 사용',
+        'DHCP ingeschakeld', 'DHCP włączone', 'DHCP Etkin', 'Protokol DHCP povolen', 'DHCP aktiverat',
+    ),
+    'gateway': (
+        'Default Gateway', '默认网关', '預設閘道', 'Standardgateway', 'Passerelle par défaut',
+        'Puerta de enlace predeterminada', 'Gateway predefinito', 'Gateway Padrão',
+        'Основной шлюз', 'デフォルト ゲートウェイ', '기본 게이트웨이', 'Standaardgateway',
+        'Brama domyślna', 'Varsayılan Ağ Geçidi', 'Výchozí brána', 'Standard-gateway',
+    ),
+    'dns': (
+        'DNS Servers', 'DNS 服务器', 'DNS 伺服器', 'DNS-Server', 'Serveurs DNS', 'Servidores DNS',
+        'Server DNS', 'DNS-серверы', 'DNS サーバー', 'DNS 서버', 'DNS-servers', 'Serwery DNS',
+        'DNS Sunucuları', 'Servery DNS', 'DNS-servrar',
+    ),
+}
+
+# Values of the DHCP field that mean enabled
+YES_VALUES = frozenset(value.casefold() for value in (
+    'Yes', '是', 'Ja', 'Oui', 'Sí', 'Si', 'Sì', 'Sim', 'Да', 'はい', '예', 'Tak', 'Evet', 'Ano',
+))
+
+# Fields that may continue on the following indented lines
+LIST_FIELDS = ('ipv4', 'ipv6', 'gateway', 'dns')
+
+# Indentation beyond which a line continues the previous field
+CONTINUATION_INDENT = 8
+
+# Bytes collected before the encoding is sniffed
+SNIFF_SIZE = 4096
+
+# Encodings tried when the output has to be sniffed
+CANDIDATE_ENCODINGS = ('utf-8', 'gbk', 'big5', 'cp932', 'cp949', 'cp866', 'cp850', 'cp437', 'cp852', 'cp857')
+
+
+def _normalize(label):
+    """Normalize a label for table lookup"""
+    return ' '.join(label.split()).casefold()
+
+
+_LABEL_TO_FIELD = {
+    _normalize(label): field for field, labels in FIELD_LABELS.items() for label in labels
+}
+_HEADER_PATTERN = re.compile(
+    r'^(?P<prefix>' + '|'.join(
+        re.escape(prefix)
+        for prefixes in SECTION_HEADERS.values()
+        for prefix in sorted(prefixes, key=len, reverse=True)
+    ) + r')\s*(?P<name>.*?)\s*:$',
+    re.IGNORECASE,
+)
+_PREFIX_TO_KIND = {
+    prefix.casefold(): kind for kind, prefixes in SECTION_HEADERS.items() for prefix in prefixes
+}
+_KEY_VALUE_PATTERN = re.compile(r'^\s*(?P<key>[^:]+?)[\s.]*:\s*(?P<value>.*)$')
+_ANNOTATION_PATTERN = re.compile(r'\(.*?\)')
+
+
+def lookup_field(key):
+    """
+    Map an ipconfig key to a snapshot field
+
+    Args:
+        key: Key text without dot leaders
+
+    Returns:
+        str: Field name, or None if the key is not of interest
+    """
+    normalized = _normalize(key)
+    field = _LABEL_TO_FIELD.get(normalized)
+    if field:
+        return field
+    # Address keys vary most between languages but always name the protocol
+    if 'ipv4' in normalized:
+        return 'ipv4'
+    if 'ipv6' in normalized and 'dhcpv6' not in normalized:
+        return 'ipv6'
+    return None
+
+
+def get_console_encoding():
+    """
+    Get the code page console programs write with on this system
+
+    Returns:
+        str: Python codec name, or None when not running on Windows
+    """
+    try:
+        code_page = ctypes.windll.kernel32.GetConsoleOutputCP() or ctypes.windll.kernel32.GetOEMCP()
+    except AttributeError:
+        return None
+    if code_page == 65001:
+        return 'utf-8'
+    return f'cp{code_page}'
+
+
+def _recognized_lines(text):
+    """Count header and field lines in text that match the label tables"""
+    count = 0
+    for line in text.splitlines():
+        if not line.strip():
+            continue
+        if not line[0].isspace():
+            if _HEADER_PATTERN.match(line.strip()):
+                count += 1
+            continue
+        match = _KEY_VALUE_PATTERN.match(line)
+        if match and _normalize(match.group('key')) in _LABEL_TO_FIELD:
+            count += 1
+    return count
+
+
+def detect_encoding(sample):
+    """
+    Detect the encoding of ipconfig output
+
+    The system console code page is tried first. Every candidate that decodes
+    the sample cleanly is scored by how many lines match the label tables.
+
+    Args:
+        sample: First bytes of the output
+
+    Returns:
+        str: Python codec name
+    """
+    candidates = list(CANDIDATE_ENCODINGS)
+    console_encoding = get_console_encoding()
+    if console_encoding:
+        candidates.insert(0, console_encoding)
+
+    best_encoding = None
+    best_score = -1
+    for encoding in candidates:
+        try:
+            text = codecs.getincrementaldecoder(encoding)().decode(sample, final=False)
+        except (UnicodeDecodeError, LookupError):
+            continue
+        score = _recognized_lines(text)
+        if score > best_score:
+            best_encoding = encoding
+            best_score = score
+    return best_encoding or 'latin-1'
+
+
+def new_adapter(name, kind):
+    """Create an empty adapter record"""
+    return {
+        'name': name,
+        'kind': kind,
+        'description': '',
+        'mac': '',
+        'dhcp': False,
+        'ipv4': [],
+        'ipv6': [],
+        'gateway': [],
+        'dns': [],
+    }
+
+
+class IpconfigParser:
+    """
+    Incremental parser for 'ipconfig /all' byte output
+
+    Only the current adapter and any incomplete line are held in memory, so
+    outputs with hundreds of adapters are parsed in linear time.
+    """
+
+    def __init__(self, encoding=None, on_adapter=None):
+        """
+        Args:
+            encoding: Output encoding, detected automatically when None
+            on_adapter: Called with each finished adapter record; when given,
+                records are not collected in self.adapters
+        """
+        self.encoding = encoding
+        self.adapters = []
+        self._on_adapter = on_adapter
+        self._decoder = None
+        self._pending = b''
+        self._partial = ''
+        self._current = None
+        self._last_field = None
+        if encoding:
+            self._decoder = codecs.getincrementaldecoder(encoding)(errors='replace')
+
+    def feed(self, data):
+        """
+        Parse the next chunk of output bytes
+
+        Args:
+            data: Output bytes of any length
+        """
+        if self._decoder is None:
+            self._pending += data
+            if len(self._pending) < SNIFF_SIZE:
+                return
+            self._start_decoding()
+            return
+        self._feed_text(self._decoder.decode(data))
+
+    def close(self):
+        """
+        Finish parsing
+
+        Returns:
+            list: Parsed adapter records (empty when on_adapter is used)
+        """
+        if self._decoder is None:
+            self._start_decoding()
+        self._feed_text(self._decoder.decode(b'', final=True))
+        if self._partial:
+            self._parse_line(self._partial)
+            self._partial = ''
+        self._finish_adapter()
+        return self.adapters
+
+    def _start_decoding(self):
+        """Choose the encoding from the buffered sample and decode it"""
+        if self.encoding is None:
+            self.encoding = detect_encoding(self._pending)
+        self._decoder = codecs.getincrementaldecoder(self.encoding)(errors='replace')
+        pending, self._pending = self._pending, b''
+        self._feed_text(self._decoder.decode(pending))
+
+    def _feed_text(self, text):
+        """Parse every complete line of decoded text"""
+        if not text:
+            return
+        lines = (self._partial + text).split('\n')
+        self._partial = lines.pop()
+        for line in lines:
+            self._parse_line(line)
+
+    def _finish_adapter(self):
+        """Hand off the adapter currently being parsed"""
+        if self._current is None:
+            return
+        if self._on_adapter:
+            self._on_adapter(self._current)
+        else:
+            self.adapters.append(self._current)
+        self._current = None
+        self._last_field = None
+
+    def _parse_line(self, line):
+        """Parse one line of output"""
+        line = line.rstrip('\r')
+        if not line.strip():
+            return
+
+        if not line[0].isspace():
+            # Section header, e.g. 'Ethernet adapter Ethernet:'
+            self._finish_adapter()
+            header = line.strip()
+            if not header.endswith(':'):
+                return
+            match = _HEADER_PATTERN.match(header)
+            if match:
+                self._current = new_adapter(match.group('name'), _PREFIX_TO_KIND[match.group('prefix').casefold()])
+            else:
+                self._current = new_adapter(header[:-1].strip(), 'other')
+            return
+
+        if self._current is None:
+            return
+
+        indent = len(line) - len(line.lstrip())
+        if indent > CONTINUATION_INDENT:
+            if self._last_field in LIST_FIELDS:
+                self._set_field(self._last_field, line.strip())
+            return
+
+        match = _KEY_VALUE_PATTERN.match(line)
+        if not match:
+            self._last_field = None
+            return
+        self._last_field = lookup_field(match.group('key'))
+        if self._last_field:
+            self._set_field(self._last_field, match.group('value').strip())
+
+    def _set_field(self, field, value):
+        """Store a parsed value on the current adapter"""
+        adapter = self._current
+        if field == 'dhcp':
+            adapter['dhcp'] = value.casefold() in YES_VALUES
+        elif field in LIST_FIELDS:
+            # Drop '(Preferred)' style annotations
+            value = _ANNOTATION_PATTERN.sub('', value).strip()
+            if value:
+                adapter[field].append(value)
+        else:
+            adapter[field] = value
+
+
+def parse_ipconfig(data, encoding=None):
+    """
+    Parse complete 'ipconfig /all' output
+
+    Args:
+        data: Output bytes, or an iterable of byte chunks
+        encoding: Output encoding, detected automatically when None
+
+    Returns:
+        list: Adapter dictionaries with name, kind, description, mac, dhcp,
+        ipv4, ipv6, gateway and dns
+    """
+    parser = IpconfigParser(encoding)
+    if isinstance(data, (bytes, bytearray)):
+        chunks = (data[i:i + SNIFF_SIZE] for i in range(0, len(data), SNIFF_SIZE))
+    else:
+        chunks = data
+    for chunk in chunks:
+        parser.feed(bytes(chunk))
+    return parser.close()
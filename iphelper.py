@@ -0,0 +1,555 @@
+"""IP Helper Module
+
+In-process backend for adapter enumeration, DHCP release/renew and DNS cache
+flushing through the Windows IP Helper and DNS APIs, called with ctypes. It
+saves the child process and the text scraping of 'ipconfig'. IpHelperRunner
+serves those ipconfig commands natively and passes every other command, or
+any command the API cannot handle, to the process runner.
+
+FakeIpHelperLibraries stands in for iphlpapi.dll and dnsapi.dll, so the
+ctypes code runs unchanged on any OS.
+"""
+import ctypes
+import socket
+import threading
+import time
+
+from cancellation import CommandTimeoutError, OperationCancelled
+from command_runner import CommandResult, SubprocessRunner, command_timeout
+from ipconfig_parser import new_adapter
+from tracing import trace_span
+
+
+ERROR_SUCCESS = 0
+ERROR_BUFFER_OVERFLOW = 111
+ERROR_INSUFFICIENT_BUFFER = 122
+
+# Address families as numbered by Winsock
+AF_UNSPEC = 0
+AF_INET = 2
+AF_INET6 = 23
+
+GAA_FLAG_SKIP_ANYCAST = 0x2
+GAA_FLAG_SKIP_MULTICAST = 0x4
+GAA_FLAG_INCLUDE_GATEWAYS = 0x80
+IP_ADAPTER_DHCP_ENABLED = 0x4
+
+# Interface types (IANA ifType) and the adapter kind ipconfig shows them as
+IF_TYPE_SOFTWARE_LOOPBACK = 24
+IF_TYPE_KINDS = {
+    6: 'ethernet',
+    71: 'wireless',
+    23: 'ppp',
+    131: 'tunnel',
+}
+
+# Initial GetAdaptersAddresses buffer size recommended by the documentation
+ADAPTER_BUFFER_SIZE = 15 * 1024
+
+MAX_ADAPTER_NAME = 128
+
+
+class SOCKET_ADDRESS(ctypes.Structure):
+    _fields_ = [
+        ('lpSockaddr', ctypes.c_void_p),
+        ('iSockaddrLength', ctypes.c_int),
+    ]
+
+
+class IP_ADAPTER_ADDRESS_ENTRY(ctypes.Structure):
+    """Common prefix of the unicast, DNS server and gateway address entries"""
+
+
+IP_ADAPTER_ADDRESS_ENTRY._fields_ = [
+    ('Length', ctypes.c_ulong),
+    ('Flags', ctypes.c_ulong),
+    ('Next', ctypes.POINTER(IP_ADAPTER_ADDRESS_ENTRY)),
+    ('Address', SOCKET_ADDRESS),
+]
+
+
+class IP_ADAPTER_ADDRESSES(ctypes.Structure):
+    """Leading fields of IP_ADAPTER_ADDRESSES, up to the gateway list"""
+
+
+IP_ADAPTER_ADDRESSES._fields_ = [
+    ('Length', ctypes.c_ulong),
+    ('IfIndex', ctypes.c_ulong),
+    ('Next', ctypes.POINTER(IP_ADAPTER_ADDRESSES)),
+    ('AdapterName', ctypes.c_char_p),
+    ('FirstUnicastAddress', ctypes.POINTER(IP_ADAPTER_ADDRESS_ENTRY)),
+    ('FirstAnycastAddress', ctypes.c_void_p),
+    ('FirstMulticastAddress', ctypes.c_void_p),
+    ('FirstDnsServerAddress', ctypes.POINTER(IP_ADAPTER_ADDRESS_ENTRY)),
+    ('DnsSuffix', ctypes.c_wchar_p),
+    ('Description', ctypes.c_wchar_p),
+    ('FriendlyName', ctypes.c_wchar_p),
+    ('PhysicalAddress', ctypes.c_ubyte * 8),
+    ('PhysicalAddressLength', ctypes.c_ulong),
+    ('Flags', ctypes.c_ulong),
+    ('Mtu', ctypes.c_ulong),
+    ('IfType', ctypes.c_ulong),
+    ('OperStatus', ctypes.c_int),
+    ('Ipv6IfIndex', ctypes.c_ulong),
+    ('ZoneIndices', ctypes.c_ulong * 16),
+    ('FirstPrefix', ctypes.c_void_p),
+    ('TransmitLinkSpeed', ctypes.c_uint64),
+    ('ReceiveLinkSpeed', ctypes.c_uint64),
+    ('FirstWinsServerAddress', ctypes.c_void_p),
+    ('FirstGatewayAddress', ctypes.POINTER(IP_ADAPTER_ADDRESS_ENTRY)),
+]
+
+
+class IP_ADAPTER_INDEX_MAP(ctypes.Structure):
+    _fields_ = [
+        ('Index', ctypes.c_ulong),
+        ('Name', ctypes.c_wchar * MAX_ADAPTER_NAME),
+    ]
+
+
+class IP_INTERFACE_INFO(ctypes.Structure):
+    """Header of IP_INTERFACE_INFO; NumAdapters index maps follow"""
+    _fields_ = [
+        ('NumAdapters', ctypes.c_long),
+        ('Adapter', IP_ADAPTER_INDEX_MAP * 1),
+    ]
+
+
+def _walk(pointer):
+    """Iterate over a linked list of ctypes structures"""
+    while pointer:
+        yield pointer.contents
+        pointer = pointer.contents.Next
+
+
+def format_sockaddr(address):
+    """
+    Format a SOCKET_ADDRESS as text
+
+    Returns:
+        str: The IPv4 or IPv6 address, or None for other families
+    """
+    if not address.lpSockaddr or address.iSockaddrLength < 8:
+        return None
+    data = ctypes.string_at(address.lpSockaddr, address.iSockaddrLength)
+    family = int.from_bytes(data[0:2], 'little')
+    if family == AF_INET:
+        return socket.inet_ntop(socket.AF_INET, data[4:8])
+    if family == AF_INET6 and len(data) >= 24:
+        return socket.inet_ntop(socket.AF_INET6, data[8:24])
+    return None
+
+
+def format_mac(address, length):
+    """Format a physical address the way ipconfig shows it"""
+    return "-".join(f"{byte:02X}" for byte in bytes(address)[:length])
+
+
+class IpHelper:
+    """Calls the IP Helper and DNS APIs through ctypes"""
+
+    def __init__(self, libraries=None):
+        """
+        Args:
+            libraries: Object with 'iphlpapi' and 'dnsapi' attributes,
+                defaults to the Windows DLLs
+
+        Raises:
+            OSError: If the DLLs cannot be loaded on this system
+        """
+        if libraries is None:
+            try:
+                self.iphlpapi = ctypes.windll.iphlpapi
+                self.dnsapi = ctypes.windll.dnsapi
+            except AttributeError:
+                raise OSError("The IP Helper API is only available on Windows")
+        else:
+            self.iphlpapi = libraries.iphlpapi
+            self.dnsapi = libraries.dnsapi
+
+    def get_adapters(self):
+        """
+        Enumerate the adapters ipconfig would show
+
+        Returns:
+            list: Adapter records in the format of the ipconfig parser, with
+            the extra 'interface_index' and 'guid' fields
+
+        Raises:
+            OSError: If GetAdaptersAddresses fails
+        """
+        flags = GAA_FLAG_SKIP_ANYCAST | GAA_FLAG_SKIP_MULTICAST | GAA_FLAG_INCLUDE_GATEWAYS
+        size = ctypes.c_ulong(ADAPTER_BUFFER_SIZE)
+        # The adapter list can grow between the size query and the call
+        for _ in range(3):
+            buffer = ctypes.create_string_buffer(size.value)
+            error = self.iphlpapi.GetAdaptersAddresses(AF_UNSPEC, flags, None, buffer, ctypes.byref(size))
+            if error != ERROR_BUFFER_OVERFLOW:
+                break
+        if error != ERROR_SUCCESS:
+            raise OSError(f"GetAdaptersAddresses failed with error {error}")
+
+        adapters = []
+        first = ctypes.cast(buffer, ctypes.POINTER(IP_ADAPTER_ADDRESSES))
+        for entry in _walk(first):
+            if entry.IfType == IF_TYPE_SOFTWARE_LOOPBACK:
+                continue
+            adapter = new_adapter(entry.FriendlyName or "", IF_TYPE_KINDS.get(entry.IfType, 'other'))
+            adapter['description'] = entry.Description or ""
+            adapter['mac'] = format_mac(entry.PhysicalAddress, entry.PhysicalAddressLength)
+            adapter['dhcp'] = bool(entry.Flags & IP_ADAPTER_DHCP_ENABLED)
+            for address in filter(None, (format_sockaddr(unicast.Address)
+                                         for unicast in _walk(entry.FirstUnicastAddress))):
+                adapter['ipv6' if ':' in address else 'ipv4'].append(address)
+            adapter['gateway'] = [address for address in (
+                format_sockaddr(gateway.Address) for gateway in _walk(entry.FirstGatewayAddress)
+            ) if address]
+            adapter['dns'] = [address for address in (
+                format_sockaddr(server.Address) for server in _walk(entry.FirstDnsServerAddress)
+            ) if address]
+            adapter['interface_index'] = entry.IfIndex or entry.Ipv6IfIndex
+            adapter['guid'] = (entry.AdapterName or b"").decode('ascii', errors='replace')
+            adapters.append(adapter)
+        return adapters
+
+    def get_interfaces(self):
+        """
+        List the IPv4 interfaces DHCP requests are sent on
+
+        Returns:
+            list: IP_ADAPTER_INDEX_MAP copies
+
+        Raises:
+            OSError: If GetInterfaceInfo fails
+        """
+        size = ctypes.c_ulong(0)
+        error = self.iphlpapi.GetInterfaceInfo(None, ctypes.byref(size))
+        if error not in (ERROR_SUCCESS, ERROR_INSUFFICIENT_BUFFER):
+            raise OSError(f"GetInterfaceInfo failed with error {error}")
+        if size.value < ctypes.sizeof(IP_INTERFACE_INFO):
+            return []
+        buffer = ctypes.create_string_buffer(size.value)
+        error = self.iphlpapi.GetInterfaceInfo(buffer, ctypes.byref(size))
+        if error != ERROR_SUCCESS:
+            raise OSError(f"GetInterfaceInfo failed with error {error}")
+        info = IP_INTERFACE_INFO.from_buffer(buffer)
+        maps = (IP_ADAPTER_INDEX_MAP * info.NumAdapters).from_buffer(buffer, IP_INTERFACE_INFO.Adapter.offset)
+        return [IP_ADAPTER_INDEX_MAP(index_map.Index, index_map.Name) for index_map in maps]
+
+    def _dhcp_interfaces(self):
+        """Pair the DHCP-enabled interfaces with their adapter names"""
+        adapters = {adapter['guid'].upper(): adapter for adapter in self.get_adapters() if adapter['dhcp']}
+        pairs = []
+        for index_map in self.get_interfaces():
+            # Index map names look like '\DEVICE\TCPIP_{GUID}'
+            guid = index_map.Name.rsplit('_', 1)[-1].upper()
+            if guid in adapters:
+                pairs.append((adapters[guid]['name'], index_map))
+        return pairs
+
+    def release(self, names=None):
+        """
+        Release the DHCP leases of DHCP-enabled adapters
+
+        Args:
+            names: Only release these adapters, defaults to all
+
+        Returns:
+            list: (adapter name, error code) per adapter
+        """
+        return [(name, self.iphlpapi.IpReleaseAddress(ctypes.byref(index_map)))
+                for name, index_map in self._dhcp_interfaces() if names is None or name in names]
+
+    def renew(self, names=None):
+        """
+        Renew the DHCP leases of DHCP-enabled adapters
+
+        Args:
+            names: Only renew these adapters, defaults to all
+
+        Returns:
+            list: (adapter name, error code) per adapter
+        """
+        return [(name, self.iphlpapi.IpRenewAddress(ctypes.byref(index_map)))
+                for name, index_map in self._dhcp_interfaces() if names is None or name in names]
+
+    def flush_dns_cache(self):
+        """
+        Flush the DNS resolver cache
+
+        Returns:
+            bool: Whether the cache was flushed
+        """
+        return bool(self.dnsapi.DnsFlushResolverCache())
+
+
+class IpHelperRunner:
+    """
+    Runner serving ipconfig commands through the IP Helper API
+
+    'ipconfig /flushdns', '/release' and '/renew' (for all adapters or one
+    adapter named exactly) run in-process and
+    get_adapters() replaces parsing 'ipconfig /all'. Everything else, and any
+    call the API fails on, runs on the fallback runner.
+    """
+
+    def __init__(self, helper=None, fallback=None):
+        """
+        Args:
+            helper: IpHelper, defaults to the Windows API
+            fallback: Runner for other commands, defaults to SubprocessRunner
+        """
+        self.helper = helper or IpHelper()
+        self.fallback = fallback or SubprocessRunner()
+        self.handlers = {
+            ("ipconfig", "/flushdns"): self._flush_dns,
+            ("ipconfig", "/release"): self._release,
+            ("ipconfig", "/renew"): self._renew,
+        }
+
+    def get_adapters(self):
+        """
+        Enumerate adapters in-process
+
+        Returns:
+            list: Adapter records, or None if the API failed
+        """
+        try:
+            with trace_span("GetAdaptersAddresses", 'iphelper') as span:
+                adapters = self.helper.get_adapters()
+                span['count'] = len(adapters)
+            return adapters
+        except OSError:
+            return None
+
+    def run(self, args, timeout=None, token=None, on_output=None):
+        """
+        Run a command natively if possible, otherwise on the fallback runner
+
+        The API calls cannot be interrupted; on timeout or cancellation the
+        call is abandoned on its worker thread.
+        """
+        handler = self.handlers.get(tuple(arg.lower() for arg in args[:2]))
+        # ipconfig also accepts wildcards in adapter names; leave those to it
+        if handler is None or len(args) > 3 or any('*' in arg or '?' in arg for arg in args[2:]):
+            return self.fallback.run(args, timeout=timeout, token=token, on_output=on_output)
+        if timeout is None:
+            timeout = command_timeout(args)
+        if token is not None:
+            token.raise_if_cancelled()
+
+        outcome = {}
+        finished = threading.Event()
+
+        def call():
+            try:
+                outcome['lines'], outcome['ok'] = handler(args[2:] or None)
+            except OSError as e:
+                outcome['error'] = e
+            finally:
+                finished.set()
+
+        with trace_span(" ".join(args), 'iphelper', argv=list(args)) as span:
+            start = time.perf_counter()
+            threading.Thread(target=call, daemon=True).start()
+            deadline = start + timeout
+            while not finished.wait(0.05):
+                if token is not None and token.cancelled:
+                    raise OperationCancelled(token.reason)
+                if time.perf_counter() >= deadline:
+                    span['timeout'] = timeout
+                    raise CommandTimeoutError(args, timeout)
+            duration = time.perf_counter() - start
+            if 'error' in outcome:
+                span['fallback'] = str(outcome['error'])
+                return self.fallback.run(args, timeout=timeout, token=token, on_output=on_output)
+            if on_output is not None:
+                for line in outcome['lines']:
+                    on_output(line)
+            stdout = "\r\n".join(outcome['lines']).encode('utf-8')
+            span['returncode'] = 0 if outcome['ok'] else 1
+        return CommandResult(args, 0 if outcome['ok'] else 1, stdout, b"", duration)
+
+    def _flush_dns(self, names):
+        if names:
+            raise OSError("ipconfig /flushdns takes no adapter")
+        if self.helper.flush_dns_cache():
+            return ["Successfully flushed the DNS Resolver Cache."], True
+        return ["Could not flush the DNS Resolver Cache."], False
+
+    def _release(self, names):
+        return self._dhcp_lines("released", self.helper.release(names))
+
+    def _renew(self, names):
+        return self._dhcp_lines("renewed", self.helper.renew(names))
+
+    @staticmethod
+    def _dhcp_lines(action, results):
+        lines = [
+            f"{name}: {action}" if error == ERROR_SUCCESS else f"{name}: failed with error {error}"
+            for name, error in results
+        ]
+        return lines, all(error == ERROR_SUCCESS for _, error in results)
+
+
+def create_runner(fallback=None):
+    """
+    Create an IpHelperRunner if the IP Helper API is available
+
+    Args:
+        fallback: Process runner used for other commands
+
+    Returns:
+        IpHelperRunner, or the fallback (a SubprocessRunner by default) when
+        the API cannot be loaded
+    """
+    fallback = fallback or SubprocessRunner()
+    try:
+        return IpHelperRunner(IpHelper(), fallback)
+    except OSError:
+        return fallback
+
+
+def _deref(reference):
+    """Object behind a ctypes.byref() argument"""
+    return getattr(reference, '_obj', reference)
+
+
+class FakeIphlpapi:
+    """
+    Stand-in for iphlpapi.dll backed by adapter records
+
+    Responses are built as real ctypes structures, so the parsing code in
+    IpHelper is exercised exactly as against the Windows API.
+    """
+
+    def __init__(self, adapters):
+        """
+        Args:
+            adapters: Adapter records as returned by the ipconfig parser
+        """
+        self.adapters = [dict(adapter) for adapter in adapters]
+        for index, adapter in enumerate(self.adapters, 1):
+            adapter.setdefault('interface_index', index)
+            adapter.setdefault('guid', "{%08X-0000-0000-0000-000000000000}" % index)
+        self.calls = []
+        self._keep_alive = []
+
+    def _keep(self, value):
+        self._keep_alive.append(value)
+        return value
+
+    def _sockaddr(self, address):
+        entry = self._keep(IP_ADAPTER_ADDRESS_ENTRY())
+        if ':' in address:
+            data = (AF_INET6.to_bytes(2, 'little') + bytes(6) + socket.inet_pton(socket.AF_INET6, address)
+                    + bytes(4))
+        else:
+            data = AF_INET.to_bytes(2, 'little') + bytes(2) + socket.inet_pton(socket.AF_INET, address) + bytes(8)
+        raw = self._keep(ctypes.create_string_buffer(data, len(data)))
+        entry.Length = ctypes.sizeof(entry)
+        entry.Address.lpSockaddr = ctypes.addressof(raw)
+        entry.Address.iSockaddrLength = len(data)
+        return entry
+
+    def _address_list(self, addresses):
+        first = ctypes.POINTER(IP_ADAPTER_ADDRESS_ENTRY)()
+        for address in reversed(addresses):
+            entry = self._sockaddr(address)
+            entry.Next = first
+            first = ctypes.pointer(entry)
+        return first
+
+    def GetAdaptersAddresses(self, family, flags, reserved, buffer, size):
+        self.calls.append("GetAdaptersAddresses")
+        size = _deref(size)
+        needed = ctypes.sizeof(IP_ADAPTER_ADDRESSES) * max(1, len(self.adapters))
+        if buffer is None or size.value < needed:
+            size.value = needed
+            return ERROR_BUFFER_OVERFLOW
+        kind_types = {kind: if_type for if_type, kind in IF_TYPE_KINDS.items()}
+        kind_types['loopback'] = IF_TYPE_SOFTWARE_LOOPBACK
+        entries = []
+        for adapter in self.adapters:
+            entry = self._keep(IP_ADAPTER_ADDRESSES())
+            entry.Length = ctypes.sizeof(entry)
+            entry.IfIndex = adapter['interface_index']
+            entry.AdapterName = adapter['guid'].encode('ascii')
+            entry.FriendlyName = adapter['name']
+            entry.Description = adapter['description']
+            mac = bytes.fromhex(adapter['mac'].replace('-', '')) if adapter['mac'] else b""
+            entry.PhysicalAddress[:len(mac)] = list(mac)
+            entry.PhysicalAddressLength = len(mac)
+            entry.Flags = IP_ADAPTER_DHCP_ENABLED if adapter['dhcp'] else 0
+            entry.IfType = kind_types.get(adapter['kind'], 1)
+            entry.FirstUnicastAddress = self._address_list(adapter['ipv4'] + adapter['ipv6'])
+            entry.FirstGatewayAddress = self._address_list(adapter['gateway'])
+            entry.FirstDnsServerAddress = self._address_list(adapter['dns'])
+            entries.append(entry)
+        for entry, following in zip(entries, entries[1:]):
+            entry.Next = ctypes.pointer(following)
+        if entries:
+            ctypes.memmove(buffer, ctypes.addressof(entries[0]), ctypes.sizeof(IP_ADAPTER_ADDRESSES))
+        return ERROR_SUCCESS
+
+    def GetInterfaceInfo(self, buffer, size):
+        self.calls.append("GetInterfaceInfo")
+        size = _deref(size)
+        count = len(self.adapters)
+        needed = IP_INTERFACE_INFO.Adapter.offset + ctypes.sizeof(IP_ADAPTER_INDEX_MAP) * max(1, count)
+        if buffer is None or size.value < needed:
+            size.value = needed
+            return ERROR_INSUFFICIENT_BUFFER
+        ctypes.c_long.from_buffer(buffer).value = count
+        maps = (IP_ADAPTER_INDEX_MAP * count).from_buffer(buffer, IP_INTERFACE_INFO.Adapter.offset)
+        for index_map, adapter in zip(maps, self.adapters):
+            index_map.Index = adapter['interface_index']
+            index_map.Name = "\\DEVICE\\TCPIP_" + adapter['guid']
+        return ERROR_SUCCESS
+
+    def _adapter_for(self, index_map):
+        index = _deref(index_map).Index
+        for adapter in self.adapters:
+            if adapter['interface_index'] == index:
+                return adapter
+        return None
+
+    def IpReleaseAddress(self, index_map):
+        self.calls.append("IpReleaseAddress")
+        adapter = self._adapter_for(index_map)
+        if adapter is None:
+            return 87
+        adapter['leased_ipv4'] = adapter.get('leased_ipv4') or adapter['ipv4']
+        adapter['ipv4'] = []
+        return ERROR_SUCCESS
+
+    def IpRenewAddress(self, index_map):
+        self.calls.append("IpRenewAddress")
+        adapter = self._adapter_for(index_map)
+        if adapter is None:
+            return 87
+        adapter['ipv4'] = adapter.pop('leased_ipv4', None) or adapter['ipv4']
+        return ERROR_SUCCESS
+
+
+class FakeDnsapi:
+    """Stand-in for dnsapi.dll"""
+
+    def __init__(self):
+        self.flushes = 0
+
+    def DnsFlushResolverCache(self):
+        self.flushes += 1
+        return 1
+
+
+class FakeIpHelperLibraries:
+    """Fake DLL pair for IpHelper(libraries=...)"""
+
+    def __init__(self, adapters):
+        """
+        Args:
+            adapters: Adapter records the fake system reports
+        """
+        self.iphlpapi = FakeIphlpapi(adapters)
+        self.dnsapi = FakeDnsapi()
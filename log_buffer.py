@@ -0,0 +1,52 @@
+"""Log Buffer Module
+
+Turns batches of log messages into single widget updates. Each batch becomes
+one text chunk plus the number of old lines to remove, so the log widget
+never holds more than a fixed number of lines while the full log stays
+available in memory. Free of any UI dependencies.
+"""
+from constants import LOG_MAX_LINES
+
+
+class LogBuffer:
+    """Full in-memory log plus the bookkeeping for a bounded log widget"""
+
+    def __init__(self, max_lines=LOG_MAX_LINES):
+        """
+        Args:
+            max_lines: Maximum number of lines kept in the widget
+        """
+        self.max_lines = max_lines
+        self.lines = []
+        self.widget_lines = 0
+
+    def append(self, messages):
+        """
+        Add messages to the log and plan one widget update
+
+        Args:
+            messages: List of message strings, each may span several lines
+
+        Returns:
+            tuple: (text, trim) - text to append at the end of the widget and
+            the number of lines to delete from its top first
+        """
+        if not messages:
+            return "", 0
+
+        new_lines = "\n".join(messages).split("\n")
+        self.lines.extend(new_lines)
+
+        if len(new_lines) >= self.max_lines:
+            # The batch alone fills the widget: replace everything
+            trim = self.widget_lines
+            new_lines = new_lines[-self.max_lines:]
+            self.widget_lines = self.max_lines
+        else:
+            trim = max(0, self.widget_lines + len(new_lines) - self.max_lines)
+            self.widget_lines += len(new_lines) - trim
+        return "\n".join(new_lines) + "\n", trim
+
+    def text(self):
+        """Return the full log, including lines removed from the widget"""
+        return "\n".join(self.lines) + "\n" if self.lines else ""
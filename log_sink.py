@@ -0,0 +1,168 @@
+"""Log File Module
+
+Writes the execution log to a file so it outlives the window. Callers only
+put messages on a queue; a background thread writes them in batches,
+rotates the file once it reaches a size limit and optionally gzips the
+rotated segments, so disk I/O never blocks the repair worker or the Tk loop.
+"""
+import gzip
+import os
+import queue
+import shutil
+import threading
+import time
+
+from constants import (
+    LOG_BATCH_SIZE, LOG_FILE_MAX_BYTES, LOG_FILE_BACKUPS, LOG_FILE_COMPRESS, LOG_FILE_FLUSH_INTERVAL,
+    LOG_FILE_CLOSE_TIMEOUT,
+)
+
+
+# Queued in place of a message to stop the writer thread
+_CLOSE = object()
+
+
+def default_log_path():
+    """Path of the log file in the user's local application data"""
+    base = os.environ.get('LOCALAPPDATA') or os.path.expanduser('~')
+    return os.path.join(base, "network_repair", "logs", "network_repair.log")
+
+
+def format_entry(timestamp, message):
+    """
+    Format a logged message for the file
+
+    Args:
+        timestamp: time.time() when the message was logged
+        message: Message string, may span several lines
+
+    Returns:
+        str: One timestamped line per message line
+    """
+    stamp = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(timestamp))
+    stamp += f".{int(timestamp % 1 * 1000):03d}"
+    return "".join(f"{stamp} {line}".rstrip() + "\n" for line in message.split("\n"))
+
+
+class LogFileSink:
+    """Buffered log file written by a background thread"""
+
+    def __init__(self, path=None, max_bytes=LOG_FILE_MAX_BYTES, backup_count=LOG_FILE_BACKUPS,
+                 compress=LOG_FILE_COMPRESS, flush_interval=LOG_FILE_FLUSH_INTERVAL,
+                 batch_size=LOG_BATCH_SIZE, log_callback=None):
+        """
+        Args:
+            path: Log file, defaults to default_log_path()
+            max_bytes: Size at which the file is rotated, 0 to never rotate
+            backup_count: Number of rotated segments kept
+            compress: Gzip rotated segments
+            flush_interval: Longest time in seconds a message waits in the buffer
+            batch_size: Maximum number of messages written at once
+            log_callback: Receives a warning if the file cannot be written;
+                called from the writer thread
+        """
+        self.path = path or default_log_path()
+        self.max_bytes = max_bytes
+        self.backup_count = backup_count
+        self.compress = compress
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+        self.log_callback = log_callback
+        self.error = None
+        self._queue = queue.Queue()
+        self._file = None
+        self._size = 0
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name="log-file", daemon=True)
+        self._thread.start()
+
+    def write(self, message):
+        """Queue a message for the file; never blocks, safe to call from any thread"""
+        if not self._closed:
+            self._queue.put((time.time(), message))
+
+    def close(self, timeout=LOG_FILE_CLOSE_TIMEOUT):
+        """
+        Write the queued messages and stop the writer thread
+
+        Args:
+            timeout: Longest time in seconds to wait for the writer
+        """
+        if self._closed:
+            return
+        self._closed = True
+        self._queue.put(_CLOSE)
+        self._thread.join(timeout)
+
+    def backup_path(self, index):
+        """Path of the rotated segment with the given number, 1 being the newest"""
+        return f"{self.path}.{index}" + (".gz" if self.compress else "")
+
+    def _run(self):
+        """Writer thread: collect messages into batches and write them"""
+        closing = False
+        while not closing:
+            item = self._queue.get()
+            batch = []
+            deadline = time.monotonic() + self.flush_interval
+            while True:
+                if item is _CLOSE:
+                    closing = True
+                    break
+                batch.append(item)
+                if len(batch) >= self.batch_size:
+                    break
+                # Wait a little for more messages so they are written together
+                try:
+                    item = self._queue.get(timeout=max(0.0, deadline - time.monotonic()))
+                except queue.Empty:
+                    break
+            if batch and self.error is None:
+                self._write(batch)
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def _write(self, batch):
+        """Append a batch to the file, rotating it first if it would grow too large"""
+        data = "".join(format_entry(timestamp, message) for timestamp, message in batch).encode('utf-8')
+        try:
+            if self._file is None:
+                os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+                self._file = open(self.path, 'ab')
+                self._size = self._file.tell()
+            if self.max_bytes and self._size and self._size + len(data) > self.max_bytes:
+                self._rotate()
+            self._file.write(data)
+            self._file.flush()
+            self._size += len(data)
+        except OSError as e:
+            # Give up on the file; the log is still shown in the window
+            self.error = str(e)
+            if self.log_callback:
+                self.log_callback(f"⚠️ Failed to write log file: {self.error}")
+
+    def _rotate(self):
+        """Move the full file to the first backup and start a new one"""
+        self._file.close()
+        self._file = None
+        if self.backup_count > 0:
+            oldest = self.backup_path(self.backup_count)
+            if os.path.exists(oldest):
+                os.remove(oldest)
+            for index in range(self.backup_count - 1, 0, -1):
+                if os.path.exists(self.backup_path(index)):
+                    os.replace(self.backup_path(index), self.backup_path(index + 1))
+            if self.compress:
+                # Compress to a temporary name so a failure leaves no truncated backup
+                partial = self.backup_path(1) + ".tmp"
+                with open(self.path, 'rb') as source, gzip.open(partial, 'wb') as target:
+                    shutil.copyfileobj(source, target)
+                os.replace(partial, self.backup_path(1))
+                os.remove(self.path)
+            else:
+                os.replace(self.path, self.backup_path(1))
+        else:
+            os.remove(self.path)
+        self._file = open(self.path, 'ab')
+        self._size = 0
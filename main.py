@@ -1,12 +1,43 @@
-"""Network Repair Tool Main Entry"""
+"""Network Repair Tool Main Entry
+
+Only the standard library and admin_utils (ctypes) are loaded before the
+elevation check; the GUI toolkit and the repair modules are imported once
+the process is known to stay running.
+"""
 import sys
-import customtkinter as ctk
-from gui import NetworkRepairGUI
-from admin_utils import is_admin, request_admin_privileges
+
+
+def print_import_report(timer):
+    """Print the import time report to stderr"""
+    timer.uninstall()
+    if sys.stderr is None:
+        # Windowed executables have no console
+        return
+    print("Import times:", file=sys.stderr)
+    for line in timer.report_lines():
+        print(line, file=sys.stderr)
 
 
 def main():
     """Main function"""
+    args = sys.argv[1:]
+    
+    # Optional import time report, printed when the program exits
+    if "--import-report" in args:
+        import atexit
+        from import_timer import ImportTimer
+        timer = ImportTimer()
+        timer.install()
+        atexit.register(print_import_report, timer)
+        args = [arg for arg in args if arg != "--import-report"]
+    
+    # Headless mode never loads the GUI toolkit
+    if "--headless" in args:
+        from cli import main as headless_main
+        sys.exit(headless_main([arg for arg in args if arg != "--headless"]))
+    
+    from admin_utils import is_admin, request_admin_privileges
+    
     # Check if running with administrator privileges
     if not is_admin():
         # Request administrator privileges
@@ -18,9 +49,18 @@ def main():
             print("Administrator privileges are required to run this program")
             sys.exit(1)
     
+    # Serve ipconfig through the IP Helper API, spawning processes only as a fallback
+    from command_runner import set_runner
+    from iphelper import create_runner
+    set_runner(create_runner())
+    
+    import customtkinter as ctk
+    from gui import NetworkRepairGUI
+    
     root = ctk.CTk()
     app = NetworkRepairGUI(root)
     root.mainloop()
+    app.close()
 
 
 if __name__ == "__main__":
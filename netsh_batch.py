@@ -0,0 +1,156 @@
+"""netsh Batch Module
+
+Collects planned netsh commands and executes them through a single
+'netsh -f <script>' process. Results are mapped back to the individual
+operations; when the batch reports a failure, its operations are re-run one
+by one so the failing command can be identified.
+"""
+import hashlib
+import locale
+import os
+import shutil
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from cancellation import RepairInterrupted
+from command_runner import get_runner
+from constants import CONFIGURE_MAX_WORKERS
+
+
+def command_succeeded(result):
+    """
+    Check a netsh result
+
+    netsh reports some harmless conditions such as 'DHCP is already enabled'
+    with a non-zero exit code but without writing to stderr, so only stderr
+    output counts as a failure.
+    """
+    return result.returncode == 0 or not result.stderr
+
+
+def batch_succeeded(result):
+    """
+    Check the result of a 'netsh -f' batch
+
+    Inside a script netsh reports errors on stdout, so any non-zero exit code
+    counts as a failure and the operations are re-run to attribute it.
+    """
+    return result.returncode == 0
+
+
+def quote_argument(argument):
+    """Quote a netsh script argument if it contains spaces"""
+    if ' ' in argument or '\t' in argument:
+        return f'"{argument}"'
+    return argument
+
+
+def netsh_script_name(batch):
+    """
+    Get the script file name for a batch
+
+    The file is named after the script content so that recorded transcripts
+    replay deterministically; command_key() matches script files by name.
+    """
+    digest = hashlib.sha1(batch.script_text().encode('utf-8')).hexdigest()[:12]
+    return f"network_repair_netsh_{digest}.txt"
+
+
+class NetshOperation:
+    """A single planned netsh command"""
+
+    def __init__(self, args, label=None):
+        """
+        Args:
+            args: netsh arguments without the leading 'netsh'
+            label: Optional identifier used by callers to group results
+        """
+        self.args = list(args)
+        self.label = label
+        self.success = None
+        self.error = ""
+        self.duration = None
+
+    def script_line(self):
+        """Return the operation as a line of a netsh script"""
+        return " ".join(quote_argument(argument) for argument in self.args)
+
+
+class NetshBatch:
+    """Runs a list of netsh operations in as few processes as possible"""
+
+    def __init__(self, runner=None):
+        self.runner = runner or get_runner()
+        self.operations = []
+
+    def add(self, args, label=None):
+        """
+        Plan a netsh command
+
+        Args:
+            args: netsh arguments without the leading 'netsh'
+            label: Optional identifier used to group results
+
+        Returns:
+            NetshOperation: The planned operation, filled in by execute()
+        """
+        operation = NetshOperation(args, label)
+        self.operations.append(operation)
+        return operation
+
+    def script_text(self):
+        """Return the netsh script for all planned operations"""
+        return "\r\n".join(operation.script_line() for operation in self.operations) + "\r\n"
+
+    def execute(self, max_workers=CONFIGURE_MAX_WORKERS, on_output=None):
+        """
+        Execute all planned operations
+
+        Args:
+            max_workers: Concurrency used when operations are re-run individually
+            on_output: Receives the output of the batch line by line while it runs
+
+        Returns:
+            tuple: (operations, batch_succeeded)
+        """
+        if not self.operations:
+            return self.operations, True
+
+        data = self.script_text().encode(locale.getpreferredencoding(False), errors='replace')
+        # The elevated netsh runs whatever the script says, so it is written
+        # to a directory only this user can access instead of a predictable
+        # path in the shared temp directory
+        directory = tempfile.mkdtemp(prefix="network_repair_")
+        try:
+            path = os.path.join(directory, netsh_script_name(self))
+            with open(path, 'wb') as f:
+                f.write(data)
+            result = self.runner.run(["netsh", "-f", path], on_output=on_output)
+        finally:
+            shutil.rmtree(directory, ignore_errors=True)
+
+        if batch_succeeded(result):
+            for operation in self.operations:
+                operation.success = True
+            return self.operations, True
+
+        # Attribute the failure by running each operation on its own
+        with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(self.operations)))) as executor:
+            list(executor.map(self._run_single, self.operations))
+        return self.operations, False
+
+    def _run_single(self, operation):
+        """Run one operation in its own netsh process"""
+        start = time.perf_counter()
+        try:
+            result = self.runner.run(["netsh"] + operation.args)
+            operation.success = command_succeeded(result)
+            if not operation.success:
+                operation.error = result.stderr_text()
+        except RepairInterrupted:
+            raise
+        except Exception as e:
+            operation.success = False
+            operation.error = str(e)
+        operation.duration = time.perf_counter() - start
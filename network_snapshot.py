@@ -0,0 +1,95 @@
+"""Network Snapshot Module
+
+Parses 'ipconfig /all' once into structured per-adapter fields and caches the
+result so that every repair step reads the same snapshot until a step that
+changes network state invalidates it. Runners with a get_adapters() method
+(see iphelper.py) provide the adapters in-process instead.
+"""
+import threading
+import time
+
+from command_runner import get_runner
+from ipconfig_parser import parse_ipconfig
+
+
+class NetworkSnapshot:
+    """Structured view of the network configuration at one point in time"""
+
+    def __init__(self, adapters, taken_at=None):
+        self.adapters = adapters
+        self.taken_at = taken_at if taken_at is not None else time.time()
+
+    def find(self, name):
+        """Return the adapter with the given name, or None"""
+        for adapter in self.adapters:
+            if adapter['name'] == name:
+                return adapter
+        return None
+
+    def has_dhcp_lease(self, names=None):
+        """
+        Check whether any DHCP-enabled adapter still holds a routable IPv4 address
+
+        Args:
+            names: Only check these adapters, defaults to all
+        """
+        return any(
+            adapter['dhcp'] and (names is None or adapter['name'] in names) and any(
+                not address.startswith(('169.254.', '0.')) for address in adapter['ipv4']
+            )
+            for adapter in self.adapters
+        )
+
+
+def take_snapshot(runner=None):
+    """
+    Enumerate the adapters through the runner, or run 'ipconfig /all' and
+    parse it, into a new snapshot
+
+    Args:
+        runner: Command runner, defaults to the global runner
+
+    Returns:
+        NetworkSnapshot: Freshly taken snapshot
+
+    Raises:
+        RuntimeError: If ipconfig fails
+    """
+    runner = runner or get_runner()
+    get_adapters = getattr(runner, 'get_adapters', None)
+    adapters = get_adapters() if get_adapters is not None else None
+    if adapters is not None:
+        return NetworkSnapshot(adapters)
+    result = runner.run(["ipconfig", "/all"])
+    if result.returncode != 0:
+        raise RuntimeError(f"ipconfig /all exited with code {result.returncode}")
+    return NetworkSnapshot(parse_ipconfig(result.stdout))
+
+
+_cached_snapshot = None
+_cache_lock = threading.Lock()
+
+
+def get_snapshot(runner=None, refresh=False):
+    """
+    Get the cached snapshot, taking a new one if needed
+
+    Args:
+        runner: Command runner, defaults to the global runner
+        refresh: Always take a new snapshot and replace the cached one
+
+    Returns:
+        NetworkSnapshot: Current snapshot
+    """
+    global _cached_snapshot
+    with _cache_lock:
+        if refresh or _cached_snapshot is None:
+            _cached_snapshot = take_snapshot(runner)
+        return _cached_snapshot
+
+
+def invalidate_snapshot():
+    """Discard the cached snapshot after a step that changes network state"""
+    global _cached_snapshot
+    with _cache_lock:
+        _cached_snapshot = None
@@ -1,271 +1,504 @@
 """Network Operations Utility Module"""
-import subprocess
 import time
-import wmi
-import pythoncom
-import requests
+from adapter_classifier import select_adapters
+from cancellation import RepairInterrupted, OperationCancelled
+from command_runner import decode_output, get_runner
+from ipconfig_parser import detect_encoding
+from netsh_batch import NetshBatch
+from proxy_settings import reset_proxy_settings
+from repair_plan import compile_plan
+from tracing import trace_span
+from network_snapshot import get_snapshot, invalidate_snapshot
+from constants import (
+    CONFIGURE_MAX_WORKERS, RELEASE_WAIT_TIMEOUT, RELEASE_POLL_INTERVAL, REFRESH_OPERATIONS, REPAIR_ADAPTER_CLASSES,
+)
 # from constants import USAGE_API_URL, USAGE_SOFTWARE_NAME
 
 
-def get_startupinfo():
-    """Get subprocess startup information to hide console window"""
-    startupinfo = subprocess.STARTUPINFO()
-    startupinfo.dwFlags |= subprocess.STARTF_USESHOWWINDOW
-    startupinfo.wShowWindow = subprocess.SW_HIDE
-    return startupinfo
+class RepairOperationError(Exception):
+    """Raised when a repair operation finished but some of its commands or adapters failed"""
 
 
-def get_ethernet_adapters(log_callback=None):
+def command_failure(result):
+    """
+    Describe a command that exited with an error
+
+    Args:
+        result: CommandResult of the command
+
+    Returns:
+        str: Command, exit code and last line of its error output, or None
+        if the command succeeded
+    """
+    if result.returncode == 0:
+        return None
+    # ipconfig reports errors on stdout
+    output = result.stderr or result.stdout
+    text = decode_output(output, detect_encoding(output)).strip() if output else ""
+    detail = f": {text.splitlines()[-1].strip()}" if text else ""
+    return f"'{' '.join(result.args)}' exited with code {result.returncode}{detail}"
+
+
+def get_ethernet_adapters(log_callback=None, runner=None, classes=REPAIR_ADAPTER_CLASSES):
     """
     Get Ethernet adapter information
     
+    Adapters are classified as physical, virtual, tunnel or loopback and only
+    those of the given classes are returned, so virtual switches and VPN
+    adapters are not reset.
+    
     Args:
         log_callback: Log callback function for outputting log information
+        runner: Command runner, defaults to the global runner
+        classes: Adapter classes to return, see adapter_classifier
     
     Returns:
         list: List of adapter information, each element contains 'name' and 'description'
+        along with the other snapshot fields and its 'class'
     """
     if log_callback:
         log_callback("Getting Ethernet adapter information...")
     
-    startupinfo = get_startupinfo()
+    runner = runner or get_runner()
     
     try:
-        result = subprocess.run(
-            ["ipconfig", "/all"], 
-            capture_output=True, 
-            text=True, 
-            encoding='gb2312', 
-            startupinfo=startupinfo
+        snapshot = get_snapshot(runner)
+        adapters, skipped = select_adapters(
+            [adapter for adapter in snapshot.adapters if adapter['description']], classes
         )
-        output = result.stdout
         
-        adapters = []
-        current_adapter = None
-        adapter_info = {}
-        
-        for line in output.split('\n'):
-            line = line.strip()
-            if line.startswith('以太网适配器') or line.startswith('无线局域网适配器'):
-                if line.startswith('以太网适配器'):
-                    adapter_name = line.replace('以太网适配器', '').replace(':', '').strip()
-                else:
-                    adapter_name = line.replace('无线局域网适配器', '').replace(':', '').strip()
-                current_adapter = adapter_name
-                adapter_info[current_adapter] = {'name': adapter_name}
-            elif current_adapter and line.startswith('描述'):
-                description = line.split(':', 1)[1].strip()
-                adapter_info[current_adapter]['description'] = description
-                if any(x in current_adapter for x in ['以太网', 'Eth', 'eth', 'WLAN', 'wlan']):
-                    adapters.append(adapter_info[current_adapter])
-        
-        for adapter in adapters:
-            if log_callback:
+        if log_callback:
+            for adapter in adapters:
                 log_callback(f"  📡 Found adapter: {adapter['name']} ({adapter['description']})")
+            for adapter, adapter_class, reason in skipped:
+                log_callback(f"  ⏭️ Skipping {adapter_class} adapter: {adapter['name']} "
+                             f"({adapter['description']}), {reason}")
         
         return adapters
         
+    except RepairInterrupted:
+        raise
     except Exception as e:
         if log_callback:
             log_callback(f"❌ Failed to get adapter information: {str(e)}")
         return []
 
 
-def configure_network(adapters, log_callback=None):
+def configure_network(adapters, log_callback=None, runner=None, max_workers=CONFIGURE_MAX_WORKERS):
     """
     Configure network settings (set IP and DNS to DHCP)
     
+    The netsh commands for all adapters run as one batch script. If the batch
+    reports an error, the commands are re-run concurrently per adapter to find
+    the failing one. Each adapter's log lines, and the summary, are emitted
+    as one message so other operations' output cannot interleave with them.
+    
     Args:
         adapters: List of adapter information
         log_callback: Log callback function
+        runner: Command runner, defaults to the global runner
+        max_workers: Maximum number of commands re-run at the same time
+    
+    Returns:
+        list: Per-adapter results with 'name', 'success' and 'duration'
+    
+    Raises:
+        RepairOperationError: If any adapter could not be configured
     """
     if log_callback:
         log_callback("Starting network configuration...")
     
-    startupinfo = get_startupinfo()
+    runner = runner or get_runner()
+    if not adapters:
+        return []
     
+    batch = NetshBatch(runner)
+    planned = []
     for adapter_info in adapters:
-        if log_callback:
-            log_callback(f"  🔧 Configuring adapter: {adapter_info['name']}")
         adapter_name = adapter_info['name']
-        
-        # Set DHCP
-        try:
-            # Set IP address to DHCP
-            result = subprocess.run([
-                "netsh", "interface", "ip", "set", "address",
-                adapter_name, "source=dhcp"
-            ], capture_output=True, text=True, startupinfo=startupinfo)
-            
-            if result.returncode == 0:
-                if log_callback:
-                    log_callback(f"    ✅ Set IP address to DHCP successfully")
-            else:
-                if result.stderr:
-                    if log_callback:
-                        log_callback(f"    ❌ Failed to set IP address: {result.stderr}")
-                else:
-                    if log_callback:
-                        log_callback(f"    ✅ Set IP address to DHCP successfully")
-            
-            # Set DNS to DHCP
-            result = subprocess.run([
-                "netsh", "interface", "ip", "set", "dnsservers",
-                adapter_name, "source=dhcp"
-            ], capture_output=True, text=True, startupinfo=startupinfo)
-            
-            if result.returncode == 0:
-                if log_callback:
-                    log_callback(f"    ✅ Set DNS to DHCP successfully")
-            else:
-                if result.stderr:
-                    if log_callback:
-                        log_callback(f"    ❌ Failed to set DNS: {result.stderr}")
-                else:
-                    if log_callback:
-                        log_callback(f"    ✅ Set DNS to DHCP successfully")
-                        
-        except Exception as e:
-            if log_callback:
-                log_callback(f"    ❌ Error configuring adapter: {str(e)}")
+        # Set IP address and DNS to DHCP
+        address = batch.add(["interface", "ip", "set", "address", adapter_name, "source=dhcp"], label=adapter_name)
+        dns = batch.add(["interface", "ip", "set", "dnsservers", adapter_name, "source=dhcp"], label=adapter_name)
+        planned.append((adapter_name, address, dns))
+    
+    start = time.perf_counter()
+    try:
+        _, batched = batch.execute(max_workers, on_output=output_logger(log_callback))
+    finally:
+        invalidate_snapshot()
+    elapsed = time.perf_counter() - start
+    
+    if log_callback:
+        if batched:
+            log_callback(f"  ⚡ Applied {len(batch.operations)} netsh commands in one batch ({elapsed:.2f}s)")
+        else:
+            log_callback("  ⚠️ netsh batch reported an error, commands were re-run individually")
+    
+    results = []
+    for adapter_name, address, dns in planned:
+        lines = [f"  🔧 Configuring adapter: {adapter_name}"]
+        if address.success:
+            lines.append(f"    ✅ Set IP address to DHCP successfully")
+        else:
+            lines.append(f"    ❌ Failed to set IP address: {address.error}")
+        if dns.success:
+            lines.append(f"    ✅ Set DNS to DHCP successfully")
+        else:
+            lines.append(f"    ❌ Failed to set DNS: {dns.error}")
+        if log_callback:
+            # One message per adapter so concurrent operations cannot split it
+            log_callback("\n".join(lines))
+        duration = None if batched else max(address.duration, dns.duration)
+        results.append({'name': adapter_name, 'success': address.success and dns.success, 'duration': duration})
+    
+    if log_callback:
+        succeeded = sum(1 for result in results if result['success'])
+        lines = [f"  📋 Configuration summary: {succeeded} succeeded, {len(results) - succeeded} failed"]
+        for result in results:
+            icon = "✅" if result['success'] else "❌"
+            timing = f" ({result['duration']:.2f}s)" if result['duration'] is not None else ""
+            lines.append(f"    {icon} {result['name']}{timing}")
+        log_callback("\n".join(lines))
+    
+    failed = [result['name'] for result in results if not result['success']]
+    if failed:
+        raise RepairOperationError(f"failed to configure {', '.join(failed)}")
+    return results
 
 
 def set_dns_to_dhcp(adapters, log_callback=None):
     """
     Set DNS to DHCP using WMI
     
+    The IP-enabled adapter configurations are enumerated once, selecting only
+    the properties needed, and indexed by interface index and description.
+    
     Args:
         adapters: List of adapter information
         log_callback: Log callback function
+    
+    Raises:
+        RepairOperationError: If the DNS servers of any adapter could not be reset
     """
     if log_callback:
         log_callback("Setting DNS to DHCP...")
     
+    # Imported here so the command pipeline also loads where WMI is unavailable
+    import pythoncom
+    import wmi
+    
+    # Initialize COM in child thread
+    pythoncom.CoInitialize()
     try:
-        # Initialize COM in child thread
-        pythoncom.CoInitialize()
-        
         c = wmi.WMI()
         
+        # 'Index' is the key property and must be selected for method calls to work
+        query_start = time.perf_counter()
+        with trace_span("Win32_NetworkAdapterConfiguration", 'wmi', IPEnabled=True) as span:
+            configurations = c.Win32_NetworkAdapterConfiguration(
+                ['Index', 'InterfaceIndex', 'Description'], IPEnabled=True
+            )
+            span['count'] = len(configurations)
+        by_interface_index = {configuration.InterfaceIndex: configuration for configuration in configurations}
+        by_description = {configuration.Description: configuration for configuration in configurations}
+        query_time = time.perf_counter() - query_start
+        
+        method_time = 0.0
+        failed = []
         for adapter_info in adapters:
             if log_callback:
                 log_callback(f"  🌐 Setting DNS for adapter: {adapter_info['name']}")
-            for adapter in c.Win32_NetworkAdapterConfiguration(IPEnabled=True):
-                if adapter.Description == adapter_info['description']:
-                    result = adapter.SetDNSServerSearchOrder()
-                    if result[0] == 0:
-                        if log_callback:
-                            log_callback(f"    ✅ Successfully set DNS to automatic acquisition")
-                    else:
-                        if log_callback:
-                            log_callback(f"    ❌ Failed to set DNS to automatic acquisition, error code: {result[0]}")
-                    break
-    except Exception as e:
+            adapter = by_interface_index.get(adapter_info.get('interface_index'))
+            if adapter is None:
+                adapter = by_description.get(adapter_info['description'])
+            if adapter is None:
+                if log_callback:
+                    log_callback(f"    ⚠️ No IP-enabled WMI configuration found for this adapter")
+                continue
+            
+            method_start = time.perf_counter()
+            with trace_span("SetDNSServerSearchOrder", 'wmi', adapter=adapter_info['name']) as span:
+                result = adapter.SetDNSServerSearchOrder()
+                span['returncode'] = result[0]
+            method_time += time.perf_counter() - method_start
+            if result[0] == 0:
+                if log_callback:
+                    log_callback(f"    ✅ Successfully set DNS to automatic acquisition")
+            else:
+                if log_callback:
+                    log_callback(f"    ❌ Failed to set DNS to automatic acquisition, error code: {result[0]}")
+                failed.append(f"{adapter_info['name']} (error code {result[0]})")
+        
         if log_callback:
-            log_callback(f"❌ Error setting DNS: {str(e)}")
+            log_callback(f"  ⏱️ WMI query {query_time:.2f}s ({len(configurations)} configurations), method calls {method_time:.2f}s")
+        if failed:
+            raise RepairOperationError(f"failed to set DNS to DHCP for {', '.join(failed)}")
     finally:
+        invalidate_snapshot()
         # Clean up COM
-        try:
-            pythoncom.CoUninitialize()
-        except:
-            pass
+        pythoncom.CoUninitialize()
 
 
-def refresh_network_config(log_callback=None):
+def wait_for_release(runner=None, timeout=RELEASE_WAIT_TIMEOUT, interval=RELEASE_POLL_INTERVAL, names=None,
+                     token=None):
     """
-    Refresh network configuration
+    Poll adapter state until the DHCP leases are released
     
+    Args:
+        runner: Command runner, defaults to the global runner
+        timeout: Maximum time to wait in seconds
+        interval: Delay between polls in seconds
+        names: Only wait for these adapters, defaults to all
+        token: CancellationToken that ends the wait, defaults to the
+            runner's token if it has one
+    
+    Returns:
+        tuple: (released, waited_seconds)
+    
+    Raises:
+        OperationCancelled: If the token is cancelled while waiting
+    """
+    token = token or getattr(runner, 'token', None)
+    start = time.perf_counter()
+    deadline = start + timeout
+    
+    while True:
+        try:
+            released = not get_snapshot(runner, refresh=True).has_dhcp_lease(names)
+        except RuntimeError:
+            released = False
+        if released:
+            return True, time.perf_counter() - start
+        remaining = deadline - time.perf_counter()
+        if remaining <= 0:
+            return False, time.perf_counter() - start
+        if token is None:
+            time.sleep(min(interval, remaining))
+        elif token.wait(min(interval, remaining)):
+            raise OperationCancelled(token.reason)
+
+
+def output_logger(log_callback):
+    """
+    Build an on_output callback that forwards command output to the log
+
     Args:
         log_callback: Log callback function
+
+    Returns:
+        Callable receiving output lines, or None without a log callback
+    """
+    if not log_callback:
+        return None
+
+    def log_line(line):
+        # ipconfig and netsh pad their output with blank lines
+        if line.strip():
+            log_callback(f"    {line.strip()}")
+    return log_line
+
+
+def flush_dns_cache(log_callback=None, runner=None):
     """
-    startupinfo = get_startupinfo()
+    Flush the DNS resolver cache
     
+    Args:
+        log_callback: Log callback function
+        runner: Command runner, defaults to the global runner
+    
+    Raises:
+        RepairOperationError: If ipconfig reports an error
+    """
+    runner = runner or get_runner()
     if log_callback:
         log_callback("Refreshing DNS cache...")
-    subprocess.run(["ipconfig", "/flushdns"], capture_output=True, startupinfo=startupinfo)
+    failure = command_failure(runner.run(["ipconfig", "/flushdns"]))
+    if failure:
+        raise RepairOperationError(failure)
+
+
+def release_and_renew(log_callback=None, runner=None, release_timeout=RELEASE_WAIT_TIMEOUT, adapters=None):
+    """
+    Release and renew DHCP leases
     
-    if log_callback:
-        log_callback("Releasing IP address...")
-    subprocess.run(["ipconfig", "/release"], capture_output=True, startupinfo=startupinfo)
-    subprocess.run(["ipconfig", "/release"], capture_output=True, startupinfo=startupinfo)
-    subprocess.run(["ipconfig", "/release"], capture_output=True, startupinfo=startupinfo)
+    Every adapter is renewed even if releasing or renewing another one
+    failed; the failures are reported together at the end.
     
-    time.sleep(5)
+    Args:
+        log_callback: Log callback function
+        runner: Command runner, defaults to the global runner
+        release_timeout: Maximum time to wait for the release to take effect
+        adapters: Only renew these adapters, so VPN and virtual adapters keep
+            their leases; defaults to all adapters
     
+    Raises:
+        RepairOperationError: If an ipconfig /release or /renew command failed
+    """
+    runner = runner or get_runner()
+    names = [adapter['name'] for adapter in adapters] if adapters is not None else None
+    targets = [[name] for name in names] if names is not None else [[]]
+    failures = []
     if log_callback:
-        log_callback("Renewing IP address...")
-        log_callback("Running, please wait patiently...")
-        log_callback("Computers with complex network environments may take several minutes to load, please wait patiently...")
-        log_callback("This is a Windows feature, not a bug, please wait patiently")
-    subprocess.run(["ipconfig", "/renew"], capture_output=True, startupinfo=startupinfo)
+        log_callback("Releasing IP address...")
+    # Releasing is idempotent and wait_for_release confirms it took effect,
+    # so a single release is enough
+    released_targets = []
+    for target in targets:
+        result = runner.run(["ipconfig", "/release"] + target, on_output=output_logger(log_callback))
+        failure = command_failure(result)
+        if failure:
+            failures.append(failure)
+            if log_callback:
+                log_callback(f"  ❌ {failure}")
+        else:
+            released_targets.append(target)
     
-    if log_callback:
-        log_callback("Refreshing DNS cache again...")
-    subprocess.run(["ipconfig", "/flushdns"], capture_output=True, startupinfo=startupinfo)
+    if released_targets:
+        # Adapters whose release failed keep their lease; do not wait for them
+        wait_names = [target[0] for target in released_targets] if names is not None else None
+        released, waited = wait_for_release(runner, timeout=release_timeout, names=wait_names)
+        if log_callback:
+            if released:
+                log_callback(f"  ⏱️ IP address released after {waited:.2f}s")
+            else:
+                log_callback(f"  ⚠️ Release not observed within {waited:.2f}s, continuing")
     
     if log_callback:
-        log_callback("Resetting Winsock...")
-    subprocess.run(["netsh", "winsock", "reset"], capture_output=True, startupinfo=startupinfo)
+        log_callback("Renewing IP address, this may take several minutes on complex networks...")
+    # Stream the output so each adapter shows up as soon as it is renewed
+    for target in targets:
+        result = runner.run(["ipconfig", "/renew"] + target, on_output=output_logger(log_callback))
+        failure = command_failure(result)
+        if failure:
+            failures.append(failure)
+            if log_callback:
+                log_callback(f"  ❌ {failure}")
+    invalidate_snapshot()
+    if failures:
+        raise RepairOperationError("; ".join(failures))
+
+
+def disable_proxy(log_callback=None):
+    """
+    Disable the per-user proxy settings
     
+    Args:
+        log_callback: Log callback function
+    
+    Raises:
+        OSError: If the registry values cannot be read or written
+    """
     # Update registry settings to disable proxy
     if log_callback:
         log_callback("Disabling proxy settings...")
-    try:
-        subprocess.run([
-            "reg", "add", "HKCU\\Software\\Microsoft\\Windows\\CurrentVersion\\Internet Settings",
-            "/v", "AutoConfigURL", "/t", "REG_SZ", "/d", "", "/f"
-        ], capture_output=True, startupinfo=startupinfo)
-        subprocess.run([
-            "reg", "add", "HKCU\\Software\\Microsoft\\Windows\\CurrentVersion\\Internet Settings",
-            "/v", "UseAutoDetect", "/t", "REG_DWORD", "/d", "0", "/f"
-        ], capture_output=True, startupinfo=startupinfo)
-        subprocess.run([
-            "reg", "add", "HKCU\\Software\\Microsoft\\Windows\\CurrentVersion\\Internet Settings",
-            "/v", "ProxyEnable", "/t", "REG_DWORD", "/d", "0", "/f"
-        ], capture_output=True, startupinfo=startupinfo)
-        subprocess.run([
-            "reg", "add", "HKCU\\Software\\Microsoft\\Windows\\CurrentVersion\\Internet Settings",
-            "/v", "ProxyServer", "/d", "", "/f"
-        ], capture_output=True, startupinfo=startupinfo)
-        if log_callback:
-            log_callback("✅ Proxy settings disabled")
-    except Exception as e:
-        if log_callback:
-            log_callback(f"❌ Failed to disable proxy settings: {str(e)}")
+    with trace_span("reset_proxy_settings", 'registry') as span:
+        changed = reset_proxy_settings()
+        span['changed'] = changed
+    if log_callback:
+        if changed:
+            log_callback(f"✅ Proxy settings disabled (changed: {', '.join(changed)})")
+        else:
+            log_callback("✅ Proxy settings already disabled, nothing changed")
+
+
+def reset_winsock(log_callback=None, runner=None, repeat=1):
+    """
+    Reset the Winsock catalog
     
-    # Additional DNS refresh
+    Args:
+        log_callback: Log callback function
+        runner: Command runner, defaults to the global runner
+        repeat: Number of resets, all run in one netsh batch
+    
+    Raises:
+        RepairOperationError: If a reset failed
+    """
+    if log_callback:
+        log_callback("Resetting Winsock...")
+    netsh_batch = NetshBatch(runner)
+    for _ in range(repeat):
+        netsh_batch.add(["winsock", "reset"])
+    netsh_operations, _ = netsh_batch.execute(on_output=output_logger(log_callback))
     if log_callback:
-        log_callback("Repeating DNS refresh...")
-    subprocess.run(["ipconfig", "/flushdns"], capture_output=True, startupinfo=startupinfo)
-    subprocess.run(["netsh", "winsock", "reset"], capture_output=True, startupinfo=startupinfo)
+        for operation in netsh_operations:
+            if operation.success:
+                log_callback(f"  ✅ netsh {operation.script_line()}")
+            else:
+                log_callback(f"  ❌ netsh {operation.script_line()} failed: {operation.error}")
+    failed = [operation for operation in netsh_operations if not operation.success]
+    if failed:
+        raise RepairOperationError(f"'netsh {failed[0].script_line()}' failed: {failed[0].error}")
 
 
-def display_network_info(log_callback=None):
+def refresh_network_config(log_callback=None, runner=None, release_timeout=RELEASE_WAIT_TIMEOUT,
+                           operations=REFRESH_OPERATIONS):
+    """
+    Refresh network configuration
+    
+    The operations run once each, in the order of the compiled repair plan.
+    
+    Args:
+        log_callback: Log callback function
+        runner: Command runner, defaults to the global runner
+        release_timeout: Maximum time to wait for the release to take effect
+        operations: Subset of REFRESH_OPERATIONS to perform
+    """
+    runner = runner or get_runner()
+    functions = {
+        "release_renew": lambda: release_and_renew(log_callback, runner, release_timeout),
+        "flush_dns": lambda: flush_dns_cache(log_callback, runner),
+        "proxy_reset": lambda: disable_proxy(log_callback),
+        "winsock_reset": lambda: reset_winsock(log_callback, runner),
+    }
+    for operation in compile_plan(operations)['operations']:
+        functions[operation['name']]()
+
+
+def format_snapshot(snapshot):
+    """
+    Format a network snapshot as report lines
+    
+    Args:
+        snapshot: NetworkSnapshot to format
+    
+    Returns:
+        list: Report lines
+    """
+    lines = []
+    for adapter in snapshot.adapters:
+        header = f"📡 {adapter['name']}"
+        if adapter['description']:
+            header += f" ({adapter['description']})"
+        lines.append(header)
+        if adapter['mac']:
+            lines.append(f"    MAC:     {adapter['mac']}")
+        lines.append(f"    DHCP:    {'Yes' if adapter['dhcp'] else 'No'}")
+        for label, field in (("IPv4", 'ipv4'), ("IPv6", 'ipv6'), ("Gateway", 'gateway'), ("DNS", 'dns')):
+            if adapter[field]:
+                lines.append(f"    {label + ':':<8} {', '.join(adapter[field])}")
+    return lines
+
+
+def display_network_info(log_callback=None, runner=None):
     """
     Display network configuration information
     
     Args:
         log_callback: Log callback function
+        runner: Command runner, defaults to the global runner
     """
     if log_callback:
         log_callback("——————Current Network Configuration——————")
     
-    startupinfo = get_startupinfo()
-    
     try:
-        result = subprocess.run(
-            ["ipconfig", "/all"], 
-            capture_output=True, 
-            text=True, 
-            encoding='gb2312', 
-            startupinfo=startupinfo
-        )
-        if result.returncode == 0:
-            if log_callback:
-                log_callback(result.stdout)
-        else:
-            if log_callback:
-                log_callback("❌ Failed to get network configuration information")
+        snapshot = get_snapshot(runner)
+        if log_callback:
+            log_callback("\n".join(format_snapshot(snapshot)))
+    except RepairInterrupted:
+        raise
+    except RuntimeError as e:
+        if log_callback:
+            log_callback(f"❌ Failed to get network configuration information: {str(e)}")
     except Exception as e:
         if log_callback:
             log_callback(f"❌ Error displaying network information: {str(e)}")
@@ -282,6 +515,7 @@ def display_network_info(log_callback=None):
 #         log_callback: Log callback function
 #     """
 #     try:
+#         import requests
 #         data = {'software': USAGE_SOFTWARE_NAME}
 #         response = requests.post(USAGE_API_URL, json=data)
 #         if log_callback:
@@ -0,0 +1,92 @@
+"""Proxy Settings Module
+
+Reads and resets the per-user WinINet proxy configuration in-process through
+the registry API instead of launching reg.exe.
+"""
+import ctypes
+
+
+INTERNET_SETTINGS_KEY = r"Software\Microsoft\Windows\CurrentVersion\Internet Settings"
+
+# Values written when disabling the proxy: (name, registry type name, value)
+PROXY_RESET_VALUES = (
+    ('AutoConfigURL', 'REG_SZ', ''),
+    ('UseAutoDetect', 'REG_DWORD', 0),
+    ('ProxyEnable', 'REG_DWORD', 0),
+    ('ProxyServer', 'REG_SZ', ''),
+)
+
+# InternetSetOption options that make WinINet reload its settings
+INTERNET_OPTION_SETTINGS_CHANGED = 39
+INTERNET_OPTION_REFRESH = 37
+
+
+def _get_registry(registry):
+    """Return the given registry module or the real winreg module"""
+    if registry is not None:
+        return registry
+    import winreg
+    return winreg
+
+
+def read_proxy_settings(registry=None):
+    """
+    Read the current proxy values
+
+    Args:
+        registry: winreg-compatible module, defaults to winreg
+
+    Returns:
+        dict: Value name -> value, None for values that do not exist
+    """
+    registry = _get_registry(registry)
+    settings = {}
+    with registry.OpenKey(registry.HKEY_CURRENT_USER, INTERNET_SETTINGS_KEY, 0, registry.KEY_READ) as key:
+        for name, _, _ in PROXY_RESET_VALUES:
+            try:
+                settings[name] = registry.QueryValueEx(key, name)[0]
+            except FileNotFoundError:
+                settings[name] = None
+    return settings
+
+
+def notify_settings_changed():
+    """Tell WinINet to reload the proxy settings so no restart is needed"""
+    try:
+        wininet = ctypes.windll.wininet
+    except AttributeError:
+        return False
+    wininet.InternetSetOptionW(None, INTERNET_OPTION_SETTINGS_CHANGED, None, 0)
+    wininet.InternetSetOptionW(None, INTERNET_OPTION_REFRESH, None, 0)
+    return True
+
+
+def reset_proxy_settings(registry=None, notify=True):
+    """
+    Disable the proxy, writing only values that differ from the target
+
+    Args:
+        registry: winreg-compatible module, defaults to winreg
+        notify: Notify WinINet once if anything changed
+
+    Returns:
+        list: Names of the values that were changed
+    """
+    registry = _get_registry(registry)
+    changed = []
+    access = registry.KEY_READ | registry.KEY_SET_VALUE
+    with registry.CreateKeyEx(registry.HKEY_CURRENT_USER, INTERNET_SETTINGS_KEY, 0, access) as key:
+        for name, type_name, value in PROXY_RESET_VALUES:
+            value_type = getattr(registry, type_name)
+            try:
+                current = registry.QueryValueEx(key, name)
+            except FileNotFoundError:
+                current = None
+            if current == (value, value_type):
+                continue
+            registry.SetValueEx(key, name, 0, value_type, value)
+            changed.append(name)
+
+    if changed and notify:
+        notify_settings_changed()
+    return changed
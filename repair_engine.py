@@ -0,0 +1,298 @@
+"""Repair Engine Module
+
+Runs repair operations on asyncio as soon as their dependencies are
+satisfied, so independent operations overlap and the total time follows the
+critical path. Blocking operations run on worker threads.
+
+With a priority table or a stop check, operations run in stages: each stage
+is the ready operations whose priority is close to the best one, run
+concurrently, and the stop check runs at the barrier after each stage. The
+run stops early once it reports that the remaining operations are no longer
+needed.
+"""
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from constants import PRIORITY_STAGE_MARGIN
+
+
+# Operation states reported through on_state_change
+OPERATION_STATES = ("waiting", "running", "completed", "skipped", "error")
+
+
+class RepairOperation:
+    """A repair operation and the operations it has to wait for"""
+
+    def __init__(self, name, func, step, depends_on=(), stoppable=True, timeout=None, token=None):
+        """
+        Args:
+            name: Unique operation name
+            func: Blocking callable run without arguments
+            step: Index into REPAIR_STEPS the operation belongs to
+            depends_on: Names of operations that must finish first; names
+                not planned in the same engine run are ignored
+            stoppable: Whether an early stop skips this operation
+            timeout: Seconds after which the operation is abandoned as failed
+            token: CancellationToken used by func; cancelled on timeout so
+                its running commands are killed
+        """
+        self.name = name
+        self.func = func
+        self.step = step
+        self.depends_on = tuple(depends_on)
+        self.stoppable = stoppable
+        self.timeout = timeout
+        self.token = token
+        self.state = "waiting"
+        self.error = None
+        self.skip_reason = None
+        self.start = None
+        self.end = None
+
+    @property
+    def duration(self):
+        """Elapsed time in seconds, or None if the operation never ran"""
+        if self.start is None or self.end is None:
+            return None
+        return self.end - self.start
+
+
+class StepTracker:
+    """Aggregates operation states into per-step statuses"""
+
+    def __init__(self, operations, progress_callback=None):
+        self.progress_callback = progress_callback
+        self.operations_by_step = {}
+        for operation in operations:
+            self.operations_by_step.setdefault(operation.step, []).append(operation)
+        self.statuses = {}
+
+    def step_status(self, step):
+        """Compute the status of one step from its operations"""
+        states = [operation.state for operation in self.operations_by_step[step]]
+        if "running" in states:
+            return "running"
+        if "waiting" in states:
+            return "running" if any(state != "waiting" for state in states) else "waiting"
+        if "error" in states:
+            return "error"
+        if all(state == "skipped" for state in states):
+            return "skipped"
+        return "completed"
+
+    def update(self, operation):
+        """Report the step of an operation if its status changed"""
+        status = self.step_status(operation.step)
+        if self.statuses.get(operation.step) != status:
+            self.statuses[operation.step] = status
+            if self.progress_callback:
+                self.progress_callback(operation.step, status)
+
+
+class RepairEngine:
+    """Dependency-aware executor for repair operations"""
+
+    def __init__(self, operations, on_state_change=None, max_workers=4, priority=None, stop_check=None,
+                 token=None, stage_margin=PRIORITY_STAGE_MARGIN):
+        """
+        Args:
+            operations: List of RepairOperation
+            on_state_change: Called as on_state_change(operation) on every transition
+            max_workers: Number of threads running blocking operations
+            priority: Operation name -> score; when given, operations run in
+                stages, highest scores first among those that are ready
+            stop_check: Blocking callable run after each stage that completed
+                a stoppable operation; a non-empty return value is the
+                reason to skip all remaining stoppable operations. Implies
+                staged runs.
+            token: CancellationToken for the whole run; once cancelled,
+                running operations are abandoned and waiting ones skipped
+            stage_margin: Ready operations scoring at most this much below
+                the best one run in the same stage
+
+        Raises:
+            ValueError: On duplicate names or dependency cycles
+        """
+        self.operations = {}
+        for operation in operations:
+            if operation.name in self.operations:
+                raise ValueError(f"Duplicate repair operation: {operation.name}")
+            self.operations[operation.name] = operation
+        self.on_state_change = on_state_change
+        self.max_workers = max_workers
+        self.priority = priority
+        self.stop_check = stop_check
+        self.token = token
+        self.stage_margin = stage_margin
+        self.stop_reason = None
+        # Operations of the stage after which the stop check succeeded
+        self.stopped_after = []
+        self._check_cycles()
+
+    def _check_cycles(self):
+        """Reject dependency cycles before anything runs"""
+        visiting = set()
+        visited = set()
+
+        def visit(name):
+            if name in visited or name not in self.operations:
+                return
+            if name in visiting:
+                raise ValueError(f"Dependency cycle involving {name}")
+            visiting.add(name)
+            for dependency in self.operations[name].depends_on:
+                visit(dependency)
+            visiting.discard(name)
+            visited.add(name)
+
+        for name in self.operations:
+            visit(name)
+
+    def _set_state(self, operation, state):
+        operation.state = state
+        if self.on_state_change:
+            self.on_state_change(operation)
+
+    def _failed_dependencies(self, operation):
+        """Names of planned dependencies that ended with an error"""
+        return [
+            name for name in operation.depends_on
+            if name in self.operations and self.operations[name].error is not None
+        ]
+
+    def _skip(self, operation, reason, error=None):
+        operation.skip_reason = reason
+        operation.error = error
+        self._set_state(operation, "skipped")
+
+    async def _execute(self, operation, executor):
+        """Run the operation on a worker thread and record the outcome"""
+        loop = asyncio.get_running_loop()
+        operation.start = time.perf_counter()
+        self._set_state(operation, "running")
+        future = loop.run_in_executor(executor, operation.func)
+        waiters = {future}
+        unregister = None
+        if self.token is not None:
+            cancelled = loop.create_future()
+            unregister = self.token.on_cancel(
+                lambda: loop.call_soon_threadsafe(lambda: cancelled.done() or cancelled.set_result(None))
+            )
+            waiters.add(cancelled)
+        try:
+            await asyncio.wait(waiters, timeout=operation.timeout, return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            if unregister is not None:
+                unregister()
+        operation.end = time.perf_counter()
+
+        if not future.done():
+            # Timed out or cancelled: kill the operation's commands and stop
+            # waiting for its thread
+            if self.token is not None and self.token.cancelled:
+                operation.error = self.token.reason
+            else:
+                operation.error = f"timed out after {operation.duration:.1f}s"
+            if operation.token is not None:
+                operation.token.cancel(operation.error)
+            future.add_done_callback(lambda done: done.exception())
+            self._set_state(operation, "error")
+            return
+        error = future.exception()
+        if error is not None:
+            operation.error = str(error) or type(error).__name__
+            self._set_state(operation, "error")
+            return
+        self._set_state(operation, "completed")
+
+    def _check_cancelled(self, operation):
+        """Skip the operation if the run was cancelled; returns True if skipped"""
+        if self.token is not None and self.token.cancelled:
+            self._skip(operation, self.token.reason, error=self.token.reason)
+            return True
+        return False
+
+    async def _run_operation(self, operation, tasks, executor):
+        """Wait for dependencies, then run the operation on a worker thread"""
+        dependencies = [name for name in operation.depends_on if name in tasks]
+        if dependencies:
+            await asyncio.gather(*(tasks[name] for name in dependencies))
+        if self._check_cancelled(operation):
+            return
+        failed = self._failed_dependencies(operation)
+        if failed:
+            reason = f"dependency failed: {', '.join(failed)}"
+            self._skip(operation, reason, error=reason)
+            return
+        await self._execute(operation, executor)
+
+    def _next_stage(self, pending):
+        """Pick the ready operations to run together, best scores first"""
+        # Cycles were rejected up front, so something is always ready
+        ready = [
+            operation for operation in pending.values()
+            if not any(name in pending for name in operation.depends_on)
+        ]
+        scores = self.priority or {}
+        best = max(scores.get(operation.name, 0.0) for operation in ready)
+        return [
+            operation for operation in ready
+            if scores.get(operation.name, 0.0) >= best - self.stage_margin
+        ]
+
+    async def _run_in_stage(self, operation, executor):
+        """Run one operation of a stage unless it has to be skipped"""
+        if self._check_cancelled(operation):
+            return
+        failed = self._failed_dependencies(operation)
+        if failed:
+            reason = f"dependency failed: {', '.join(failed)}"
+            self._skip(operation, reason, error=reason)
+            return
+        if self.stop_reason and operation.stoppable:
+            self._skip(operation, self.stop_reason)
+            return
+        await self._execute(operation, executor)
+
+    async def _run_staged(self, executor):
+        """Run stages of concurrent operations, checking for an early stop between them"""
+        loop = asyncio.get_running_loop()
+        pending = dict(self.operations)
+        while pending:
+            stage = self._next_stage(pending)
+            for operation in stage:
+                del pending[operation.name]
+            await asyncio.gather(*(self._run_in_stage(operation, executor) for operation in stage))
+
+            completed = [operation.name for operation in stage
+                         if operation.stoppable and operation.state == "completed"]
+            if self.stop_check and completed and not self.stop_reason:
+                self.stop_reason = await loop.run_in_executor(executor, self.stop_check)
+                if self.stop_reason:
+                    self.stopped_after = completed
+
+    async def run_async(self):
+        """
+        Run all operations
+
+        Returns:
+            dict: Operation name -> RepairOperation with final state and timing
+        """
+        executor = ThreadPoolExecutor(max_workers=self.max_workers)
+        try:
+            if self.priority is not None or self.stop_check is not None:
+                await self._run_staged(executor)
+            else:
+                tasks = {}
+                for name, operation in self.operations.items():
+                    tasks[name] = asyncio.ensure_future(self._run_operation(operation, tasks, executor))
+                await asyncio.gather(*tasks.values())
+        finally:
+            # Abandoned operations may still be blocked in a worker thread
+            executor.shutdown(wait=False)
+        return self.operations
+
+    def run(self):
+        """Run all operations on a new event loop in the calling thread"""
+        return asyncio.run(self.run_async())
@@ -0,0 +1,383 @@
+"""Repair Pipeline Module
+
+The repair sequence shared by the GUI and the benchmark harness, free of any
+UI dependencies.
+"""
+import time
+
+from cancellation import CancellationToken
+from command_runner import CancellableRunner, get_runner
+from constants import REPAIR_STEPS, REPAIR_OPERATIONS, REPAIR_ADAPTER_CLASSES, VERIFY_BUDGET, OPERATION_TIMEOUTS
+from history_store import HistoryStore, symptoms_from_findings
+from network_snapshot import invalidate_snapshot
+from network_utils import (
+    get_ethernet_adapters,
+    configure_network,
+    set_dns_to_dhcp,
+    flush_dns_cache,
+    release_and_renew,
+    disable_proxy,
+    reset_winsock,
+    display_network_info,
+    # upload_usage
+)
+from repair_engine import RepairEngine, RepairOperation, StepTracker
+from repair_plan import compile_plan, format_plan
+from tracing import Tracer, set_tracer, trace_span, default_trace_path
+from triage import run_triage, select_operations, verify_connectivity
+
+
+# Log line announcing each operation when it starts
+OPERATION_MESSAGES = {
+    "adapter_reset": "⚙️ Configuring network settings...",
+    "dns_reset": "🌐 Setting DNS to DHCP...",
+    "release_renew": "🔄 Reconnecting network...",
+    "flush_dns": "🧹 Flushing DNS cache...",
+    "proxy_reset": "🛡️ Resetting proxy settings...",
+    "winsock_reset": "🔌 Resetting Winsock...",
+    "report": "📊 Getting network configuration information...",
+}
+
+
+def log_triage(findings, log_callback):
+    """Log triage findings, one line per probe"""
+    for name, finding in findings.items():
+        icon = {True: "✅", False: "❌", None: "➖"}[finding['ok']]
+        log_callback(f"  {icon} {name}: {finding['detail']} ({finding['duration']:.2f}s)")
+
+
+def traced(name, func):
+    """Wrap an operation function in a 'step' trace span"""
+    def run():
+        with trace_span(name, 'step'):
+            return func()
+    return run
+
+
+def export_trace(tracer, trace_path, log_callback=None):
+    """
+    Write the trace file and log the timing summary
+
+    Args:
+        tracer: Tracer of the finished run
+        trace_path: Output path, defaults to a new file in the temp directory
+        log_callback: Log callback function
+
+    Returns:
+        str: Path of the trace file, or None if it could not be written
+    """
+    if log_callback:
+        log_callback("\n⏱️ Timing summary:")
+        for line in tracer.summary_lines():
+            log_callback(line)
+    path = trace_path or default_trace_path()
+    try:
+        tracer.export(path)
+    except OSError as e:
+        if log_callback:
+            log_callback(f"⚠️ Failed to save trace: {str(e)}")
+        return None
+    if log_callback:
+        log_callback(f"🧾 Trace saved to {path}")
+    return path
+
+
+def open_history(history_path, log_callback=None):
+    """Open the repair history, or return None if it is unavailable"""
+    try:
+        return HistoryStore(history_path)
+    except Exception as e:
+        if log_callback:
+            log_callback(f"⚠️ Repair history unavailable: {str(e)}")
+        return None
+
+
+def save_history(store, result, adapters, planned, engine, log_callback=None):
+    """Record a finished run in the repair history and close it"""
+    try:
+        if adapters:
+            fixed_by = engine.stopped_after if engine is not None else None
+            store.record_run(result, adapters, planned, fixed_by=fixed_by)
+    except Exception as e:
+        if log_callback:
+            log_callback(f"⚠️ Failed to save repair history: {str(e)}")
+    finally:
+        store.close()
+
+
+def build_operations(operations, adapters, log_callback=None, runner=None, token=None):
+    """
+    Create engine operations for a compiled repair plan
+
+    Each operation gets its own child of the cancellation token, so a timed
+    out operation can have its commands killed without cancelling the rest.
+
+    Args:
+        operations: 'operations' of a plan compiled by compile_plan
+        adapters: Adapters to repair
+        log_callback: Log callback function
+        runner: Command runner, defaults to the global runner
+        token: CancellationToken of the whole repair
+
+    Returns:
+        list: RepairOperation objects, ending with the final report
+    """
+    functions = {
+        "adapter_reset": lambda runner: configure_network(adapters, log_callback=log_callback, runner=runner),
+        "dns_reset": lambda runner: set_dns_to_dhcp(adapters, log_callback=log_callback),
+        "release_renew": lambda runner: release_and_renew(log_callback, runner, adapters=adapters),
+        "flush_dns": lambda runner: flush_dns_cache(log_callback, runner),
+        "proxy_reset": lambda runner: disable_proxy(log_callback),
+        "winsock_reset": lambda runner: reset_winsock(log_callback, runner),
+        "report": lambda runner: display_network_info(log_callback=log_callback, runner=runner),
+    }
+
+    def create(name, step, depends_on, stoppable=True):
+        operation_token = token.child() if token is not None else None
+        operation_runner = runner
+        if operation_token is not None:
+            operation_runner = CancellableRunner(runner or get_runner(), operation_token)
+        func = functions[name]
+        return RepairOperation(
+            name, traced(name, lambda: func(operation_runner)), step, depends_on,
+            stoppable=stoppable, timeout=OPERATION_TIMEOUTS.get(name), token=operation_token,
+        )
+
+    planned = [
+        create(operation['name'], operation['step'], operation['after'])
+        for operation in operations
+    ]
+    report = create("report", len(REPAIR_STEPS) - 1, [operation.name for operation in planned], stoppable=False)
+    return planned + [report]
+
+
+def choose_operations(adapters, runner=None, triage=True, log_callback=None):
+    """
+    Choose the repair operations to run, probing connectivity first with triage
+
+    Returns:
+        tuple: (operation names, triage findings or None)
+    """
+    if not triage:
+        return list(REPAIR_OPERATIONS), None
+    if log_callback:
+        log_callback("🩺 Running quick network triage...")
+    with trace_span("triage", 'step'):
+        findings = run_triage(adapters, runner=runner)
+    operations = select_operations(findings)
+    if log_callback:
+        log_triage(findings, log_callback)
+        log_callback(f"🧭 Selected repair operations: {', '.join(operations)}")
+    return operations, findings
+
+
+def plan_repair(log_callback=None, runner=None, triage=True, adapter_classes=REPAIR_ADAPTER_CLASSES):
+    """
+    Compile the repair plan without changing anything (dry run)
+
+    Adapter discovery and triage only read the network state, so this needs
+    no administrator privileges.
+
+    Args:
+        log_callback: Log callback function
+        runner: Command runner, defaults to the global runner
+        triage: Probe connectivity first and plan only the operations needed
+        adapter_classes: Adapter classes to repair, see adapter_classifier
+
+    Returns:
+        dict: 'adapters', the 'operations' that would run, 'triage'
+        findings and the compiled 'plan' (None without adapters)
+    """
+    invalidate_snapshot()
+    result = {'adapters': 0, 'operations': [], 'triage': None, 'plan': None}
+    adapters = get_ethernet_adapters(log_callback=log_callback, runner=runner, classes=adapter_classes)
+    result['adapters'] = len(adapters)
+    if not adapters:
+        if log_callback:
+            log_callback("❌ No Ethernet adapters found")
+        return result
+    operations, result['triage'] = choose_operations(adapters, runner, triage, log_callback)
+    result['plan'] = compile_plan(operations, adapters)
+    result['operations'] = [operation['name'] for operation in result['plan']['operations']]
+    if log_callback:
+        for line in format_plan(result['plan']):
+            log_callback(line)
+    return result
+
+
+def run_repair(log_callback=None, progress_callback=None, runner=None, triage=True,
+               trace=True, trace_path=None, history=True, history_path=None, token=None,
+               adapter_classes=REPAIR_ADAPTER_CLASSES):
+    """
+    Run the complete network repair pipeline
+
+    Adapter discovery and triage run first; the selected operations then run
+    on the repair engine, overlapping wherever their dependencies allow.
+    After triage, they run in concurrent stages, those that fixed the same
+    symptoms most often on earlier runs first; connectivity is verified
+    between stages and the repair stops as soon as it is restored.
+
+    Args:
+        log_callback: Log callback function
+        progress_callback: Called as progress_callback(step_index, status)
+        runner: Command runner, defaults to the global runner
+        triage: Probe connectivity first and run only the operations needed
+        trace: Record timing spans, log a summary table and export a Chrome trace
+        trace_path: Trace file path, defaults to a new file in the temp directory
+        history: Record the run in the repair history and use earlier runs
+            to order the operations
+        history_path: History database path, defaults to the user's profile
+        token: CancellationToken; cancelling it kills running commands and
+            skips the remaining operations
+        adapter_classes: Adapter classes to repair, see adapter_classifier
+
+    Returns:
+        dict: 'success', 'adapters', 'duration', 'operations', per-step
+        'steps' results, the 'triage' findings, whether connectivity was
+        'restored' (None if never checked), whether it was 'cancelled', the
+        compiled 'plan' and the 'trace' file path
+    """
+    def log(message):
+        if log_callback:
+            log_callback(message)
+
+    steps = [{'name': name, 'status': 'waiting', 'duration': 0.0} for name in REPAIR_STEPS]
+    result = {'success': False, 'adapters': 0, 'duration': 0.0, 'steps': steps,
+              'operations': list(REPAIR_OPERATIONS), 'triage': None, 'restored': None,
+              'cancelled': False, 'plan': None, 'trace': None}
+    started = {}
+    pipeline_start = time.perf_counter()
+
+    def set_status(step_index, status):
+        if status == "running":
+            started.setdefault(step_index, time.perf_counter())
+        elif step_index in started:
+            steps[step_index]['duration'] = time.perf_counter() - started[step_index]
+        steps[step_index]['status'] = status
+        if progress_callback:
+            progress_callback(step_index, status)
+
+    # Every command of this run can be killed through the token
+    token = token or CancellationToken()
+    runner = CancellableRunner(runner or get_runner(), token)
+
+    # Never reuse a snapshot from an earlier run
+    invalidate_snapshot()
+    tracer = Tracer() if trace else None
+    previous_tracer = set_tracer(tracer)
+    store = open_history(history_path, log_callback) if history else None
+    adapters = []
+    planned = []
+    engine = None
+
+    try:
+        log("🚀 Starting network repair...")
+
+        # Get Ethernet adapters
+        log("📡 Getting network adapter information...")
+        set_status(0, "running")
+        with trace_span("discovery", 'step'):
+            adapters = get_ethernet_adapters(log_callback=log_callback, runner=runner, classes=adapter_classes)
+        result['adapters'] = len(adapters)
+        if not adapters:
+            log("❌ No Ethernet adapters found")
+            set_status(0, "error")
+            return result
+
+        log(f"✅ Found {len(adapters)} Ethernet adapters")
+
+        # Quick triage decides which repair operations are needed, the plan
+        # compiler drops those made redundant by the others
+        operations, result['triage'] = choose_operations(adapters, runner, triage, log_callback)
+        plan = compile_plan(operations, adapters)
+        for operation in plan['removed']:
+            log(f"♻️ {operation['name']} not needed, {operation['reason']}")
+        operations = [operation['name'] for operation in plan['operations']]
+        result['operations'] = operations
+        result['plan'] = plan
+        set_status(0, "completed")
+
+        planned = build_operations(plan['operations'], adapters, log_callback, runner.runner, token)
+        planned_steps = {operation.step for operation in planned}
+        for step_index in range(1, len(REPAIR_STEPS)):
+            if step_index not in planned_steps:
+                log(f"⏭️ {REPAIR_STEPS[step_index]} not needed, skipped")
+                set_status(step_index, "skipped")
+
+        tracker = StepTracker(planned, set_status)
+
+        # Known symptoms: run the most promising operations first and stop
+        # once the network works again
+        priority = None
+        stop_check = None
+        if triage:
+            adapter_names = {adapter['name'] for adapter in adapters}
+            symptoms = symptoms_from_findings(result['triage'])
+            if store is not None:
+                priority = store.operation_scores(symptoms)
+                ranked = sorted(operations, key=lambda name: -priority[name])
+                if len({priority[name] for name in ranked}) > 1:
+                    log("📚 Ranked by repair history: " +
+                        ", ".join(f"{name} ({priority[name]:.0%})" for name in ranked))
+
+            def stop_check():
+                with trace_span("verify_connectivity", 'step'):
+                    current = [
+                        adapter for adapter in get_ethernet_adapters(runner=runner, classes=adapter_classes)
+                        if adapter['name'] in adapter_names
+                    ]
+                    verified, _ = verify_connectivity(current, runner=runner, budget=VERIFY_BUDGET)
+                result['restored'] = verified
+                if verified:
+                    log("✅ Connectivity verified")
+                    return "connectivity already restored"
+                return None
+
+        def on_state_change(operation):
+            if operation.state == "running":
+                log(OPERATION_MESSAGES[operation.name])
+            elif operation.state == "error":
+                log(f"❌ Error occurred during {operation.name}: {operation.error}")
+            elif operation.state == "skipped":
+                log(f"⏭️ {operation.name} skipped, {operation.skip_reason}")
+            tracker.update(operation)
+
+        engine = RepairEngine(planned, on_state_change=on_state_change,
+                              priority=priority, stop_check=stop_check, token=token)
+        engine.run()
+
+        if token.cancelled:
+            result['cancelled'] = True
+            log(f"🛑 Repair cancelled: {token.reason}")
+            return result
+
+        failed = [operation.name for operation in planned if operation.error is not None]
+        if failed:
+            return result
+
+        # try:
+        #     upload_usage(log_callback=log_callback)
+        # except Exception as e:
+        #     log(f"Skipped")
+        
+        log("\n🎉 Processing completed, network should be restored []~(￣▽￣)~*")
+        log("💡 If it still doesn't work, you might be using a TUN Adapter, or it's a non-local network issue. Please check your network proxy tool configuration or contact your network administrator. (＠_＠;)")
+        result['success'] = True
+
+    except Exception as e:
+        log(f"❌ Error occurred during repair: {str(e)}")
+        for step in steps:
+            if step['status'] == "running":
+                step['status'] = "error"
+                if progress_callback:
+                    progress_callback(steps.index(step), "error")
+    finally:
+        result['duration'] = time.perf_counter() - pipeline_start
+        result['cancelled'] = token.cancelled
+        if store is not None:
+            save_history(store, result, adapters, planned, engine, log_callback)
+        set_tracer(previous_tracer)
+        if tracer is not None:
+            result['trace'] = export_trace(tracer, trace_path, log_callback)
+
+    return result
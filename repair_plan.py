@@ -0,0 +1,179 @@
+"""Repair Plan Module
+
+Compiles the declarative REPAIR_PLAN into the operations a run executes.
+Idempotent operations whose effects earlier operations already establish,
+or whose commands earlier operations already run, are dropped, and the
+dependencies on them are moved to the operations that cover them. The
+compiled plan carries an estimated cost for the dry-run view.
+"""
+from constants import (
+    REPAIR_PLAN, REPAIR_STEPS, COMMAND_COST_ESTIMATES, DEFAULT_COMMAND_COST, NETSH_BATCH_LINE_COST,
+)
+
+
+def command_cost(command):
+    """
+    Estimate how long a plan command takes
+
+    Args:
+        command: Command string from REPAIR_PLAN
+
+    Returns:
+        float: Estimated duration in seconds
+    """
+    words = command.split()
+    for length in (2, 1):
+        cost = COMMAND_COST_ESTIMATES.get(" ".join(words[:length]))
+        if cost is not None:
+            return cost
+    return DEFAULT_COMMAND_COST
+
+
+def operation_cost(commands):
+    """
+    Estimate how long an operation's commands take
+
+    Its netsh commands are charged as one 'netsh -f' batch, the way the
+    repair runs them.
+
+    Args:
+        commands: Expanded command strings of one operation
+
+    Returns:
+        float: Estimated duration in seconds
+    """
+    netsh = [command for command in commands if command.split()[:1] == ["netsh"]]
+    cost = sum(command_cost(command) for command in commands if command not in netsh)
+    if netsh:
+        cost += command_cost(netsh[0]) + NETSH_BATCH_LINE_COST * (len(netsh) - 1)
+    return cost
+
+
+def expand_commands(commands, adapters=None):
+    """
+    Expand '{adapter}' commands once per adapter
+
+    Args:
+        commands: Command strings from REPAIR_PLAN
+        adapters: Adapter records; without them '{adapter}' becomes a placeholder
+
+    Returns:
+        list: Expanded command strings
+    """
+    names = [f'"{adapter["name"]}"' for adapter in adapters] if adapters is not None else ["<adapter>"]
+    expanded = []
+    for command in commands:
+        if "{adapter}" in command:
+            expanded.extend(command.format(adapter=name) for name in names)
+        else:
+            expanded.append(command)
+    return expanded
+
+
+def compile_plan(operations=None, adapters=None, plan=REPAIR_PLAN):
+    """
+    Compile the selected operations into the minimal plan to execute
+
+    Args:
+        operations: Operation names to run, defaults to the whole plan
+        adapters: Adapters the commands are expanded for
+        plan: Declarative plan in the REPAIR_PLAN format
+
+    Returns:
+        dict: 'operations' (dicts with 'name', 'step', 'after', 'commands'
+        and 'cost', in execution order), 'removed' (dicts with 'name' and
+        'reason'), total 'cost' of running them one after another and the
+        'critical_path' cost with independent operations running
+        concurrently, in seconds
+
+    Raises:
+        ValueError: On unknown operations or dependencies on later operations
+    """
+    selected = set(plan if operations is None else operations)
+    unknown = selected.difference(plan)
+    if unknown:
+        raise ValueError(f"Unknown repair operations: {', '.join(sorted(unknown))}")
+
+    compiled = []
+    removed = []
+    # Operations that replace a removed one as a dependency
+    covered_by = {}
+    effect_providers = {}
+    command_providers = {}
+    position = {name: index for index, name in enumerate(plan)}
+
+    for name, spec in plan.items():
+        for dependency in spec['after']:
+            if position.get(dependency, len(plan)) >= position[name]:
+                raise ValueError(f"Repair operation {name} must be planned after {dependency}")
+        if name not in selected:
+            continue
+
+        commands = expand_commands(spec['commands'], adapters)
+        if spec['idempotent']:
+            providers = [effect_providers.get(effect) for effect in spec['effects']]
+            if spec['effects'] and all(providers):
+                covered_by[name] = sorted(set(providers), key=position.get)
+                removed.append({'name': name, 'reason': f"covered by {', '.join(covered_by[name])}"})
+                continue
+            repeated = [command for command in commands if command in command_providers]
+            if repeated and len(repeated) == len(commands):
+                covered_by[name] = sorted({command_providers[command] for command in repeated}, key=position.get)
+                removed.append({'name': name, 'reason': f"commands already run by {', '.join(covered_by[name])}"})
+                continue
+            commands = [command for command in commands if command not in command_providers]
+
+        after = []
+        for dependency in spec['after']:
+            for provider in covered_by.get(dependency, [dependency]):
+                if provider in selected and provider not in covered_by and provider not in after:
+                    after.append(provider)
+        compiled.append({
+            'name': name,
+            'step': spec['step'],
+            'after': after,
+            'commands': commands,
+            'cost': operation_cost(commands),
+        })
+        if spec['idempotent']:
+            for effect in spec['effects']:
+                effect_providers.setdefault(effect, name)
+            for command in commands:
+                command_providers.setdefault(command, name)
+
+    finish = {}
+    for operation in compiled:
+        start = max((finish[dependency] for dependency in operation['after']), default=0.0)
+        finish[operation['name']] = start + operation['cost']
+    return {
+        'operations': compiled,
+        'removed': removed,
+        'cost': sum(operation['cost'] for operation in compiled),
+        'critical_path': max(finish.values(), default=0.0),
+    }
+
+
+def format_plan(compiled):
+    """
+    Format a compiled plan for the dry-run view
+
+    Args:
+        compiled: Result of compile_plan
+
+    Returns:
+        list: Log lines
+    """
+    lines = [f"📝 Repair plan: {len(compiled['operations'])} operations, estimated "
+             f"{compiled['cost']:.1f}s one after another, {compiled['critical_path']:.1f}s with independent "
+             f"operations overlapped"]
+    for operation in compiled['operations']:
+        after = f", after {', '.join(operation['after'])}" if operation['after'] else ""
+        lines.append(f"  ▶️ {operation['name']} [{REPAIR_STEPS[operation['step']]}{after}] "
+                     f"~{operation['cost']:.2f}s")
+        for command in operation['commands']:
+            lines.append(f"      {command}")
+        if sum(1 for command in operation['commands'] if command.startswith("netsh ")) > 1:
+            lines.append("      (netsh commands run as one batch)")
+    for operation in compiled['removed']:
+        lines.append(f"  ♻️ {operation['name']} removed, {operation['reason']}")
+    return lines
@@ -0,0 +1,50 @@
+"""Tests for the adapter classification rules"""
+import pytest
+
+from adapter_classifier import classify_adapter, mac_vendor, select_adapters
+
+
+def adapter(description, kind='ethernet', mac="00-1B-21-3A-4F-01", name="Ethernet"):
+    return {'name': name, 'description': description, 'mac': mac, 'kind': kind}
+
+
+@pytest.mark.parametrize("record, expected", [
+    (adapter("Realtek PCIe GbE Family Controller"), ("physical", "Ethernet interface")),
+    (adapter("Intel(R) Wi-Fi 6 AX201 160MHz", kind='wireless'), ("physical", "wireless interface")),
+    (adapter("Hyper-V Virtual Ethernet Adapter", name="vEthernet (Default Switch)"),
+     ("virtual", "Hyper-V virtual switch by description")),
+    (adapter("VirtualBox Host-Only Ethernet Adapter"), ("virtual", "VirtualBox host adapter by description")),
+    (adapter("Wintun Userspace Tunnel"), ("tunnel", "TUN adapter by description")),
+    (adapter("TAP-Windows Adapter V9"), ("tunnel", "TAP adapter by description")),
+    (adapter("Software Loopback Interface 1", kind='loopback'), ("loopback", "loopback interface")),
+    (adapter("Microsoft Teredo Tunneling Adapter", kind='tunnel'), ("tunnel", "tunnel interface")),
+    # A virtual machine's own NIC is how the guest reaches the network
+    (adapter("Microsoft Hyper-V Network Adapter", mac="00-15-5D-01-02-03"),
+     ("physical", "virtual machine network card")),
+    (adapter("Generic Ethernet Controller", mac="00:50:56:AA:BB:CC"), ("virtual", "VMware MAC prefix")),
+])
+def test_classify_adapter(record, expected):
+    assert classify_adapter(record) == expected
+
+
+def test_unknown_interface_kind_counts_as_physical():
+    # Section headers in a display language the parser does not know
+    assert classify_adapter(adapter("Realtek PCIe GbE Family Controller", kind='other'))[0] == "physical"
+    assert classify_adapter(adapter("Hyper-V Virtual Ethernet Adapter", kind='other'))[0] == "virtual"
+
+
+def test_mac_vendor():
+    assert mac_vendor("08-00-27-12-34-56") == "VirtualBox"
+    assert mac_vendor("00-1B-21-3A-4F-01") is None
+    assert mac_vendor("") is None
+
+
+def test_select_adapters_sets_classes_and_reasons():
+    nic = adapter("Realtek PCIe GbE Family Controller")
+    vpn = adapter("WireGuard Tunnel", name="wg0")
+    selected, skipped = select_adapters([nic, vpn], ("physical",))
+
+    assert selected == [nic]
+    assert skipped == [(vpn, "tunnel", "WireGuard by description")]
+    assert (nic['class'], vpn['class']) == ("physical", "tunnel")
+    assert select_adapters([nic, vpn], ("physical", "tunnel"))[0] == [nic, vpn]
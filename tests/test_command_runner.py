@@ -0,0 +1,115 @@
+"""Tests for recording, replaying and streaming commands"""
+import io
+
+import pytest
+
+from command_runner import CommandResult, RecordingRunner, ReplayRunner, command_key, stream_lines
+
+
+class FixedRunner:
+    """Runner answering every command with the same output"""
+
+    def __init__(self, stdout):
+        self.stdout = stdout
+
+    def run(self, args, timeout=None, token=None, on_output=None):
+        return CommandResult(args, stdout=self.stdout, duration=0.01)
+
+
+def test_command_key_reduces_file_paths_to_names():
+    assert command_key(["netsh", "-f", r"C:\Users\me\AppData\Local\Temp\script.txt"]) == (
+        "netsh", "-f", "script.txt")
+    assert command_key(["netsh", "-f", "/tmp/network_repair_x/script.txt"]) == (
+        "netsh", "-f", "script.txt")
+
+
+def test_command_key_keeps_switches():
+    assert command_key(["ipconfig", "/all"]) == ("ipconfig", "/all")
+    assert command_key(["ipconfig", "/release", "Wi-Fi"]) == ("ipconfig", "/release", "Wi-Fi")
+
+
+def test_replay_returns_results_in_recording_order():
+    runner = ReplayRunner([
+        CommandResult(["ipconfig", "/all"], stdout=b"first"),
+        CommandResult(["ipconfig", "/flushdns"], stdout=b"flushed"),
+        CommandResult(["ipconfig", "/all"], stdout=b"second"),
+    ], speed=0)
+
+    assert runner.run(["ipconfig", "/all"]).stdout == b"first"
+    assert runner.run(["ipconfig", "/all"]).stdout == b"second"
+    assert runner.run(["ipconfig", "/flushdns"]).stdout == b"flushed"
+    # Running a command more often than recorded repeats its last result
+    assert runner.run(["ipconfig", "/all"]).stdout == b"second"
+    assert runner.misses == []
+
+
+def test_replay_matches_script_files_in_another_directory():
+    runner = ReplayRunner([
+        CommandResult(["netsh", "-f", r"C:\Temp\network_repair_netsh_1.txt"], stdout=b"Ok."),
+    ], speed=0)
+
+    result = runner.run(["netsh", "-f", "/tmp/private/network_repair_netsh_1.txt"])
+    assert (result.returncode, result.stdout) == (0, b"Ok.")
+    assert result.args == ["netsh", "-f", "/tmp/private/network_repair_netsh_1.txt"]
+
+
+def test_replay_reports_unrecorded_commands():
+    runner = ReplayRunner([CommandResult(["ipconfig", "/all"])], speed=0)
+
+    result = runner.run(["netsh", "winsock", "reset"])
+    assert result.returncode == -1
+    assert runner.misses == [["netsh", "winsock", "reset"]]
+
+
+def test_recorded_transcript_replays(tmp_path):
+    recorder = RecordingRunner(FixedRunner(b"Windows IP Configuration\r\n"))
+    recorder.run(["ipconfig", "/all"])
+    path = tmp_path / "transcript.json"
+    recorder.save(str(path))
+
+    result = ReplayRunner.load(str(path), speed=0).run(["ipconfig", "/all"])
+    assert (result.returncode, result.stdout, result.duration) == (0, b"Windows IP Configuration\r\n", 0.01)
+
+
+@pytest.mark.parametrize("encoding, text", [
+    ("utf-8", "Ethernet adapter Ethernet:\r\n   Connection-specific DNS Suffix: café.local\r\n\r\nDone"),
+    ("gbk", "以太网适配器 以太网:\r\n   媒体状态: 已断开\r\n\r\n完成"),
+    ("cp932", "イーサネット アダプター イーサネット:\r\n   メディアの状態: 切断\r\n\r\n完了"),
+])
+def test_stream_lines_decodes_characters_split_across_reads(encoding, text):
+    data = text.encode(encoding)
+    lines = []
+    chunks = []
+
+    # Three-byte reads split every multi-byte character at some point
+    total = stream_lines(io.BytesIO(data), lines.append, encoding=encoding, keep=chunks, chunk_size=3)
+
+    assert lines == text.split("\r\n")
+    assert total == len(data)
+    assert b"".join(chunks) == data
+
+
+def test_stream_lines_forwards_lines_as_they_arrive():
+    class Pipe:
+        """Pipe checking that each line is forwarded before the next read"""
+
+        def __init__(self, chunks):
+            self.chunks = list(chunks)
+
+        def read(self, size):
+            assert len(lines) == expected.pop(0)
+            return self.chunks.pop(0) if self.chunks else b""
+
+    lines = []
+    expected = [0, 1, 1, 2]
+    stream_lines(Pipe([b"Renewing\r\nWai", b"ting", b"\r\n"]), lines.append, encoding="utf-8")
+    assert lines == ["Renewing", "Waiting"]
+
+
+def test_replay_forwards_recorded_output():
+    runner = ReplayRunner([
+        CommandResult(["ipconfig", "/renew"], stdout="以太网适配器 以太网:\r\n\r\n".encode("gbk")),
+    ], speed=0)
+    lines = []
+    runner.run(["ipconfig", "/renew"], on_output=lines.append)
+    assert lines == ["以太网适配器 以太网:", ""]
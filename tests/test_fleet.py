@@ -0,0 +1,106 @@
+"""Tests for the fleet orchestrator with the fake local agent"""
+import json
+import sys
+
+from benchmark import SYNTHETIC_LATENCIES, build_synthetic_transcript
+from fleet import (
+    CommandTransport, LocalAgentTransport, FleetProgress, parse_headless_output, repair_fleet, summary_lines,
+)
+
+
+def python_transport(code):
+    """Transport whose 'host' is a Python snippet run locally"""
+    return CommandTransport([sys.executable, "-c", code], encoding="utf-8")
+
+
+def write_transcript(tmp_path, adapter_count=1, fail=()):
+    """
+    Synthetic transcript without latencies, so replays finish at once
+
+    Args:
+        fail: Commands, as (program, first argument), that exit with an error
+    """
+    transcript = build_synthetic_transcript(adapter_count, {key: 0.0 for key in SYNTHETIC_LATENCIES})
+    for command in transcript['commands']:
+        if tuple(command['args'][:2]) in fail:
+            command['returncode'] = 1
+    path = tmp_path / "transcript.json"
+    path.write_text(json.dumps(transcript), encoding="utf-8")
+    return str(path)
+
+
+def test_local_agent_reaches_every_host(tmp_path):
+    transport = LocalAgentTransport(write_transcript(tmp_path, adapter_count=2))
+    lines = []
+    summary = repair_fleet(["host-a", "host-b", "host-c"], transport, concurrency=2, timeout=120,
+                           log_callback=lines.append)
+
+    # The proxy reset uses the registry, which replays cannot stand in for
+    status, exit_code = ("repaired", 0) if sys.platform == "win32" else ("failed", 1)
+    assert summary['totals'] == {status: 3}
+    assert [record['host'] for record in summary['hosts']] == ["host-a", "host-b", "host-c"]
+    for record in summary['hosts']:
+        assert record['exit_code'] == exit_code
+        assert record['error'] is None
+        assert [step['name'] for step in record['steps']][0] == "Get Adapters"
+    # The last progress line is forced once every host is done
+    assert lines[-1].startswith("🚚 3/3 hosts done")
+    assert summary_lines(summary)[-1].startswith("  3 hosts in ")
+
+
+def test_host_with_failed_commands_is_not_repaired(tmp_path):
+    transport = LocalAgentTransport(write_transcript(tmp_path, fail=[("ipconfig", "/renew")]))
+    summary = repair_fleet(["host-a"], transport, timeout=120)
+
+    record = summary['hosts'][0]
+    assert (record['status'], record['exit_code']) == ("failed", 1)
+    assert {step['name']: step['status'] for step in record['steps']}["Reconnect Network"] == "error"
+
+
+def test_host_output_with_very_long_lines():
+    code = ("import json; print('x' * 1000000); print('[4/5] Reconnect Network: running'); "
+            "print(json.dumps({'exit_code': 0}, indent=2))")
+    lines = []
+    summary = repair_fleet(["host-a", "host-b"], python_transport(code), timeout=30, log_callback=lines.append)
+
+    assert summary['totals'] == {"repaired": 2}
+    assert lines[-1].startswith("🚚 2/2 hosts done")
+
+
+def test_local_agent_runs_without_triage(tmp_path):
+    transport = LocalAgentTransport(write_transcript(tmp_path))
+    assert "--no-triage" in transport.command("host-a")
+
+
+def test_host_exit_code_sets_status():
+    code = "import json, sys; print(json.dumps({'exit_code': 4}, indent=2)); sys.exit(4)"
+    summary = repair_fleet(["host-a"], python_transport(code), timeout=30)
+    assert summary['hosts'][0]['status'] == "not_admin"
+
+
+def test_host_without_result_is_an_error():
+    summary = repair_fleet(["host-a"], python_transport("print('connection refused')"), timeout=30)
+    record = summary['hosts'][0]
+    assert record['status'] == "error"
+    assert record['error'] == "connection refused"
+
+
+def test_host_timeout_kills_the_command():
+    summary = repair_fleet(["host-a"], python_transport("import time; time.sleep(30)"), timeout=0.5)
+    record = summary['hosts'][0]
+    assert record['status'] == "timeout"
+    assert record['duration'] < 10
+
+
+def test_parse_headless_output_takes_last_json_block():
+    lines = ["🚀 Starting network repair...", "{", '  "success": true,', '  "exit_code": 0', "}"]
+    assert parse_headless_output(lines) == {'success': True, 'exit_code': 0}
+    assert parse_headless_output(["no result"]) is None
+
+
+def test_fleet_progress_counts_hosts_and_running_steps():
+    lines = []
+    progress = FleetProgress(["a", "b", "c"], lines.append, interval=0.0)
+    progress.update("a", status="running", step=(3, "running"))
+    progress.update("b", status="repaired")
+    assert lines[-1] == "🚚 1/3 hosts done (1 queued, 1 repaired, 1 running) | Reconnect Network: 1"
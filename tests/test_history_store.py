@@ -0,0 +1,71 @@
+"""Tests for ranking repair operations by the repair history"""
+import pytest
+
+from constants import REPAIR_OPERATIONS
+from history_store import HistoryStore, symptoms_from_findings
+from repair_engine import RepairEngine, RepairOperation
+
+
+ADAPTERS = [{'name': "Ethernet", 'kind': "physical", 'description': "Realtek PCIe GbE", 'dhcp': True}]
+
+
+def finding(ok):
+    return {'ok': ok, 'detail': "", 'duration': 0.01}
+
+
+def record(store, failed_probes, ran, fixed_by=(), started_at=None):
+    """Store a run in which the operations in 'ran' completed"""
+    findings = {probe: finding(probe not in failed_probes) for probe in ("dns", "tcp", "proxy")}
+    operations = list(RepairEngine([RepairOperation(name, lambda: None, 3) for name in ran]).run().values())
+    result = {'success': True, 'duration': 2.0, 'triage': findings, 'restored': bool(fixed_by)}
+    return store.record_run(result, ADAPTERS, operations, fixed_by=fixed_by, machine="PC-1", started_at=started_at)
+
+
+@pytest.fixture
+def store():
+    store = HistoryStore(":memory:")
+    yield store
+    store.close()
+
+
+def test_symptoms_are_the_probes_that_did_not_pass():
+    findings = {'dns': finding(True), 'tcp': finding(False), 'gateway': finding(None)}
+    assert symptoms_from_findings(findings) == ["gateway", "tcp"]
+    assert symptoms_from_findings(None) == []
+
+
+def test_scores_without_history_are_neutral(store):
+    assert store.operation_scores(["dns"]) == {operation: 0.5 for operation in REPAIR_OPERATIONS}
+    record(store, ["dns"], ["flush_dns"], fixed_by=["flush_dns"])
+    assert store.operation_scores([]) == {operation: 0.5 for operation in REPAIR_OPERATIONS}
+
+
+def test_operations_that_fixed_a_symptom_rank_first(store):
+    record(store, ["dns"], ["flush_dns", "winsock_reset"], fixed_by=["flush_dns"])
+    record(store, ["dns"], ["flush_dns"], fixed_by=["flush_dns"])
+    record(store, ["dns"], ["winsock_reset"])
+
+    scores = store.operation_scores(["dns"])
+    # Smoothed: (fixed + 1) / (ran + 2)
+    assert scores["flush_dns"] == 3 / 4
+    assert scores["winsock_reset"] == 1 / 4
+    assert scores["proxy_reset"] == 0.5
+    assert sorted(REPAIR_OPERATIONS, key=lambda name: -scores[name])[0] == "flush_dns"
+
+
+def test_scores_only_count_runs_with_the_symptoms(store):
+    record(store, ["proxy"], ["proxy_reset"], fixed_by=["proxy_reset"])
+    record(store, ["dns"], ["proxy_reset"])
+
+    assert store.operation_scores(["proxy"])["proxy_reset"] == 2 / 3
+    assert store.operation_scores(["dns"])["proxy_reset"] == 1 / 3
+    assert store.operation_scores(["dns", "proxy"])["proxy_reset"] == 2 / 4
+
+
+def test_recent_runs_filter_by_symptom(store):
+    first = record(store, ["dns"], ["flush_dns"], started_at=1000.0)
+    second = record(store, ["tcp"], ["winsock_reset"], started_at=2000.0)
+
+    assert [run['id'] for run in store.recent_runs(machine="PC-1")] == [second, first]
+    assert [run['id'] for run in store.recent_runs(symptom="dns")] == [first]
+    assert store.recent_runs(kind="virtual") == []
@@ -0,0 +1,119 @@
+"""Tests for the locale-independent ipconfig parser"""
+import pytest
+
+from benchmark import IPCONFIG_LOCALES, adapter_names, build_ipconfig_output
+from ipconfig_parser import IpconfigParser, detect_encoding, parse_ipconfig
+
+
+ENGLISH_OUTPUT = "\r\n".join([
+    "",
+    "Windows IP Configuration",
+    "",
+    "   Host Name . . . . . . . . . . . . : DESKTOP-01",
+    "",
+    "Ethernet adapter Ethernet:",
+    "",
+    "   Connection-specific DNS Suffix  . : corp.example",
+    "   Description . . . . . . . . . . . : Intel(R) Ethernet Connection (7) I219-V",
+    "   Physical Address. . . . . . . . . : 00-1B-21-3A-4F-01",
+    "   DHCP Enabled. . . . . . . . . . . : Yes",
+    "   Link-local IPv6 Address . . . . . : fe80::1c2d:3e4f:5a6b:7c8d%12(Preferred)",
+    "   IPv4 Address. . . . . . . . . . . : 192.168.1.20(Preferred)",
+    "   Subnet Mask . . . . . . . . . . . : 255.255.255.0",
+    "   Default Gateway . . . . . . . . . : fe80::1%12",
+    "                                       192.168.1.1",
+    "   DNS Servers . . . . . . . . . . . : 192.168.1.1",
+    "                                       8.8.8.8",
+    "   NetBIOS over Tcpip. . . . . . . . : Enabled",
+    "",
+    "Wireless LAN adapter Wi-Fi:",
+    "",
+    "   Media State . . . . . . . . . . . : Media disconnected",
+    "   Description . . . . . . . . . . . : Intel(R) Wi-Fi 6 AX201 160MHz",
+    "   Physical Address. . . . . . . . . : 00-1B-21-3A-4F-02",
+    "   DHCP Enabled. . . . . . . . . . . : No",
+    "",
+    "Tunnel adapter Teredo Tunneling Pseudo-Interface:",
+    "",
+    "   Description . . . . . . . . . . . : Teredo Tunneling Pseudo-Interface",
+    "",
+]).encode('cp437')
+
+
+def test_parses_fields_of_every_adapter():
+    ethernet, wireless, tunnel = parse_ipconfig(ENGLISH_OUTPUT)
+
+    assert ethernet == {
+        'name': "Ethernet",
+        'kind': 'ethernet',
+        'description': "Intel(R) Ethernet Connection (7) I219-V",
+        'mac': "00-1B-21-3A-4F-01",
+        'dhcp': True,
+        'ipv4': ["192.168.1.20"],
+        'ipv6': ["fe80::1c2d:3e4f:5a6b:7c8d%12"],
+        'gateway': ["fe80::1%12", "192.168.1.1"],
+        'dns': ["192.168.1.1", "8.8.8.8"],
+    }
+    assert (wireless['name'], wireless['kind'], wireless['dhcp']) == ("Wi-Fi", 'wireless', False)
+    assert (tunnel['name'], tunnel['kind']) == ("Teredo Tunneling Pseudo-Interface", 'tunnel')
+
+
+@pytest.mark.parametrize("locale", list(IPCONFIG_LOCALES))
+@pytest.mark.parametrize("released", [False, True])
+def test_parses_every_display_language(locale, released):
+    output = build_ipconfig_output(3, released=released, locale=locale)
+    adapters = parse_ipconfig(output)
+
+    assert [adapter['name'] for adapter in adapters] == adapter_names(3, locale)
+    assert all(adapter['kind'] == 'ethernet' and adapter['dhcp'] for adapter in adapters)
+    assert adapters[1]['description'] == "Intel(R) Ethernet Connection #2"
+    assert adapters[1]['gateway'] == ["10.0.1.1"]
+    # A released lease only leaves an autoconfiguration address
+    assert adapters[1]['ipv4'] == (["169.254.1.1"] if released else ["10.0.1.10"])
+
+
+@pytest.mark.parametrize("locale", list(IPCONFIG_LOCALES))
+def test_detects_console_encoding(locale):
+    encoding = IPCONFIG_LOCALES[locale]['encoding']
+    output = build_ipconfig_output(2, locale=locale)
+    assert output.decode(detect_encoding(output)) == output.decode(encoding)
+
+
+def test_chunks_may_split_characters():
+    output = build_ipconfig_output(5, locale='ja-JP')
+    # One byte at a time splits every double-byte character
+    assert parse_ipconfig(output[i:i + 1] for i in range(len(output))) == parse_ipconfig(output)
+
+
+def test_large_output_parses_every_adapter():
+    assert len(parse_ipconfig(build_ipconfig_output(500, locale='zh-CN'))) == 500
+
+
+def test_on_adapter_receives_adapters_as_they_finish():
+    seen = []
+    parser = IpconfigParser('cp437', on_adapter=lambda adapter: seen.append(adapter['name']))
+    parser.feed(ENGLISH_OUTPUT)
+    # The last adapter only ends with the output
+    assert seen == ["Ethernet", "Wi-Fi"]
+    assert parser.close() == []
+    assert seen == ["Ethernet", "Wi-Fi", "Teredo Tunneling Pseudo-Interface"]
+
+
+@pytest.mark.parametrize("header, name, kind", [
+    ("Ethernet-adapter Ethernet:", "Ethernet", 'ethernet'),
+    ("Draadloos LAN-adapter Wi-Fi:", "Wi-Fi", 'wireless'),
+    ("Karta Ethernet Ethernet:", "Ethernet", 'ethernet'),
+    ("Karta bezprzewodowej sieci LAN Wi-Fi:", "Wi-Fi", 'wireless'),
+    ("Karta tunelowa Teredo Tunneling Pseudo-Interface:", "Teredo Tunneling Pseudo-Interface", 'tunnel'),
+    ("Ethernet bağdaştırıcısı Ethernet:", "Ethernet", 'ethernet'),
+    ("Kablosuz LAN bağdaştırıcısı Wi-Fi:", "Wi-Fi", 'wireless'),
+    ("ethernet adapter Ethernet 2:", "Ethernet 2", 'ethernet'),
+    ("WIRELESS LAN ADAPTER Wi-Fi:", "Wi-Fi", 'wireless'),
+    # Languages without a table entry keep the whole header as the name
+    ("Ethernet-sovitin Ethernet:", "Ethernet-sovitin Ethernet", 'other'),
+])
+def test_section_headers(header, name, kind):
+    output = f"\r\n{header}\r\n\r\n   Description . . . : Realtek PCIe GbE Family Controller\r\n"
+    adapter, = parse_ipconfig(output.encode('utf-8'), encoding='utf-8')
+    assert (adapter['name'], adapter['kind']) == (name, kind)
+    assert adapter['description'] == "Realtek PCIe GbE Family Controller"
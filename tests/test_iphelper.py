@@ -0,0 +1,153 @@
+"""Tests for the IP Helper backend against the fake ctypes libraries"""
+import sys
+import threading
+
+import pytest
+
+from cancellation import CancellationToken, CommandTimeoutError, OperationCancelled
+from command_runner import CommandResult
+from iphelper import IpHelper, IpHelperRunner, FakeIpHelperLibraries, create_runner
+from ipconfig_parser import new_adapter
+
+
+def ethernet(name, ipv4, dhcp=True, **fields):
+    adapter = new_adapter(name, 'ethernet')
+    adapter.update(description=f"{name} controller", mac="00-1B-21-3A-4F-01", dhcp=dhcp,
+                   ipv4=[ipv4], gateway=["192.168.1.1"], dns=["192.168.1.1", "fe80::1"])
+    adapter.update(fields)
+    return adapter
+
+
+class RecordingFallback:
+    """Process runner stand-in that records the commands it gets"""
+
+    def __init__(self):
+        self.commands = []
+
+    def run(self, args, timeout=None, token=None, on_output=None):
+        self.commands.append(list(args))
+        return CommandResult(args, 0, b"fallback", b"", 0.0)
+
+
+@pytest.fixture
+def libraries():
+    return FakeIpHelperLibraries([
+        ethernet("Ethernet", "192.168.1.20", ipv6=["fe80::20"]),
+        ethernet("Ethernet 2", "10.0.0.5", mac="00-15-5D-00-00-02"),
+        ethernet("Static", "172.16.0.9", dhcp=False),
+    ])
+
+
+def test_get_adapters_reads_the_ctypes_structures(libraries):
+    adapters = IpHelper(libraries).get_adapters()
+
+    assert [adapter['name'] for adapter in adapters] == ["Ethernet", "Ethernet 2", "Static"]
+    first = adapters[0]
+    assert first['kind'] == 'ethernet'
+    assert first['description'] == "Ethernet controller"
+    assert first['mac'] == "00-1B-21-3A-4F-01"
+    assert first['dhcp'] is True
+    assert first['ipv4'] == ["192.168.1.20"]
+    assert first['ipv6'] == ["fe80::20"]
+    assert first['gateway'] == ["192.168.1.1"]
+    assert first['dns'] == ["192.168.1.1", "fe80::1"]
+    assert first['interface_index'] == 1
+    assert first['guid'] == "{00000001-0000-0000-0000-000000000000}"
+    assert adapters[1]['mac'] == "00-15-5D-00-00-02"
+    assert adapters[2]['dhcp'] is False
+
+
+def test_get_adapters_retries_with_the_size_asked_for(libraries):
+    # Push past the initial buffer so the overflow path runs
+    libraries.iphlpapi.adapters *= 40
+    assert len(IpHelper(libraries).get_adapters()) == 120
+
+
+def test_get_adapters_skips_loopback():
+    loopback = ethernet("Loopback Pseudo-Interface 1", "127.0.0.1", kind='loopback')
+    tunnel = ethernet("Teredo", "10.9.0.1", kind='tunnel')
+    adapters = IpHelper(FakeIpHelperLibraries([loopback, tunnel])).get_adapters()
+    # ipconfig does not list the loopback interface either
+    assert [(adapter['name'], adapter['kind']) for adapter in adapters] == [("Teredo", 'tunnel')]
+
+
+def test_release_and_renew_only_dhcp_adapters(libraries):
+    helper = IpHelper(libraries)
+
+    assert helper.release() == [("Ethernet", 0), ("Ethernet 2", 0)]
+    assert {adapter['name']: adapter['ipv4'] for adapter in helper.get_adapters()} == {
+        "Ethernet": [], "Ethernet 2": [], "Static": ["172.16.0.9"],
+    }
+    assert helper.renew(["Ethernet"]) == [("Ethernet", 0)]
+    assert {adapter['name']: adapter['ipv4'] for adapter in helper.get_adapters()}["Ethernet"] == ["192.168.1.20"]
+
+
+def test_runner_serves_ipconfig_commands_in_process(libraries):
+    fallback = RecordingFallback()
+    runner = IpHelperRunner(IpHelper(libraries), fallback)
+    lines = []
+
+    result = runner.run(["ipconfig", "/release", "Ethernet 2"], on_output=lines.append)
+    assert result.returncode == 0
+    assert lines == ["Ethernet 2: released"]
+    assert runner.run(["ipconfig", "/flushdns"]).returncode == 0
+    assert libraries.dnsapi.flushes == 1
+    assert libraries.iphlpapi.calls.count("IpReleaseAddress") == 1
+    assert fallback.commands == []
+
+
+def test_runner_falls_back_for_other_commands(libraries):
+    fallback = RecordingFallback()
+    runner = IpHelperRunner(IpHelper(libraries), fallback)
+
+    runner.run(["ipconfig", "/all"])
+    runner.run(["ipconfig", "/renew", "Ether*"])
+    runner.run(["netsh", "winsock", "reset"])
+    assert fallback.commands == [["ipconfig", "/all"], ["ipconfig", "/renew", "Ether*"],
+                                 ["netsh", "winsock", "reset"]]
+
+
+def test_runner_falls_back_when_the_api_fails(libraries):
+    fallback = RecordingFallback()
+    helper = IpHelper(libraries)
+
+    def failing(names=None):
+        raise OSError("GetInterfaceInfo failed with error 1")
+
+    helper.release = failing
+    result = IpHelperRunner(helper, fallback).run(["ipconfig", "/release"])
+    assert result.stdout == b"fallback"
+    assert fallback.commands == [["ipconfig", "/release"]]
+
+
+def test_runner_abandons_slow_calls(libraries):
+    helper = IpHelper(libraries)
+    blocked = threading.Event()
+
+    def renew(names=None):
+        blocked.wait(5)
+        return []
+
+    helper.renew = renew
+    runner = IpHelperRunner(helper, RecordingFallback())
+
+    with pytest.raises(CommandTimeoutError):
+        runner.run(["ipconfig", "/renew"], timeout=0.1)
+
+    token = CancellationToken()
+    threading.Timer(0.1, token.cancel, args=("cancelled by user",)).start()
+    with pytest.raises(OperationCancelled):
+        runner.run(["ipconfig", "/renew"], timeout=5, token=token)
+    blocked.set()
+
+
+def test_runner_get_adapters_returns_none_on_api_error(libraries):
+    helper = IpHelper(libraries)
+    libraries.iphlpapi.GetAdaptersAddresses = lambda *args: 87
+    assert IpHelperRunner(helper, RecordingFallback()).get_adapters() is None
+
+
+@pytest.mark.skipif(sys.platform == "win32", reason="the real DLLs load on Windows")
+def test_create_runner_falls_back_without_the_dlls():
+    fallback = RecordingFallback()
+    assert create_runner(fallback) is fallback
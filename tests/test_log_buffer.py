@@ -0,0 +1,70 @@
+"""Tests for the bounded log widget bookkeeping"""
+from log_buffer import LogBuffer
+
+
+class FakeWidget:
+    """Applies LogBuffer updates the way the Tk log widget does"""
+
+    def __init__(self):
+        self.lines = []
+
+    def apply(self, update):
+        text, trim = update
+        del self.lines[:trim]
+        self.lines.extend(text.split("\n")[:-1])
+
+
+def test_small_batches_fill_the_widget():
+    buffer = LogBuffer(max_lines=5)
+    widget = FakeWidget()
+    widget.apply(buffer.append(["one", "two"]))
+    widget.apply(buffer.append(["three"]))
+
+    assert widget.lines == ["one", "two", "three"]
+    assert buffer.widget_lines == 3
+
+
+def test_old_lines_are_trimmed_from_the_top():
+    buffer = LogBuffer(max_lines=5)
+    widget = FakeWidget()
+    trims = []
+    for batch in (["1", "2", "3", "4"], ["5", "6", "7"], ["8"]):
+        update = buffer.append(batch)
+        trims.append(update[1])
+        widget.apply(update)
+
+    assert trims == [0, 2, 1]
+    assert widget.lines == ["4", "5", "6", "7", "8"]
+    assert buffer.widget_lines == 5
+
+
+def test_batch_filling_the_widget_replaces_it():
+    buffer = LogBuffer(max_lines=3)
+    widget = FakeWidget()
+    widget.apply(buffer.append(["old"]))
+    text, trim = buffer.append([str(index) for index in range(10)])
+    widget.apply((text, trim))
+
+    assert trim == 1
+    assert widget.lines == ["7", "8", "9"]
+    assert buffer.widget_lines == 3
+
+
+def test_multi_line_messages_count_every_line():
+    buffer = LogBuffer(max_lines=4)
+    widget = FakeWidget()
+    widget.apply(buffer.append(["🔧 Ethernet\n  IPv4 10.0.0.2\n  DNS 10.0.0.1", "✅ done"]))
+    widget.apply(buffer.append(["next"]))
+
+    assert widget.lines == ["  IPv4 10.0.0.2", "  DNS 10.0.0.1", "✅ done", "next"]
+
+
+def test_full_log_keeps_trimmed_lines():
+    buffer = LogBuffer(max_lines=2)
+    assert buffer.text() == ""
+    assert buffer.append([]) == ("", 0)
+    for message in ("a", "b\nc", "d"):
+        buffer.append([message])
+
+    assert buffer.text() == "a\nb\nc\nd\n"
+    assert buffer.lines == ["a", "b", "c", "d"]
@@ -0,0 +1,80 @@
+"""Tests for the buffered, rotating log file"""
+import gzip
+import os
+
+import pytest
+
+from log_sink import LogFileSink, format_entry
+
+
+def lines_of(data):
+    """Messages of the written entries, without their timestamps"""
+    return [line.split(" ", 2)[2] for line in data.decode('utf-8').splitlines()]
+
+
+def write_all(sink, messages):
+    for message in messages:
+        sink.write(message)
+    sink.close()
+
+
+def test_format_entry_stamps_every_line():
+    entry = format_entry(0.25, "Ethernet:\n   IPv4: 10.0.0.5\n")
+    lines = entry.split("\n")
+    assert lines[0].endswith(".250 Ethernet:")
+    assert lines[1].endswith(".250    IPv4: 10.0.0.5")
+    # The empty last line keeps only its timestamp
+    assert lines[2].count(" ") == 1
+    assert entry.endswith("\n")
+
+
+def test_messages_are_written_on_close(tmp_path):
+    path = tmp_path / "logs" / "network_repair.log"
+    sink = LogFileSink(str(path), flush_interval=10.0)
+    write_all(sink, ["🔧 Starting network repair", "✅ Done"])
+
+    assert lines_of(path.read_bytes()) == ["🔧 Starting network repair", "✅ Done"]
+    assert sink.error is None
+
+
+@pytest.mark.parametrize("compress", [True, False])
+def test_full_file_is_rotated(tmp_path, compress):
+    path = tmp_path / "network_repair.log"
+    # One message per batch; each fills more than half the file
+    sink = LogFileSink(str(path), max_bytes=100, backup_count=2, compress=compress,
+                       flush_interval=0, batch_size=1)
+    write_all(sink, [f"message {i} " + "x" * 40 for i in range(4)])
+
+    def read_backup(index):
+        opener = gzip.open if compress else open
+        with opener(sink.backup_path(index), 'rb') as f:
+            return lines_of(f.read())
+
+    assert sink.backup_path(1) == f"{path}.1" + (".gz" if compress else "")
+    assert lines_of(path.read_bytes()) == ["message 3 " + "x" * 40]
+    assert read_backup(1) == ["message 2 " + "x" * 40]
+    assert read_backup(2) == ["message 1 " + "x" * 40]
+    # Only backup_count segments are kept
+    assert not os.path.exists(sink.backup_path(3))
+    assert not os.path.exists(sink.backup_path(1) + ".tmp")
+
+
+def test_rotation_without_backups_starts_over(tmp_path):
+    path = tmp_path / "network_repair.log"
+    sink = LogFileSink(str(path), max_bytes=100, backup_count=0, flush_interval=0, batch_size=1)
+    write_all(sink, ["first " + "x" * 60, "second " + "x" * 60])
+
+    assert lines_of(path.read_bytes()) == ["second " + "x" * 60]
+    assert os.listdir(tmp_path) == ["network_repair.log"]
+
+
+def test_unwritable_file_is_reported_once(tmp_path):
+    warnings = []
+    # A directory in place of the log file cannot be opened for writing
+    path = tmp_path / "network_repair.log"
+    path.mkdir()
+    sink = LogFileSink(str(path), flush_interval=0, batch_size=1, log_callback=warnings.append)
+    write_all(sink, ["first", "second"])
+
+    assert sink.error is not None
+    assert warnings == [f"⚠️ Failed to write log file: {sink.error}"]
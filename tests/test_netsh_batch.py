@@ -0,0 +1,83 @@
+"""Tests for running netsh commands as one batch script"""
+import os
+import tempfile
+
+from command_runner import CommandResult, command_key
+from netsh_batch import NetshBatch, netsh_script_name
+
+
+class ScriptRunner:
+    """Runner that reads the script while netsh would run it"""
+
+    def __init__(self, batch_result=(0, b"", b""), single=None):
+        self.batch_result = batch_result
+        self.single = single or (lambda args: (0, b"", b""))
+        self.commands = []
+        self.scripts = {}
+
+    def run(self, args, timeout=None, token=None, on_output=None):
+        self.commands.append(list(args))
+        if args[1] == "-f":
+            with open(args[2], 'rb') as f:
+                self.scripts[args[2]] = f.read().decode()
+            returncode, stdout, stderr = self.batch_result
+        else:
+            returncode, stdout, stderr = self.single(args)
+        return CommandResult(args, returncode, stdout, stderr)
+
+
+def configure_batch(runner):
+    batch = NetshBatch(runner)
+    address = batch.add(["interface", "ip", "set", "address", "Ethernet 2", "source=dhcp"], label="Ethernet 2")
+    dns = batch.add(["interface", "ip", "set", "dnsservers", "Ethernet 2", "source=dhcp"], label="Ethernet 2")
+    return batch, address, dns
+
+
+def test_batch_runs_one_script():
+    runner = ScriptRunner()
+    batch, address, dns = configure_batch(runner)
+    operations, batched = batch.execute()
+
+    assert batched and address.success and dns.success
+    (path, script), = runner.scripts.items()
+    assert script == ('interface ip set address "Ethernet 2" source=dhcp\r\n'
+                      'interface ip set dnsservers "Ethernet 2" source=dhcp\r\n')
+    assert command_key(runner.commands[0]) == ("netsh", "-f", netsh_script_name(batch))
+
+
+def test_script_is_written_to_a_private_directory():
+    runner = ScriptRunner()
+    for _ in range(2):
+        configure_batch(runner)[0].execute()
+
+    first, second = [command[2] for command in runner.commands]
+    # Same content, same name, but never a predictable path in the shared temp directory
+    assert os.path.basename(first) == os.path.basename(second)
+    assert os.path.dirname(first) != os.path.dirname(second)
+    assert os.path.dirname(os.path.dirname(first)) == tempfile.gettempdir()
+    assert not os.path.exists(os.path.dirname(first))
+
+
+def test_failed_batch_is_attributed_per_operation():
+    # netsh reports errors inside a script on stdout only
+    def single(args):
+        if "dnsservers" in args:
+            return 1, b"", b"The configured DNS servers are incorrect."
+        # Harmless condition reported with an exit code but without stderr
+        return 1, b"DHCP is already enabled on this interface.", b""
+
+    runner = ScriptRunner(batch_result=(1, b"The configured DNS servers are incorrect.", b""), single=single)
+    batch, address, dns = configure_batch(runner)
+    _, batched = batch.execute()
+
+    assert not batched
+    assert len(runner.commands) == 3
+    assert address.success
+    assert (dns.success, dns.error) == (False, "The configured DNS servers are incorrect.")
+    assert dns.duration is not None
+
+
+def test_empty_batch_runs_nothing():
+    runner = ScriptRunner()
+    assert NetshBatch(runner).execute() == ([], True)
+    assert runner.commands == []
@@ -0,0 +1,213 @@
+"""Tests for the repair operations in network_utils"""
+import threading
+
+import pytest
+
+from benchmark import build_ipconfig_output
+from cancellation import CancellationToken, OperationCancelled
+from command_runner import CommandResult
+from network_snapshot import invalidate_snapshot
+from network_utils import (
+    RepairOperationError, command_failure, configure_network, flush_dns_cache, release_and_renew, reset_winsock,
+    wait_for_release,
+)
+from repair_engine import RepairEngine, RepairOperation
+
+
+ADAPTERS = [{'name': "Ethernet", 'description': "Realtek PCIe GbE"},
+            {'name': "Ethernet 2", 'description': "Intel(R) I219-V"}]
+
+
+class ReleaseRunner:
+    """Runner whose 'ipconfig /all' shows the leases released after some polls"""
+
+    def __init__(self, polls_until_released=None):
+        self.polls_until_released = polls_until_released
+        self.polls = 0
+
+    def run(self, args, timeout=None, token=None, on_output=None):
+        assert args == ["ipconfig", "/all"]
+        self.polls += 1
+        released = self.polls_until_released is not None and self.polls > self.polls_until_released
+        return CommandResult(args, stdout=build_ipconfig_output(2, released=released))
+
+
+@pytest.fixture(autouse=True)
+def fresh_snapshot():
+    yield
+    # wait_for_release leaves its last poll as the cached snapshot
+    invalidate_snapshot()
+
+
+def test_wait_for_release_returns_once_released():
+    runner = ReleaseRunner(polls_until_released=2)
+    released, waited = wait_for_release(runner, timeout=5.0, interval=0.01)
+
+    assert released
+    assert runner.polls == 3
+    assert waited < 5.0
+
+
+def test_wait_for_release_ignores_other_adapters():
+    runner = ReleaseRunner()
+    released, _ = wait_for_release(runner, timeout=0.2, interval=0.01, names=["Wi-Fi"])
+    assert released
+    assert runner.polls == 1
+
+
+def test_wait_for_release_gives_up_after_timeout():
+    runner = ReleaseRunner()
+    released, waited = wait_for_release(runner, timeout=0.1, interval=0.02)
+
+    assert not released
+    assert waited >= 0.1
+    assert runner.polls > 1
+
+
+def test_wait_for_release_ends_when_cancelled():
+    token = CancellationToken()
+    threading.Timer(0.05, token.cancel, args=("stopped by user",)).start()
+    with pytest.raises(OperationCancelled, match="stopped by user"):
+        wait_for_release(ReleaseRunner(), timeout=5.0, interval=1.0, token=token)
+
+
+class ScriptedRunner:
+    """Runner answering every command with respond(args) -> (returncode, stdout, stderr)"""
+
+    def __init__(self, respond=None):
+        self.respond = respond or (lambda args: (0, b"", b""))
+        self.commands = []
+
+    def run(self, args, timeout=None, token=None, on_output=None):
+        self.commands.append(list(args))
+        returncode, stdout, stderr = self.respond(args)
+        if on_output is not None:
+            for line in stdout.decode('utf-8').splitlines():
+                on_output(line)
+        return CommandResult(args, returncode, stdout, stderr)
+
+
+def test_configure_network_succeeds_in_one_batch():
+    runner = ScriptedRunner()
+    lines = []
+    results = configure_network(ADAPTERS, log_callback=lines.append, runner=runner)
+
+    assert [command[:2] for command in runner.commands] == [["netsh", "-f"]]
+    assert [result['success'] for result in results] == [True, True]
+    assert lines[-1].startswith("  📋 Configuration summary: 2 succeeded, 0 failed")
+
+
+def test_configure_network_raises_for_failed_adapters():
+    def respond(args):
+        # The batch fails as a whole and is re-run per command to find the adapter
+        if args[1] == "-f" or "Ethernet 2" in args:
+            return 1, b"", b"The filename, directory name, or volume label syntax is incorrect."
+        return 0, b"", b""
+
+    runner = ScriptedRunner(respond)
+    lines = []
+    with pytest.raises(RepairOperationError, match="failed to configure Ethernet 2$"):
+        configure_network(ADAPTERS, log_callback=lines.append, runner=runner)
+
+    assert len(runner.commands) == 5
+    assert "1 succeeded, 1 failed" in lines[-1]
+
+
+def test_reset_winsock_raises_on_failure():
+    runner = ScriptedRunner(lambda args: (1, b"", b"Access is denied."))
+    with pytest.raises(RepairOperationError, match="'netsh winsock reset' failed: Access is denied."):
+        reset_winsock(runner=runner)
+
+
+def test_flush_dns_cache_reports_ipconfig_error():
+    output = b"\r\nWindows IP Configuration\r\n\r\nCould not flush the DNS Resolver Cache: Function failed.\r\n"
+    runner = ScriptedRunner(lambda args: (1, output, b""))
+    with pytest.raises(RepairOperationError) as raised:
+        flush_dns_cache(runner=runner)
+    assert str(raised.value) == ("'ipconfig /flushdns' exited with code 1: "
+                                 "Could not flush the DNS Resolver Cache: Function failed.")
+
+
+def test_command_failure_ignores_successful_commands():
+    assert command_failure(CommandResult(["ipconfig", "/flushdns"], 0, b"", b"")) is None
+    assert command_failure(CommandResult(["netsh", "x"], 5)) == "'netsh x' exited with code 5"
+
+
+def test_failed_operation_is_an_engine_error():
+    runner = ScriptedRunner(lambda args: (1, b"", b"Access is denied."))
+    engine = RepairEngine([
+        RepairOperation("winsock_reset", lambda: reset_winsock(runner=runner), 3),
+        RepairOperation("report", lambda: None, 4, depends_on=("winsock_reset",)),
+    ])
+    results = engine.run()
+
+    assert results["winsock_reset"].state == "error"
+    assert "Access is denied." in results["winsock_reset"].error
+    assert results["report"].skip_reason == "dependency failed: winsock_reset"
+
+
+RENEW_TIMEOUT = (b"An error occurred while renewing interface Ethernet 2 : "
+                 b"unable to contact your DHCP server. Request has timed out.\r\n")
+
+
+def dhcp_runner(fail_release=False):
+    """Runner whose second adapter cannot reach a DHCP server"""
+    def respond(args):
+        if args[:2] == ["ipconfig", "/all"]:
+            return 0, build_ipconfig_output(2, released=True, locale='en-US'), b""
+        if args[1:] == ["/renew", "Ethernet 2"] or (fail_release and args[1:] == ["/release", "Ethernet 2"]):
+            return 1, RENEW_TIMEOUT, b""
+        return 0, b"", b""
+    return ScriptedRunner(respond)
+
+
+def test_release_and_renew_raises_for_failed_renew():
+    runner = dhcp_runner()
+    lines = []
+    with pytest.raises(RepairOperationError) as raised:
+        release_and_renew(lines.append, runner, adapters=ADAPTERS)
+
+    assert str(raised.value) == ("'ipconfig /renew Ethernet 2' exited with code 1: "
+                                 + RENEW_TIMEOUT.decode().strip())
+    # Every adapter is still renewed
+    assert [command for command in runner.commands if command[1] == "/renew"] == [
+        ["ipconfig", "/renew", "Ethernet"], ["ipconfig", "/renew", "Ethernet 2"],
+    ]
+    assert f"  ❌ {raised.value}" in lines
+
+
+def test_release_and_renew_reports_failed_release():
+    runner = dhcp_runner(fail_release=True)
+    with pytest.raises(RepairOperationError) as raised:
+        release_and_renew(runner=runner, adapters=ADAPTERS)
+
+    failures = str(raised.value).split("; ")
+    assert [failure.split("'")[1] for failure in failures] == ["ipconfig /release Ethernet 2",
+                                                                "ipconfig /renew Ethernet 2"]
+
+
+def test_release_and_renew_succeeds():
+    runner = ScriptedRunner(lambda args: (
+        (0, build_ipconfig_output(2, released=True, locale='en-US'), b"") if args[1] == "/all" else (0, b"", b"")
+    ))
+    release_and_renew(runner=runner, adapters=ADAPTERS)
+    assert runner.commands[-1] == ["ipconfig", "/renew", "Ethernet 2"]
+
+
+def test_long_commands_stream_their_output():
+    def respond(args):
+        if args[:2] == ["ipconfig", "/all"]:
+            return 0, build_ipconfig_output(1, released=True, locale='en-US'), b""
+        if args[1] == "/release":
+            return 0, b"\r\nEthernet adapter Ethernet:\r\n", b""
+        if args[:2] == ["netsh", "-f"]:
+            return 0, b"Ok.\r\n\r\nOk.\r\n", b""
+        return 0, b"", b""
+
+    runner = ScriptedRunner(respond)
+    lines = []
+    release_and_renew(lines.append, runner, adapters=ADAPTERS[:1])
+    configure_network(ADAPTERS[:1], log_callback=lines.append, runner=runner)
+
+    assert "    Ethernet adapter Ethernet:" in lines
+    assert lines.count("    Ok.") == 2
@@ -0,0 +1,83 @@
+"""Tests for resetting the proxy through the registry API"""
+import contextlib
+
+import proxy_settings
+from proxy_settings import read_proxy_settings, reset_proxy_settings
+
+
+class FakeWinreg:
+    """winreg stand-in for the Internet Settings key, recording every write"""
+
+    HKEY_CURRENT_USER = object()
+    KEY_READ = 1
+    KEY_SET_VALUE = 2
+    REG_SZ = 1
+    REG_DWORD = 4
+
+    def __init__(self, values=None):
+        # Value name -> (value, type)
+        self.values = dict(values or {})
+        self.writes = []
+
+    @contextlib.contextmanager
+    def OpenKey(self, root, path, reserved, access):
+        assert (root, path) == (self.HKEY_CURRENT_USER, proxy_settings.INTERNET_SETTINGS_KEY)
+        yield self
+
+    @contextlib.contextmanager
+    def CreateKeyEx(self, root, path, reserved, access):
+        assert access & self.KEY_SET_VALUE
+        yield self
+
+    def QueryValueEx(self, key, name):
+        if name not in self.values:
+            raise FileNotFoundError(name)
+        return self.values[name]
+
+    def SetValueEx(self, key, name, reserved, value_type, value):
+        self.writes.append(name)
+        self.values[name] = (value, value_type)
+
+
+DISABLED = {
+    'AutoConfigURL': ('', FakeWinreg.REG_SZ),
+    'UseAutoDetect': (0, FakeWinreg.REG_DWORD),
+    'ProxyEnable': (0, FakeWinreg.REG_DWORD),
+    'ProxyServer': ('', FakeWinreg.REG_SZ),
+}
+
+
+def test_only_differing_values_are_written(monkeypatch):
+    notified = []
+    monkeypatch.setattr(proxy_settings, "notify_settings_changed", lambda: notified.append(True))
+    registry = FakeWinreg(dict(DISABLED, ProxyEnable=(1, FakeWinreg.REG_DWORD),
+                               ProxyServer=("proxy.corp:8080", FakeWinreg.REG_SZ)))
+
+    assert reset_proxy_settings(registry) == ["ProxyEnable", "ProxyServer"]
+    assert registry.writes == ["ProxyEnable", "ProxyServer"]
+    assert registry.values == DISABLED
+    assert notified == [True]
+
+
+def test_disabled_proxy_is_left_alone(monkeypatch):
+    notified = []
+    monkeypatch.setattr(proxy_settings, "notify_settings_changed", lambda: notified.append(True))
+    registry = FakeWinreg(DISABLED)
+
+    assert reset_proxy_settings(registry) == []
+    assert registry.writes == []
+    assert notified == []
+
+
+def test_missing_values_and_wrong_types_are_written():
+    registry = FakeWinreg({'ProxyEnable': ('0', FakeWinreg.REG_SZ)})
+
+    assert reset_proxy_settings(registry, notify=False) == [name for name in DISABLED]
+    assert registry.values == DISABLED
+
+
+def test_read_proxy_settings_reports_missing_values():
+    registry = FakeWinreg({'ProxyEnable': (1, FakeWinreg.REG_DWORD)})
+    assert read_proxy_settings(registry) == {
+        'AutoConfigURL': None, 'UseAutoDetect': None, 'ProxyEnable': 1, 'ProxyServer': None,
+    }
@@ -0,0 +1,210 @@
+"""Tests for the dependency-aware repair engine"""
+import threading
+
+import pytest
+
+from cancellation import CancellationToken
+from repair_engine import RepairEngine, RepairOperation, StepTracker
+
+
+def noop():
+    pass
+
+
+def recording(order, name, result=None):
+    """Operation function that records when it ran"""
+    def func():
+        order.append(name)
+        if isinstance(result, Exception):
+            raise result
+    return func
+
+
+def test_dependencies_run_first():
+    order = []
+    engine = RepairEngine([
+        RepairOperation("renew", recording(order, "renew"), 3, depends_on=("reset",)),
+        RepairOperation("flush", recording(order, "flush"), 3, depends_on=("renew",)),
+        RepairOperation("reset", recording(order, "reset"), 1),
+    ])
+    results = engine.run()
+
+    assert order == ["reset", "renew", "flush"]
+    assert all(operation.state == "completed" for operation in results.values())
+    assert all(operation.duration is not None for operation in results.values())
+
+
+def test_independent_operations_overlap():
+    # Neither operation can pass the barrier unless both run at the same time
+    barrier = threading.Barrier(2, timeout=5)
+    engine = RepairEngine([
+        RepairOperation("proxy", barrier.wait, 3),
+        RepairOperation("winsock", barrier.wait, 3),
+    ])
+    results = engine.run()
+
+    assert [operation.state for operation in results.values()] == ["completed", "completed"]
+
+
+def test_failed_dependency_skips_dependents():
+    order = []
+    engine = RepairEngine([
+        RepairOperation("reset", recording(order, "reset", RuntimeError("netsh failed")), 1),
+        RepairOperation("renew", recording(order, "renew"), 3, depends_on=("reset",)),
+        RepairOperation("proxy", recording(order, "proxy"), 3),
+    ])
+    results = engine.run()
+
+    assert sorted(order) == ["proxy", "reset"]
+    assert (results["reset"].state, results["reset"].error) == ("error", "netsh failed")
+    assert results["renew"].state == "skipped"
+    assert results["renew"].skip_reason == "dependency failed: reset"
+    assert results["proxy"].state == "completed"
+
+
+def test_unplanned_dependencies_are_ignored():
+    order = []
+    engine = RepairEngine([RepairOperation("flush", recording(order, "flush"), 3, depends_on=("renew",))])
+    assert engine.run()["flush"].state == "completed"
+
+
+def test_invalid_plans_are_rejected():
+    with pytest.raises(ValueError, match="Duplicate repair operation: flush"):
+        RepairEngine([RepairOperation("flush", noop, 3), RepairOperation("flush", noop, 3)])
+    with pytest.raises(ValueError, match="Dependency cycle"):
+        RepairEngine([
+            RepairOperation("a", noop, 3, depends_on=("b",)),
+            RepairOperation("b", noop, 3, depends_on=("a",)),
+        ])
+
+
+def test_priority_orders_stages():
+    order = []
+    engine = RepairEngine(
+        [RepairOperation(name, recording(order, name), 3) for name in ("proxy", "winsock", "flush")],
+        priority={"winsock": 0.9, "proxy": 0.5, "flush": 0.1},
+        max_workers=1,
+    )
+    engine.run()
+
+    assert order == ["winsock", "proxy", "flush"]
+
+
+def test_close_priorities_share_a_stage():
+    barrier = threading.Barrier(2, timeout=5)
+    engine = RepairEngine(
+        [RepairOperation("proxy", barrier.wait, 3), RepairOperation("winsock", barrier.wait, 3)],
+        priority={"proxy": 0.5, "winsock": 0.45},
+    )
+    results = engine.run()
+
+    assert [operation.state for operation in results.values()] == ["completed", "completed"]
+
+
+def test_stop_check_skips_remaining_stoppable_operations():
+    order = []
+    checks = []
+
+    def stop_check():
+        checks.append(list(order))
+        return "network is healthy" if "winsock" in order else None
+
+    engine = RepairEngine(
+        [
+            RepairOperation("proxy", recording(order, "proxy"), 3),
+            RepairOperation("winsock", recording(order, "winsock"), 3),
+            RepairOperation("flush", recording(order, "flush"), 3),
+            RepairOperation("restore", recording(order, "restore"), 3, stoppable=False),
+        ],
+        priority={"proxy": 0.9, "winsock": 0.5, "flush": 0.3, "restore": 0.0},
+        stop_check=stop_check,
+    )
+    results = engine.run()
+
+    assert order == ["proxy", "winsock", "restore"]
+    assert checks == [["proxy"], ["proxy", "winsock"]]
+    assert engine.stop_reason == "network is healthy"
+    assert engine.stopped_after == ["winsock"]
+    assert (results["flush"].state, results["flush"].skip_reason) == ("skipped", "network is healthy")
+    # Skipped for being unneeded, not because something failed
+    assert results["flush"].error is None
+
+
+def test_step_tracker_aggregates_operation_states():
+    reported = []
+    engine = RepairEngine([
+        RepairOperation("reset", recording([], "reset", RuntimeError("failed")), 1),
+        RepairOperation("renew", noop, 3, depends_on=("reset",)),
+        RepairOperation("proxy", noop, 3),
+    ])
+    tracker = StepTracker(engine.operations.values(), lambda step, status: reported.append((step, status)))
+    engine.on_state_change = tracker.update
+    engine.run()
+
+    assert tracker.statuses == {1: "error", 3: "completed"}
+    assert (1, "running") in reported and (3, "running") in reported
+
+
+def test_timeout_abandons_operation_and_cancels_its_token():
+    token = CancellationToken()
+    order = []
+    engine = RepairEngine([
+        RepairOperation("renew", lambda: token.wait(5), 3, timeout=0.2, token=token),
+        RepairOperation("flush", recording(order, "flush"), 3, depends_on=("renew",)),
+    ])
+    results = engine.run()
+
+    assert results["renew"].state == "error"
+    assert results["renew"].error.startswith("timed out after 0.")
+    # Cancelling the operation's token kills the commands it is running
+    assert token.cancelled and token.reason == results["renew"].error
+    assert order == []
+    assert results["flush"].skip_reason == "dependency failed: renew"
+
+
+def test_cancel_abandons_running_and_skips_waiting_operations():
+    run_token = CancellationToken()
+    operation_token = run_token.child()
+    started = threading.Event()
+
+    def renew():
+        started.set()
+        # Like the runners, stop with OperationCancelled once cancelled
+        operation_token.wait(5)
+        operation_token.raise_if_cancelled()
+
+    engine = RepairEngine(
+        [
+            RepairOperation("renew", renew, 3, token=operation_token),
+            RepairOperation("flush", noop, 3, depends_on=("renew",)),
+        ],
+        token=run_token,
+    )
+    canceller = threading.Thread(target=lambda: started.wait(5) and run_token.cancel("cancelled by user"))
+    canceller.start()
+    results = engine.run()
+    canceller.join()
+
+    assert (results["renew"].state, results["renew"].error) == ("error", "cancelled by user")
+    assert results["renew"].duration < 5
+    assert (results["flush"].state, results["flush"].skip_reason) == ("skipped", "cancelled by user")
+
+
+def test_cancelled_staged_run_skips_later_stages():
+    token = CancellationToken()
+    order = []
+
+    def proxy():
+        order.append("proxy")
+        token.cancel("cancelled by user")
+
+    engine = RepairEngine(
+        [RepairOperation("proxy", proxy, 3), RepairOperation("winsock", recording(order, "winsock"), 3)],
+        priority={"proxy": 0.9, "winsock": 0.1},
+        token=token,
+    )
+    results = engine.run()
+
+    assert order == ["proxy"]
+    assert results["winsock"].state == "skipped"
+    assert results["winsock"].error == "cancelled by user"
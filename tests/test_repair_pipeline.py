@@ -0,0 +1,79 @@
+"""Tests for the repair pipeline run against replayed transcripts"""
+import base64
+
+import pytest
+
+import network_utils
+from benchmark import SYNTHETIC_LATENCIES, build_synthetic_transcript
+from cli import EXIT_REPAIR_FAILED, EXIT_SUCCESS, exit_code_for
+from command_runner import ReplayRunner
+from repair_pipeline import run_repair
+
+
+def replay(transcript):
+    """Replay without latencies"""
+    return ReplayRunner.from_transcript(transcript, speed=0)
+
+
+def transcript(fail=()):
+    """
+    Synthetic transcript for two adapters
+
+    Args:
+        fail: Commands, as (program, first argument), that exit with an error
+    """
+    recorded = build_synthetic_transcript(2, {key: 0.0 for key in SYNTHETIC_LATENCIES}, locale='en-US')
+    for command in recorded['commands']:
+        if tuple(command['args'][:2]) in fail:
+            command['returncode'] = 1
+            command['stderr'] = base64.b64encode(b"Error").decode('ascii')
+    return recorded
+
+
+def statuses(result):
+    return {step['name']: step['status'] for step in result['steps']}
+
+
+@pytest.fixture
+def proxy_reset(monkeypatch):
+    """Proxy reset that finds nothing to change; replays have no registry"""
+    monkeypatch.setattr(network_utils, "reset_proxy_settings", lambda: [])
+
+
+def test_successful_repair(proxy_reset):
+    result = run_repair(runner=replay(transcript()), triage=False, trace=False, history=False)
+
+    assert result['success']
+    assert statuses(result) == {"Get Adapters": "completed", "Reset Network Adapter": "completed",
+                                "Reset DNS": "skipped", "Reconnect Network": "completed",
+                                "Complete": "completed"}
+    assert exit_code_for(result) == EXIT_SUCCESS
+
+
+def test_failed_commands_fail_the_repair(monkeypatch):
+    def reset_proxy_settings():
+        raise PermissionError("Access is denied")
+
+    monkeypatch.setattr(network_utils, "reset_proxy_settings", reset_proxy_settings)
+    lines = []
+    failing = [("netsh", "-f"), ("netsh", "interface"), ("netsh", "winsock"),
+               ("ipconfig", "/release"), ("ipconfig", "/renew")]
+    result = run_repair(log_callback=lines.append, runner=replay(transcript(failing)), triage=False,
+                        trace=False, history=False)
+
+    assert not result['success']
+    assert statuses(result) == {"Get Adapters": "completed", "Reset Network Adapter": "error",
+                                "Reset DNS": "skipped", "Reconnect Network": "error", "Complete": "skipped"}
+    assert exit_code_for(result) == EXIT_REPAIR_FAILED
+    assert "❌ Error occurred during proxy_reset: Access is denied" in lines
+    assert "❌ Error occurred during adapter_reset: failed to configure Ethernet, Ethernet 2" in lines
+
+
+def test_failed_renew_fails_the_repair(proxy_reset):
+    result = run_repair(runner=replay(transcript([("ipconfig", "/renew")])), triage=False, trace=False,
+                        history=False)
+
+    assert not result['success']
+    assert statuses(result)["Reconnect Network"] == "error"
+    assert result['steps'][3]['duration'] > 0
+    assert exit_code_for(result) == EXIT_REPAIR_FAILED
@@ -0,0 +1,97 @@
+"""Tests for compiling the repair plan"""
+import pytest
+
+from constants import DEFAULT_COMMAND_COST, NETSH_BATCH_LINE_COST, REPAIR_OPERATIONS
+from repair_plan import command_cost, compile_plan, expand_commands, format_plan, operation_cost
+
+
+ADAPTERS = [{'name': "Ethernet"}, {'name': "Wi-Fi"}]
+
+
+def names(operations):
+    return [operation['name'] for operation in operations]
+
+
+def test_whole_plan_drops_covered_dns_reset():
+    compiled = compile_plan()
+
+    assert names(compiled['operations']) == [name for name in REPAIR_OPERATIONS if name != "dns_reset"]
+    assert compiled['removed'] == [{'name': "dns_reset", 'reason': "covered by adapter_reset"}]
+    # The dependency on the removed operation moves to the one covering it
+    release_renew = compiled['operations'][1]
+    assert release_renew['after'] == ["adapter_reset"]
+
+
+def test_dependencies_on_unselected_operations_are_dropped():
+    compiled = compile_plan(["dns_reset", "release_renew", "flush_dns"])
+
+    assert compiled['removed'] == []
+    assert [operation['after'] for operation in compiled['operations']] == [[], ["dns_reset"], ["release_renew"]]
+
+
+def test_unknown_operation_is_rejected():
+    with pytest.raises(ValueError, match="Unknown repair operations: bogus"):
+        compile_plan(["flush_dns", "bogus"])
+
+
+def test_dependency_on_later_operation_is_rejected():
+    plan = {
+        "first": {'step': 3, 'after': ("second",), 'commands': (), 'effects': (), 'idempotent': True},
+        "second": {'step': 3, 'after': (), 'commands': (), 'effects': (), 'idempotent': True},
+    }
+    with pytest.raises(ValueError, match="first must be planned after second"):
+        compile_plan(plan=plan)
+
+
+def test_repeated_commands_are_run_once():
+    plan = {
+        "flush": {'step': 3, 'after': (), 'commands': ("ipconfig /flushdns",),
+                  'effects': ("flushed",), 'idempotent': True},
+        "flush_again": {'step': 3, 'after': ("flush",), 'commands': ("ipconfig /flushdns",),
+                        'effects': ("flushed_again",), 'idempotent': True},
+        "after_flush": {'step': 3, 'after': ("flush_again",), 'commands': ("ipconfig /registerdns",),
+                        'effects': (), 'idempotent': False},
+    }
+    compiled = compile_plan(plan=plan)
+
+    assert compiled['removed'] == [{'name': "flush_again", 'reason': "commands already run by flush"}]
+    assert compiled['operations'][1]['after'] == ["flush"]
+
+
+def test_commands_expand_per_adapter():
+    commands = ("ipconfig /release {adapter}", "ipconfig /flushdns")
+
+    assert expand_commands(commands, ADAPTERS) == [
+        'ipconfig /release "Ethernet"', 'ipconfig /release "Wi-Fi"', "ipconfig /flushdns",
+    ]
+    assert expand_commands(commands) == ["ipconfig /release <adapter>", "ipconfig /flushdns"]
+
+
+def test_netsh_commands_are_costed_as_one_batch():
+    commands = compile_plan(["adapter_reset"], ADAPTERS)['operations'][0]['commands'] + ["ipconfig /flushdns"]
+    assert len(commands) == 5
+
+    assert operation_cost(commands) == pytest.approx(
+        command_cost(commands[0]) + NETSH_BATCH_LINE_COST * 3 + command_cost(commands[-1]))
+
+
+def test_unknown_commands_have_default_cost():
+    assert command_cost("unknown tool") == DEFAULT_COMMAND_COST
+
+
+def test_critical_path_overlaps_independent_operations():
+    compiled = compile_plan(adapters=ADAPTERS)
+    cost = {operation['name']: operation['cost'] for operation in compiled['operations']}
+
+    assert compiled['cost'] == pytest.approx(sum(cost.values()))
+    chain = cost['adapter_reset'] + cost['release_renew'] + cost['flush_dns']
+    assert compiled['critical_path'] == pytest.approx(max(chain, cost['proxy_reset'], cost['winsock_reset']))
+
+
+def test_format_plan_lists_operations_and_removals():
+    lines = format_plan(compile_plan(adapters=ADAPTERS))
+
+    assert lines[0].startswith("📝 Repair plan: 5 operations, estimated ")
+    assert "netsh interface ip set address \"Wi-Fi\" source=dhcp" in "\n".join(lines)
+    assert lines.count("      (netsh commands run as one batch)") == 1
+    assert lines[-1] == "  ♻️ dns_reset removed, covered by adapter_reset"
@@ -0,0 +1,196 @@
+"""Tests for the triage probes against local stand-in DNS and TCP servers"""
+import contextlib
+import socket
+import struct
+import threading
+
+import pytest
+
+from triage import probe_dns, probe_tcp, probe_resolver, run_triage, select_operations
+from constants import REPAIR_OPERATIONS
+
+
+@contextlib.contextmanager
+def dns_server(rcode=0, answers=1, reply=True):
+    """Serve DNS answers on a local UDP port; yields the port"""
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    sock.bind(("127.0.0.1", 0))
+    sock.settimeout(0.1)
+    stop = threading.Event()
+    queries = []
+
+    def serve():
+        while not stop.is_set():
+            try:
+                query, address = sock.recvfrom(512)
+            except socket.timeout:
+                continue
+            queries.append(query)
+            if not reply:
+                continue
+            # Echo the id and question, set the response flag and counts
+            flags = 0x8180 | rcode
+            header = struct.pack('!HHHHHH', struct.unpack('!H', query[:2])[0], flags, 1, answers, 0, 0)
+            sock.sendto(header + query[12:], address)
+
+    thread = threading.Thread(target=serve, daemon=True)
+    thread.start()
+    try:
+        yield sock.getsockname()[1], queries
+    finally:
+        stop.set()
+        thread.join()
+        sock.close()
+
+
+@contextlib.contextmanager
+def tcp_server():
+    """Accept TCP connections on a local port; yields (host, port)"""
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    sock.bind(("127.0.0.1", 0))
+    sock.listen(4)
+    try:
+        yield sock.getsockname()
+    finally:
+        sock.close()
+
+
+def closed_port():
+    """A local TCP port nothing listens on"""
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()
+
+
+class FakeRegistry:
+    """winreg stand-in holding the Internet Settings values"""
+
+    HKEY_CURRENT_USER = object()
+    KEY_READ = 1
+
+    def __init__(self, values=None):
+        self.values = dict(values or {})
+
+    @contextlib.contextmanager
+    def OpenKey(self, root, path, reserved, access):
+        yield self
+
+    def QueryValueEx(self, key, name):
+        if name not in self.values:
+            raise FileNotFoundError(name)
+        return self.values[name], None
+
+
+def adapter(dns=(), gateway=()):
+    return {'name': "Ethernet", 'dns': list(dns), 'gateway': list(gateway)}
+
+
+def test_probe_dns_resolves_through_local_server():
+    with dns_server() as (port, queries):
+        ok, detail = probe_dns("127.0.0.1", "example.com", timeout=1.0, port=port)
+    assert ok
+    assert "resolved example.com" in detail
+    # The question carries the name as length-prefixed labels
+    assert b"\x07example\x03com\x00" in queries[0]
+
+
+def test_probe_dns_reports_error_code():
+    with dns_server(rcode=3, answers=0) as (port, _):
+        ok, detail = probe_dns("127.0.0.1", "missing.example", timeout=1.0, port=port)
+    assert not ok
+    assert "error code 3" in detail
+
+
+def test_probe_dns_reports_empty_answer():
+    with dns_server(answers=0) as (port, _):
+        ok, detail = probe_dns("127.0.0.1", "example.com", timeout=1.0, port=port)
+    assert not ok
+    assert "no records" in detail
+
+
+def test_probe_dns_times_out_without_reply():
+    with dns_server(reply=False) as (port, _):
+        with pytest.raises(socket.timeout):
+            probe_dns("127.0.0.1", "example.com", timeout=0.2, port=port)
+
+
+def test_probe_tcp_connects_to_local_server():
+    with tcp_server() as target:
+        ok, detail = probe_tcp(target, timeout=1.0)
+    assert ok
+    assert f"{target[0]}:{target[1]}" in detail
+
+
+def test_probe_tcp_raises_when_refused():
+    with pytest.raises(OSError):
+        probe_tcp(closed_port(), timeout=1.0)
+
+
+def test_probe_resolver_uses_given_resolver():
+    calls = []
+
+    def resolve(name, port, family, kind):
+        calls.append(name)
+        return [(socket.AF_INET, kind, 6, "", ("192.0.2.7", 0))]
+
+    ok, detail = probe_resolver("example.com", resolve=resolve)
+    assert ok
+    assert calls == ["example.com"]
+    assert "192.0.2.7" in detail
+
+
+def test_probe_resolver_reports_resolver_failure():
+    def resolve(*args):
+        raise socket.gaierror(socket.EAI_NONAME, "Name or service not known")
+
+    ok, detail = probe_resolver("example.com", resolve=resolve)
+    assert not ok
+    assert "system resolver failed" in detail
+
+
+def test_run_triage_with_healthy_stand_ins():
+    def resolve(*args):
+        return [(socket.AF_INET, socket.SOCK_STREAM, 6, "", ("192.0.2.7", 0))]
+
+    with dns_server() as (port, _), tcp_server() as target:
+        findings = run_triage([adapter(dns=["127.0.0.1"])], budget=2.0, tcp_target=target,
+                              dns_port=port, registry=FakeRegistry({'ProxyEnable': 0}), resolve=resolve)
+    assert {name: finding['ok'] for name, finding in findings.items()} == {
+        'dns': True, 'resolver': True, 'tcp': True, 'proxy': True, 'gateway': None,
+    }
+    assert select_operations(findings) == list(REPAIR_OPERATIONS)
+
+
+def test_run_triage_counts_probes_over_budget_as_failed():
+    def resolve(*args):
+        return [(socket.AF_INET, socket.SOCK_STREAM, 6, "", ("192.0.2.7", 0))]
+
+    with dns_server(reply=False) as (port, _), tcp_server() as target:
+        findings = run_triage([adapter(dns=["127.0.0.1"])], budget=0.3, tcp_target=target,
+                              dns_port=port, registry=FakeRegistry(), resolve=resolve)
+    assert findings['dns']['ok'] is False
+    assert findings['tcp']['ok'] is True
+
+
+def test_select_operations_for_healthy_link():
+    findings = {
+        'gateway': {'ok': True}, 'dns': {'ok': True}, 'resolver': {'ok': True},
+        'tcp': {'ok': True}, 'proxy': {'ok': True},
+    }
+    assert select_operations(findings) == ["flush_dns"]
+
+
+def test_select_operations_for_broken_resolver():
+    findings = {
+        'gateway': {'ok': True}, 'dns': {'ok': True}, 'resolver': {'ok': False},
+        'tcp': {'ok': True}, 'proxy': {'ok': True},
+    }
+    assert select_operations(findings) == ["dns_reset", "flush_dns"]
+
+
+def test_select_operations_for_proxy_and_tcp_failures():
+    findings = {
+        'gateway': {'ok': True}, 'dns': {'ok': True}, 'resolver': {'ok': True},
+        'tcp': {'ok': False}, 'proxy': {'ok': False},
+    }
+    assert select_operations(findings) == ["flush_dns", "proxy_reset", "winsock_reset"]
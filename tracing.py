@@ -0,0 +1,176 @@
+"""Tracing Module
+
+Records timed spans for commands, WMI calls and repair steps. A run can be
+exported as a Chrome trace JSON file (open in chrome://tracing or Perfetto)
+and summarized as a compact table for the log.
+"""
+import json
+import os
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+
+
+class Span:
+    """A single timed span"""
+
+    def __init__(self, name, category, start, thread_id, args):
+        self.name = name
+        self.category = category
+        self.start = start
+        self.end = None
+        self.thread_id = thread_id
+        self.args = args
+
+    @property
+    def duration(self):
+        """Elapsed time in seconds"""
+        return (self.end if self.end is not None else time.perf_counter()) - self.start
+
+
+class Tracer:
+    """Thread-safe collector of spans for one repair run"""
+
+    def __init__(self):
+        self.spans = []
+        self.origin = time.perf_counter()
+        self._lock = threading.Lock()
+        self._thread_ids = {}
+
+    def _thread_id(self):
+        """Map the current thread to a small, stable number"""
+        ident = threading.get_ident()
+        with self._lock:
+            return self._thread_ids.setdefault(ident, len(self._thread_ids) + 1)
+
+    @contextmanager
+    def span(self, name, category, **args):
+        """
+        Time a block of code
+
+        Args:
+            name: Span name
+            category: Span category, e.g. 'command', 'wmi' or 'step'
+            **args: Extra details; the yielded dict can be updated inside the block
+
+        Yields:
+            dict: The span's args
+        """
+        span = Span(name, category, time.perf_counter(), self._thread_id(), dict(args))
+        try:
+            yield span.args
+        except BaseException as e:
+            span.args['error'] = str(e) or type(e).__name__
+            raise
+        finally:
+            span.end = time.perf_counter()
+            with self._lock:
+                self.spans.append(span)
+
+    def to_chrome_trace(self):
+        """
+        Build the Chrome trace event format
+
+        Returns:
+            dict: JSON-serializable trace
+        """
+        pid = os.getpid()
+        with self._lock:
+            spans = list(self.spans)
+        events = [
+            {
+                'name': span.name,
+                'cat': span.category,
+                'ph': 'X',
+                'ts': round((span.start - self.origin) * 1e6),
+                'dur': round(span.duration * 1e6),
+                'pid': pid,
+                'tid': span.thread_id,
+                'args': span.args,
+            }
+            for span in sorted(spans, key=lambda span: span.start)
+        ]
+        return {'traceEvents': events, 'displayTimeUnit': 'ms'}
+
+    def export(self, path):
+        """
+        Write the trace as Chrome trace JSON
+
+        Args:
+            path: Output file path
+        """
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.to_chrome_trace(), f, ensure_ascii=False, default=str)
+
+    def summary_lines(self, limit=15):
+        """
+        Summarize spans grouped by name, slowest total first
+
+        Args:
+            limit: Maximum number of rows
+
+        Returns:
+            list: Table lines
+        """
+        totals = {}
+        with self._lock:
+            spans = list(self.spans)
+        for span in spans:
+            count, total, longest = totals.get((span.category, span.name), (0, 0.0, 0.0))
+            totals[(span.category, span.name)] = (count + 1, total + span.duration, max(longest, span.duration))
+
+        rows = sorted(totals.items(), key=lambda item: item[1][1], reverse=True)[:limit]
+        lines = [f"  {'Span':<40} {'Type':<9} {'Count':>5} {'Total':>9} {'Max':>9}"]
+        for (category, name), (count, total, longest) in rows:
+            if len(name) > 40:
+                name = name[:37] + "..."
+            lines.append(f"  {name:<40} {category:<9} {count:>5} {total:>8.3f}s {longest:>8.3f}s")
+        return lines
+
+
+_active_tracer = None
+
+
+def get_tracer():
+    """Get the tracer of the current run, or None when tracing is off"""
+    return _active_tracer
+
+
+def set_tracer(tracer):
+    """
+    Set the tracer that trace_span records into
+
+    Args:
+        tracer: Tracer, or None to turn tracing off
+
+    Returns:
+        The previous tracer
+    """
+    global _active_tracer
+    previous = _active_tracer
+    _active_tracer = tracer
+    return previous
+
+
+@contextmanager
+def trace_span(name, category, **args):
+    """
+    Record a span on the active tracer; does nothing when tracing is off
+
+    Yields:
+        dict: The span's args, for adding details such as return codes
+    """
+    tracer = _active_tracer
+    if tracer is None:
+        yield dict(args)
+        return
+    with tracer.span(name, category, **args) as span_args:
+        yield span_args
+
+
+def default_trace_path():
+    """Path for a new trace file in the temp directory"""
+    name = time.strftime("trace_%Y%m%d_%H%M%S.json")
+    return os.path.join(tempfile.gettempdir(), "network_repair", name)
@@ -0,0 +1,256 @@
+"""Pre-repair Triage Module
+
+Runs cheap connectivity probes concurrently within a strict time budget and
+selects only the repair operations their findings call for.
+"""
+import random
+import socket
+import struct
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+
+from command_runner import get_runner
+from constants import TRIAGE_BUDGET, TRIAGE_DNS_NAME, TRIAGE_TCP_TARGET, REPAIR_OPERATIONS
+from proxy_settings import read_proxy_settings
+
+
+def build_dns_query(name, query_id):
+    """
+    Build a DNS query packet for an A record
+
+    Args:
+        name: Host name to resolve
+        query_id: 16-bit query identifier
+
+    Returns:
+        bytes: Query packet
+    """
+    header = struct.pack('!HHHHHH', query_id, 0x0100, 1, 0, 0, 0)
+    question = b''.join(
+        bytes([len(label)]) + label for label in name.encode('idna').split(b'.') if label
+    )
+    return header + question + b'\x00' + struct.pack('!HH', 1, 1)
+
+
+def probe_resolver(name=TRIAGE_DNS_NAME, resolve=None):
+    """
+    Resolve a name through the system resolver
+
+    Unlike probe_dns this goes through the local DNS client and its cache,
+    so a stopped DNS Client service or a poisoned cache shows up here. The
+    resolver has no timeout of its own; run_triage bounds it by the budget.
+
+    Args:
+        name: Host name to resolve
+        resolve: getaddrinfo-compatible function, defaults to socket.getaddrinfo
+
+    Returns:
+        tuple: (ok, detail)
+    """
+    resolve = resolve or socket.getaddrinfo
+    try:
+        addresses = resolve(name, None, 0, socket.SOCK_STREAM)
+    except socket.gaierror as e:
+        return False, f"system resolver failed for {name}: {e.strerror or e}"
+    if not addresses:
+        return False, f"system resolver returned no addresses for {name}"
+    return True, f"system resolver resolved {name} to {addresses[0][4][0]}"
+
+
+def probe_dns(server, name=TRIAGE_DNS_NAME, timeout=TRIAGE_BUDGET, port=53):
+    """
+    Resolve a name through a specific DNS server over UDP
+
+    Args:
+        server: DNS server address
+        name: Host name to resolve
+        timeout: Socket timeout in seconds
+        port: DNS server port
+
+    Returns:
+        tuple: (ok, detail)
+    """
+    query_id = random.randint(0, 0xFFFF)
+    family = socket.AF_INET6 if ':' in server else socket.AF_INET
+    with socket.socket(family, socket.SOCK_DGRAM) as sock:
+        sock.settimeout(timeout)
+        sock.sendto(build_dns_query(name, query_id), (server, port))
+        while True:
+            response, _ = sock.recvfrom(4096)
+            if len(response) >= 12 and struct.unpack('!H', response[:2])[0] == query_id:
+                break
+    flags, _, answers = struct.unpack('!HHH', response[2:8])
+    rcode = flags & 0x000F
+    if rcode != 0:
+        return False, f"{server} answered with error code {rcode}"
+    if answers == 0:
+        return False, f"{server} returned no records for {name}"
+    return True, f"{server} resolved {name}"
+
+
+def probe_gateway(gateway, runner=None, timeout=TRIAGE_BUDGET):
+    """
+    Ping the default gateway once
+
+    Args:
+        gateway: Gateway IPv4 address
+        runner: Command runner, defaults to the global runner
+        timeout: Reply timeout in seconds
+
+    Returns:
+        tuple: (ok, detail)
+    """
+    runner = runner or get_runner()
+    result = runner.run(["ping", "-n", "1", "-w", str(int(timeout * 1000)), gateway])
+    # 'TTL=' appears in echo replies in every display language
+    if result.returncode == 0 and b"TTL=" in result.stdout.upper():
+        return True, f"{gateway} replied"
+    return False, f"{gateway} did not reply"
+
+
+def probe_tcp(target=TRIAGE_TCP_TARGET, timeout=TRIAGE_BUDGET):
+    """
+    Open a TCP connection to a target
+
+    Args:
+        target: (host, port) tuple, host should be an IP address
+        timeout: Connect timeout in seconds
+
+    Returns:
+        tuple: (ok, detail)
+    """
+    with socket.create_connection(target, timeout=timeout):
+        pass
+    return True, f"connected to {target[0]}:{target[1]}"
+
+
+def probe_proxy(registry=None):
+    """
+    Check whether a proxy is configured
+
+    Args:
+        registry: winreg-compatible module, defaults to winreg
+
+    Returns:
+        tuple: (ok, detail), ok is False when a proxy is configured
+    """
+    settings = read_proxy_settings(registry)
+    if settings.get('ProxyEnable'):
+        return False, f"proxy enabled ({settings.get('ProxyServer') or 'no server'})"
+    if settings.get('AutoConfigURL'):
+        return False, f"auto-config script set ({settings['AutoConfigURL']})"
+    return True, "no proxy configured"
+
+
+def _timed(probe, *args, **kwargs):
+    """Run a probe and record its outcome and duration"""
+    start = time.perf_counter()
+    try:
+        ok, detail = probe(*args, **kwargs)
+    except Exception as e:
+        ok, detail = False, str(e) or type(e).__name__
+    return {'ok': ok, 'detail': detail, 'duration': time.perf_counter() - start}
+
+
+def run_triage(adapters, runner=None, budget=TRIAGE_BUDGET, dns_name=TRIAGE_DNS_NAME,
+               tcp_target=TRIAGE_TCP_TARGET, dns_servers=None, dns_port=53, registry=None, resolve=None):
+    """
+    Run all probes concurrently within a time budget
+
+    Args:
+        adapters: Adapter records from the network snapshot
+        runner: Command runner, defaults to the global runner
+        budget: Total time budget in seconds; unfinished probes count as failed
+        dns_name: Name resolved by the DNS probe
+        tcp_target: (host, port) for the TCP probe
+        dns_servers: DNS servers to query, defaults to the adapters' servers
+        dns_port: DNS server port
+        registry: winreg-compatible module for the proxy probe
+        resolve: getaddrinfo-compatible function for the resolver probe
+
+    Returns:
+        dict: Probe name -> {'ok', 'detail', 'duration'}; ok is None when a
+        probe could not run (e.g. no gateway configured)
+    """
+    if dns_servers is None:
+        dns_servers = [server for adapter in adapters for server in adapter['dns']]
+    gateways = [
+        gateway for adapter in adapters for gateway in adapter['gateway'] if ':' not in gateway
+    ]
+
+    findings = {}
+    # 'resolver' asks the system resolver, 'dns' the adapter's server
+    # directly; together they tell a broken DNS client from a broken server
+    probes = {
+        'resolver': (probe_resolver, (dns_name, resolve)),
+        'tcp': (probe_tcp, (tcp_target, budget)),
+        'proxy': (probe_proxy, (registry,)),
+    }
+    if dns_servers:
+        probes['dns'] = (probe_dns, (dns_servers[0], dns_name, budget, dns_port))
+    else:
+        findings['dns'] = {'ok': None, 'detail': "no DNS server configured", 'duration': 0.0}
+    if gateways:
+        probes['gateway'] = (probe_gateway, (gateways[0], runner, budget))
+    else:
+        findings['gateway'] = {'ok': None, 'detail': "no default gateway", 'duration': 0.0}
+
+    executor = ThreadPoolExecutor(max_workers=len(probes))
+    futures = {name: executor.submit(_timed, probe, *args) for name, (probe, args) in probes.items()}
+    wait(futures.values(), timeout=budget)
+    # Do not wait for probes that overran the budget
+    executor.shutdown(wait=False)
+
+    for name, future in futures.items():
+        if future.done():
+            findings[name] = future.result()
+        else:
+            findings[name] = {'ok': False, 'detail': f"no result within {budget:.1f}s", 'duration': budget}
+    return findings
+
+
+def verify_connectivity(adapters, runner=None, budget=TRIAGE_BUDGET):
+    """
+    Re-run the triage probes to check whether the network works again
+
+    Args:
+        adapters: Adapter records from the network snapshot
+        runner: Command runner, defaults to the global runner
+        budget: Total time budget in seconds
+
+    Returns:
+        tuple: (verified, findings), verified is True when every probe passed
+    """
+    findings = run_triage(adapters, runner=runner, budget=budget)
+    return all(finding['ok'] is True for finding in findings.values()), findings
+
+
+def select_operations(findings):
+    """
+    Choose the repair operations the triage findings require
+
+    Args:
+        findings: Result of run_triage
+
+    Returns:
+        list: Operation names in REPAIR_OPERATIONS order
+    """
+    def failed(name):
+        return findings.get(name, {}).get('ok') is False
+
+    def missing(name):
+        return findings.get(name, {}).get('ok') is None
+
+    selected = {"flush_dns"}
+    if failed('gateway') or missing('gateway'):
+        # No working local link: run the full sequence
+        selected.update(REPAIR_OPERATIONS)
+    if failed('proxy'):
+        selected.add("proxy_reset")
+    if failed('dns') or missing('dns') or failed('resolver'):
+        # A failing resolver with a working server points at the local DNS
+        # client and its cache, which flush_dns covers
+        selected.add("dns_reset")
+    if failed('tcp'):
+        selected.add("winsock_reset")
+    return [operation for operation in REPAIR_OPERATIONS if operation in selected]
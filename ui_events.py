@@ -0,0 +1,71 @@
+"""UI Event Module
+
+A single thread-safe channel carrying typed UI events from worker threads to
+the Tk thread. Posting an event asks for one wakeup through a notify callback
+(a Tk virtual event); further posts do not trigger another wakeup until the
+receiver has drained the channel, so an idle window does no work at all.
+"""
+import queue
+import threading
+from collections import namedtuple
+
+from constants import LOG_BATCH_SIZE
+
+
+# Event payloads
+LogEvent = namedtuple('LogEvent', ['message'])
+StepEvent = namedtuple('StepEvent', ['step_index', 'status'])
+RepairDoneEvent = namedtuple('RepairDoneEvent', ['result'])
+
+
+class UiEventChannel:
+    """Queue of UI events with coalesced wakeups"""
+
+    def __init__(self, notify=None):
+        """
+        Args:
+            notify: Called without arguments when events are waiting and no
+                wakeup is pending; may be called from any thread
+        """
+        self.notify = notify
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._wakeup_pending = False
+
+    def post(self, event):
+        """Queue an event and wake the receiver if needed"""
+        self._queue.put(event)
+        with self._lock:
+            if self._wakeup_pending or self.notify is None:
+                return
+            self._wakeup_pending = True
+        try:
+            self.notify()
+        except Exception:
+            # The receiver is not ready yet (e.g. before the Tk main loop);
+            # the next post or drain retries
+            with self._lock:
+                self._wakeup_pending = False
+
+    def drain(self, limit=LOG_BATCH_SIZE):
+        """
+        Take pending events
+
+        Args:
+            limit: Maximum number of events returned
+
+        Returns:
+            tuple: (events, more) - events in posting order, and whether
+            events were left behind because of the limit
+        """
+        events = []
+        try:
+            while len(events) < limit:
+                events.append(self._queue.get_nowait())
+        except queue.Empty:
+            pass
+        with self._lock:
+            more = not self._queue.empty()
+            # Keep the wakeup pending while the receiver still has work
+            self._wakeup_pending = more
+        return events, more